@@ -0,0 +1,107 @@
+"""
+Cold-start budget for the `hydro` CLI.
+
+Runs the lightweight commands in fresh interpreters and checks that:
+1. `import hydro.cli` stays under the import budget (python -X importtime)
+2. each lightweight command finishes under the wall-clock budget
+3. none of them loads pandas, scipy or matplotlib
+
+Usage (from the repository root):
+    python benchmarks/startup.py [--runs 5] [--import-budget-ms 250] [--command-budget-ms 600]
+
+Exits with status 1 when a budget is blown or a command fails, so it can gate CI.
+"""
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Commands that must stay light: pure Manning maths on a profile
+LIGHT_COMMANDS = [
+    ["simulate", "--depth", "2.0"],
+    ["bridge-check", "--depth", "3.5"],
+    ["--help"],
+]
+
+# Heavy packages that only plotting / reporting / statistics commands may load
+HEAVY_MODULES = ("pandas", "scipy", "matplotlib")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def _python(*args):
+    """Run a fresh interpreter; a crashing child fails the check (a dead process is always "fast")."""
+    proc = subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        print(f"\nSTARTUP CHECK FAILED: python {' '.join(args)} exited with status {proc.returncode}", file=sys.stderr)
+        # -X importtime floods stderr: keep only the child's own output (the traceback)
+        print("\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:")), file=sys.stderr)
+        sys.exit(1)
+    return proc
+
+def import_profile(*args):
+    """Run under -X importtime -> {module: cumulative import time in microseconds}."""
+    proc = _python("-X", "importtime", *args)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+def best_wall_time(args, runs: int):
+    """Best-of-N wall-clock time (seconds) of a fresh interpreter running `args`."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        _python(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=250.0)
+    parser.add_argument("--command-budget-ms", type=float, default=600.0)
+    args = parser.parse_args()
+
+    failures = []
+
+    # 1. Import cost of the CLI module itself
+    modules = import_profile("-c", "import hydro.cli")
+    cli_ms = modules.get("hydro.cli", 0) / 1000
+    print(f"import hydro.cli: {cli_ms:7.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    slowest = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:8]
+    for name, us in slowest:
+        print(f"    {name:<40} {us / 1000:7.1f} ms")
+    if cli_ms > args.import_budget_ms:
+        failures.append(f"import hydro.cli took {cli_ms:.1f} ms")
+
+    # 2. + 3. Wall clock and heavy imports of each lightweight command
+    for command in LIGHT_COMMANDS:
+        argv = ["-m", "hydro.cli", *command]
+        elapsed_ms = best_wall_time(argv, args.runs) * 1000
+        loaded = import_profile(*argv)
+        heavy = [name for name in loaded if name.split(".")[0] in HEAVY_MODULES]
+        label = "hydro " + " ".join(command)
+        print(f"{label:<32} {elapsed_ms:7.1f} ms (budget {args.command_budget_ms:.0f} ms)"
+              + (f"  heavy imports: {', '.join(sorted(set(heavy)))}" if heavy else ""))
+        if elapsed_ms > args.command_budget_ms:
+            failures.append(f"{label} took {elapsed_ms:.1f} ms")
+        if heavy:
+            failures.append(f"{label} imported {', '.join(sorted(set(heavy)))}")
+
+    if failures:
+        print("\nSTARTUP BUDGET EXCEEDED:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nStartup budget OK.")
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,140 @@ import typer
 import json
 import os
 import time
-import pandas as pd
 from rich.console import Console
 from rich.panel import Panel
+from typing import List
+from hydro.service import DEFAULT_PORT
+from hydro.utils import trace
 
-# Custom Modules
-from hydro.simulation.engine import HydraulicEngine
-from hydro.hazard.report import generate_styled_report
-from hydro.crs.checker import validate_crs
-from hydro.hazard.advisor import advise_on_risk
-from hydro.visualization.plotter import plot_cross_section
-from hydro.utils.dem_loader import get_elevation_from_dem
-from hydro.simulation.monte_carlo import run_flood_risk_simulation
+# Custom Modules are imported inside each command: pandas, scipy and matplotlib
+# cost hundreds of milliseconds, so only the commands that need them pay for them.
 
 # Initialize Typer and Rich
 app = typer.Typer(help="🌊 Hydro-Flow CLI: The Hydrologist's Terminal Assistant")
 console = Console()
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    trace_run: bool = typer.Option(False, "--trace", help="Time every stage and print a span / counter summary"),
+    profile_out: str = typer.Option(None, "--profile-out", help="Write a Chrome trace (JSON) for chrome://tracing / Perfetto")
+):
+    """🌊 Hydro-Flow CLI: The Hydrologist's Terminal Assistant"""
+    if not (trace_run or profile_out):
+        return
+    trace.enable()
+    command = trace.span(f"hydro {ctx.invoked_subcommand}")
+    command.__enter__()
+
+    def finish():
+        command.__exit__(None, None, None)
+        tracer = trace.disable()
+        if trace_run:
+            _print_trace(tracer)
+        if profile_out:
+            console.print(f"[dim]🧵 Trace written to {tracer.write(profile_out)}[/dim]")
+    ctx.call_on_close(finish)
+
+def _print_trace(tracer):
+    """Nested span table (total / self time) plus the counters."""
+    from rich.table import Table
+
+    rows = tracer.summary()
+    wall = max((row['total'] for row in rows if len(row['path']) == 1), default=0.0) or 1.0
+    table = Table(title="🧵 Trace", header_style="bold magenta", border_style="blue")
+    table.add_column("Span", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total (ms)", justify="right")
+    table.add_column("Self (ms)", justify="right")
+    table.add_column("% Wall", justify="right")
+    for row in rows:
+        table.add_row("  " * (len(row['path']) - 1) + row['path'][-1], f"{row['calls']:,}",
+                      f"{row['total'] * 1000:.1f}", f"{row['self'] * 1000:.1f}", f"{row['total'] / wall:.0%}")
+    console.print(table)
+    if tracer.counters:
+        console.print("   ".join(f"[bold]{name}[/bold]: {value:,.0f}" for name, value in tracer.counters.items()))
+
+def _pause(seconds: float):
+    """UX pause for people at a terminal; skipped when piped, scripted or traced."""
+    if console.is_terminal and not trace.enabled():
+        time.sleep(seconds)
+
 @app.command()
-def check_crs(file_path: str):
-    """Verify the Coordinate Reference System (CRS) of a GeoJSON or TIFF."""
-    console.print(f"[bold blue]🔍 Analyzing CRS for:[/bold blue] {file_path}...")
-    result = validate_crs(file_path)
-    if "Error" in result:
-        console.print(f"[bold red]❌ {result}[/bold red]")
-    else:
-        console.print(f"[bold green]✅ Success:[/bold green] {result}")
+def check_crs(
+    paths: List[str] = typer.Argument(..., help="Layer files, directories (searched recursively) or glob patterns"),
+    expect: str = typer.Option(None, help="Required CRS, e.g. EPSG:32631 (default: the most common one)"),
+    workers: int = typer.Option(16, help="Threads reading headers concurrently"),
+    no_cache: bool = typer.Option(False, help="Re-read every header instead of reusing unchanged results"),
+    output: str = typer.Option(None, help="Write the per-file result (.csv, .parquet or .json)")
+):
+    """Verify the Coordinate Reference System (CRS) of GeoJSON / TIFF / Shapefile layers (headers only)."""
+    from hydro.crs import checker
+
+    if len(paths) == 1 and os.path.isfile(paths[0]):
+        file_path = paths[0]
+        console.print(f"[bold blue]🔍 Analyzing CRS for:[/bold blue] {file_path}...")
+        result = checker.validate_crs(file_path)
+        if "Error" in result:
+            console.print(f"[bold red]❌ {result}[/bold red]")
+        else:
+            console.print(f"[bold green]✅ Success:[/bold green] {result}")
+        return
+
+    from rich.table import Table
+
+    layers = checker.find_layers(paths)
+    if not layers:
+        console.print(f"[bold red]❌ No GeoJSON / TIFF / Shapefile layers found in {', '.join(paths)}[/bold red]")
+        raise typer.Exit(code=1)
+
+    console.print(f"[bold blue]🔍 Reading CRS headers of {len(layers):,} layers...[/bold blue]")
+    start = time.perf_counter()
+    results = checker.scan_crs(layers, workers, use_cache=not no_cache)
+    elapsed = time.perf_counter() - start
+    groups, reference, errors, unresolved = checker.group_by_crs(results, expect)
+
+    table = Table(title="🗺️ CRS Consistency", header_style="bold magenta", border_style="blue")
+    table.add_column("CRS", style="cyan")
+    table.add_column("Layers", justify="right")
+    table.add_column("Examples")
+    table.add_column("Status", justify="center")
+    for crs, members in groups.items():
+        examples = ", ".join(members[:3]) + (f" (+{len(members) - 3:,})" if len(members) > 3 else "")
+        status = "[bold green]✅ REFERENCE[/bold green]" if crs == reference else "[bold red]❌ MISMATCH[/bold red]"
+        table.add_row(crs, f"{len(members):,}", examples, status)
+    unresolved_groups = {}
+    for row in unresolved:
+        unresolved_groups.setdefault(row['crs'], []).append(row['path'])
+    for crs, members in unresolved_groups.items():
+        examples = ", ".join(members[:3]) + (f" (+{len(members) - 3:,})" if len(members) > 3 else "")
+        table.add_row(crs, f"{len(members):,}", examples, "[bold yellow]❓ UNRESOLVED[/bold yellow]")
+    console.print(table)
+
+    for row in errors[:20]:
+        console.print(f"[red]⚠️ {row['path']}: {row['error']}[/red]")
+    if len(errors) > 20:
+        console.print(f"[dim]+ {len(errors) - 20:,} more unreadable layers.[/dim]")
+    defaulted = sum(1 for row in results if row['error'] is None and not row['declared'])
+    if defaulted:
+        console.print(f"[dim]{defaulted:,} GeoJSON layer(s) declare no CRS and use the RFC 7946 default ({checker.GEOJSON_DEFAULT}).[/dim]")
+    if unresolved:
+        console.print(f"[yellow]⚠️ {len(unresolved):,} .prj CRS name(s) map to no EPSG code - check them by hand (or install pyproj).[/yellow]")
+
+    if output:
+        import pandas as pd
+        from hydro.utils.tables import write_table
+
+        write_table(pd.DataFrame(results), output)
+        console.print(f"[bold green]✅ Per-layer result written to {output}[/bold green]")
+
+    mismatched = sum(len(members) for crs, members in groups.items() if crs != reference)
+    cached = sum(row['cached'] for row in results)
+    console.print(f"[dim]{len(results):,} layers in {elapsed * 1000:.0f} ms ({cached:,} unchanged, reused from cache)[/dim]")
+    if mismatched or errors:
+        console.print(f"[bold red]❌ {mismatched:,} layer(s) not in {reference}, {len(errors):,} unreadable.[/bold red]")
+        raise typer.Exit(code=1)
+    console.print(f"[bold green]✅ All {'resolved ' if unresolved else ''}layers use {reference}.[/bold green]")
 
 @app.command()
 def wizard():
@@ -61,24 +169,32 @@ def wizard():
 @app.command()
 def simulate(
     profile: str = typer.Option("data/profiles/ona.json", help="Path to basin JSON profile"), 
-    depth: float = typer.Option(2.0, help="Water depth in meters")
+    depth: float = typer.Option(2.0, help="Water depth in meters"),
+    server: str = typer.Option(None, envvar="HYDRO_SERVER", help="Route through a running `hydro serve` (http://host:port or unix:///path)")
 ):
     """Run a hydraulic simulation using a basin profile."""
     console.print(f"[bold yellow]⚙️ Running simulation...[/bold yellow]")
     
     try:
-        engine = HydraulicEngine(profile)
-        result = engine.calculate_discharge(depth)
+        if server:
+            result = _remote(server, "discharge", profile=profile, depth=depth)
+            basin_name = result.pop('basin_name')
+        else:
+            from hydro.simulation.engine import HydraulicEngine
+
+            engine = HydraulicEngine(profile)
+            result = engine.calculate_discharge(depth)
+            basin_name = engine.profile['basin_name']
         
         # Logic to handle dictionary output from advanced engine
         if isinstance(result, dict):
-            q = result['discharge']
-            details = f"\nVelocity: {result['velocity']} m/s | Area: {result['area']} m²"
+            q = round(result['discharge'], 2)
+            details = f"\nVelocity: {result['velocity']:.2f} m/s | Area: {result['area']:.2f} m²"
         else:
             q = result
             details = ""
 
-        console.print(f"\n[bold cyan]Basin:[/bold cyan] {engine.profile['basin_name']}")
+        console.print(f"\n[bold cyan]Basin:[/bold cyan] {basin_name}")
         console.print(f"[bold cyan]Depth:[/bold cyan] {depth}m")
         
         console.print(Panel(
@@ -90,89 +206,338 @@ def simulate(
     except Exception as e:
         console.print(f"[bold red]❌ Simulation failed:[/bold red] {e}")
 
+def _remote(server: str, operation: str, **params):
+    """Run one engine operation on a `hydro serve` instance."""
+    from hydro.service.client import HydroClient, ServerError
+
+    client = HydroClient(server)
+    try:
+        return client.call(operation, **params)
+    except (OSError, ServerError) as e:
+        console.print(f"[bold red]❌ Server {server} failed:[/bold red] {e}")
+        raise typer.Exit(code=1)
+    finally:
+        client.close()
+
 @app.command()
 def hazard(
     csv_file: str, 
-    threshold: float = typer.Option(4.0, help="Hazard threshold in meters")
+    threshold: float = typer.Option(4.0, help="Hazard threshold in meters"),
+    top: int = typer.Option(20, help="Stations to show in the terminal (worst first)"),
+    output: str = typer.Option(None, help="Write the full per-station result (.csv, .parquet or .json)"),
+    chunk_size: int = typer.Option(500_000, help="Rows read per chunk"),
+    follow: bool = typer.Option(False, help="Keep watching the file and alert on status changes"),
+    interval: float = typer.Option(2.0, help="Seconds between polls in --follow mode"),
+    checkpoint: str = typer.Option(None, help="Checkpoint file for --follow (default: in the cache folder)"),
+    once: bool = typer.Option(False, help="With --follow: process new readings once and exit")
 ):
     """Generate a high-visibility flood hazard report with Engineering Advice."""
+    if follow:
+        _follow_feed(csv_file, threshold, interval, checkpoint, once)
+        return
+
+    with trace.span("import"):
+        from rich.text import Text
+        from hydro.hazard.report import summarize_levels, generate_styled_report
+        from hydro.hazard.advisor import advise_on_risk
+        from hydro.utils.tables import write_table
+
     console.print(f"[bold magenta]📊 Generating Report for:[/bold magenta] {csv_file}")
     
     try:
-        generate_styled_report(csv_file, threshold)
-        console.print("\n[bold cyan]🧠 AI Engineering Recommendations:[/bold cyan]")
-        
-        df = pd.read_csv(csv_file)
-        for _, row in df.iterrows():
-            if row['level'] > threshold:
-                advice = advise_on_risk(row['station'], row['level'], threshold)
-                console.print(Panel(advice, title=f"Station: {row['station']}", border_style="red"))
+        # One streaming pass: every station aggregated, then classified in bulk
+        with trace.span("summarize"):
+            summary = summarize_levels(csv_file, threshold, chunk_size)
+        generate_styled_report(csv_file, threshold, top=top, summary=summary)
+
+        # Engineering advice only for stations that actually breached
+        with trace.span("advice"):
+            breaching = summary[summary['max_level'] > threshold]
+            advice = [advise_on_risk(station, level, threshold)
+                      for station, level in zip(breaching['station'], breaching['max_level'])]
+
+            console.print("\n[bold cyan]🧠 AI Engineering Recommendations:[/bold cyan]")
+            for station, text in list(zip(breaching['station'], advice))[:top]:
+                console.print(Panel(text, title=f"Station: {station}", border_style="red"))
+            if len(breaching) > top:
+                console.print(f"[dim]+ {len(breaching) - top:,} more breaching stations.[/dim]")
+
+        if output:
+            summary['advice'] = ""
+            summary.loc[breaching.index, 'advice'] = [Text.from_markup(text).plain for text in advice]
+            with trace.span("write", path=output):
+                write_table(summary, output)
+            console.print(f"[bold green]✅ Full result ({len(summary):,} stations) written to {output}[/bold green]")
                 
     except Exception as e:
         console.print(f"[bold red]❌ Report generation failed:[/bold red] {e}")
 
+def _follow_feed(csv_file: str, threshold: float, interval: float, checkpoint, once: bool):
+    """Tail a live gauge CSV, printing advice whenever a station changes status."""
+    from hydro.hazard.follow import GaugeFollower
+
+    follower = GaugeFollower(csv_file, threshold, checkpoint)
+    console.print(f"[bold magenta]📡 Following:[/bold magenta] {csv_file} "
+                  f"(from byte {follower.offset:,}, {len(follower.stations)} known stations)")
+
+    styles = {"HIGH RISK": "red", "WARNING": "yellow", "SAFE": "green"}
+    try:
+        while True:
+            for alert in follower.poll():
+                console.print(Panel(
+                    f"{alert['previous']} → [bold]{alert['status']}[/bold] at {alert['level']:.2f} m\n{alert['advice']}",
+                    title=f"Station: {alert['station']}",
+                    border_style=styles[alert['status']]
+                ))
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        follower.save_checkpoint()
+        console.print(f"\n[dim]Stopped at byte {follower.offset:,}. Checkpoint: {follower.checkpoint_path}[/dim]")
+
 @app.command()
 def visualize(
     profile: str = typer.Option("data/profiles/ona.json", help="Profile to plot"),
-    depth: float = typer.Option(3.0, help="Current water depth")
+    depth: float = typer.Option(3.0, help="Current water depth"),
+    output: str = typer.Option("local_workspace/cross_section.png", help="Image path (single frame)"),
+    rise_to: float = typer.Option(None, help="Render a rising-water sequence from --depth up to this depth"),
+    frames: int = typer.Option(60, help="Frames in the --rise-to sequence"),
+    depths_file: str = typer.Option(None, help="CSV with a 'depth' column: one frame per reading"),
+    frames_dir: str = typer.Option("local_workspace/frames", help="Folder for sequence frames"),
+    workers: int = typer.Option(1, help="Worker processes rendering frame batches"),
+    animation: str = typer.Option(None, help="Assemble the frames into an animation (.gif, .png or .webp)"),
+    fps: float = typer.Option(10.0, help="Animation frame rate")
 ):
     """GENERATE A CROSS-SECTION IMAGE of the river channel."""
+    from hydro.visualization import plotter
+
     console.print(f"[bold yellow]🎨 Generating Digital Twin for:[/bold yellow] {profile}")
     
     with open(profile, 'r') as f:
         data = json.load(f)
-        
-    output = plot_cross_section(data, depth)
-    
+
+    if rise_to is None and depths_file is None:
+        output = plotter.plot_cross_section(data, depth, output=output)
+        console.print(Panel(
+            f"[bold green]Image Saved:[/bold green] {output}\n"
+            f"Open this file to see the hydraulic cross-section.",
+            title="Visualization Complete",
+            border_style="green"
+        ))
+        return
+
+    # Frame sequence: a depth ramp or one frame per gauge reading
+    if depths_file:
+        import pandas as pd
+
+        depths = pd.read_csv(depths_file)['depth'].to_numpy(dtype=float)
+    else:
+        import numpy as np
+
+        depths = np.linspace(depth, rise_to, frames)
+    if len(depths) == 0:
+        console.print(f"[bold red]❌ No depths to render: {depths_file or '--frames'} gives an empty sequence.[/bold red]")
+        raise typer.Exit(code=1)
+
+    start = time.perf_counter()
+    with console.status(f"[bold green]Rendering {len(depths):,} frames on {workers} worker(s)...[/bold green]"):
+        paths = plotter.render_cross_sections(data, depths, frames_dir, workers=workers)
+        movie = plotter.assemble_animation(paths, animation, fps) if animation else None
+    elapsed = time.perf_counter() - start
+
     console.print(Panel(
-        f"[bold green]Image Saved:[/bold green] {output}\n"
-        f"Open this file to see the hydraulic cross-section.",
+        f"[bold green]Frames Saved:[/bold green] {len(paths):,} in {frames_dir} "
+        f"({elapsed:.2f} s, {elapsed / len(paths) * 1000:.1f} ms/frame)"
+        + (f"\n[bold green]Animation:[/bold green] {movie}" if movie else ""),
         title="Visualization Complete",
         border_style="green"
     ))
 
 @app.command()
 def scan_dem(
-    lat: float, 
-    lon: float,
-    dem_file: str = "data/dem/ona_basin.tif"
+    lat: float = typer.Argument(None), 
+    lon: float = typer.Argument(None),
+    dem_file: str = "data/dem/ona_basin.tif",
+    points: str = typer.Option(None, help="CSV of 'lat,lon' points to sample in one batch"),
+    output: str = typer.Option(None, help="Write the batch elevations to this file (.csv/.parquet/.json)"),
+    tile_size: int = typer.Option(256, help="Tile edge (cells) for the batch tile cache"),
+    method: str = typer.Option(None, help="nearest (cell value, default for one point) or bilinear (default for --points)")
 ):
     """Query the Digital Elevation Model (DEM) for ground topology."""
+    from hydro.utils.dem_loader import SAMPLE_METHODS, get_elevation_from_dem
+
+    if method is not None and method not in SAMPLE_METHODS:
+        console.print(f"[bold red]❌ Unknown --method '{method}' (choose from: {', '.join(SAMPLE_METHODS)})[/bold red]")
+        raise typer.Exit(code=1)
+    if points:
+        _scan_dem_batch(points, dem_file, output, tile_size, method or "bilinear")
+        return
+    if lat is None or lon is None:
+        console.print("[bold red]❌ Provide LAT LON (or --points for a batch).[/bold red]")
+        raise typer.Exit(code=1)
+
     console.print(f"[bold blue]🛰️ Connecting to Geospatial Engine...[/bold blue]")
     
     with console.status("[bold green]Sampling Raster Data...[/bold green]"):
-        time.sleep(1.5) # UX Pause
-        elevation = get_elevation_from_dem(lat, lon, dem_file)
+        _pause(1.5)
+        elevation = get_elevation_from_dem(lat, lon, dem_file, method or "nearest")
         
     console.print(Panel(
         f"📍 Coordinates: {lat}, {lon}\n"
-        f"⛰️ Elevation: [bold]{elevation} meters[/bold]\n"
+        f"⛰️ Elevation: [bold]{elevation:.2f} meters[/bold]\n"
         f"📂 Source: {dem_file}",
         title="Geospatial Sampling",
         border_style="blue"
     ))
 
+def _scan_dem_batch(points: str, dem_file: str, output, tile_size: int, method: str = "bilinear"):
+    """Sample every point of a CSV through the tiled DemSampler in one call."""
+    import numpy as np
+    import pandas as pd
+    from hydro.utils.dem_loader import DemSampler, simulated_elevation
+    from hydro.utils.tables import write_table
+
+    df = pd.read_csv(points)
+    console.print(f"[bold blue]🛰️ Sampling {len(df):,} points from[/bold blue] {dem_file}")
+
+    start = time.perf_counter()
+    sampler = DemSampler(tile_size=tile_size)
+    try:
+        df['elevation'] = sampler.sample(dem_file, df['lat'], df['lon'], method)
+        source = dem_file
+    except Exception as e:
+        # Same graceful degradation as the single-point query
+        console.print(f"[yellow][Simulation Mode] Could not read DEM ({e}). Using simulated terrain.[/yellow]")
+        df['elevation'] = simulated_elevation(df['lat'], df['lon'])
+        source = "simulated"
+    finally:
+        sampler.close()
+    elapsed = time.perf_counter() - start
+
+    missing = int(df['elevation'].isna().sum())
+    console.print(Panel(
+        f"📍 Points: {len(df):,} ({missing:,} outside DEM / nodata)\n"
+        f"⛰️ Elevation Range: [bold]{np.nanmin(df['elevation']):.2f} – {np.nanmax(df['elevation']):.2f} meters[/bold]\n"
+        f"🧱 Tiles Read: {sampler.tile_reads:,} in {elapsed * 1000:.1f} ms\n"
+        f"📂 Source: {source}",
+        title="Geospatial Sampling (Batch)",
+        border_style="blue"
+    ))
+    if output:
+        write_table(df, output)
+        console.print(f"[bold green]✅ Elevations written to {output}[/bold green]")
+
+@app.command()
+def inundate(
+    dem_file: str = typer.Option("data/dem/ona_basin.tif", help="DEM raster (.tif, or .npy/.raw with a JSON sidecar)"),
+    stage: float = typer.Option(None, help="Water-surface elevation (same datum as the DEM)"),
+    seed: List[str] = typer.Option(None, help="Seed point 'lat,lon' the flood must connect to (repeatable)"),
+    profile: str = typer.Option("data/profiles/ona.json", help="Profile used when the stage comes from a depth"),
+    depth: float = typer.Option(3.5, help="Channel water depth used when no --stage is given"),
+    contraction: float = typer.Option(None, help="Use the bridge afflux water level for this width ratio"),
+    bed_elevation: float = typer.Option(None, help="Channel bed elevation (default: DEM at the first seed)"),
+    output: str = typer.Option("local_workspace/inundation.npy", help="Mask raster (.npy + sidecar, or .tif)"),
+    tile_size: int = typer.Option(1024, help="Tile edge (cells) processed at a time"),
+    connectivity: int = typer.Option(8, help="Cell connectivity: 4 or 8")
+):
+    """
+    Map the flooded extent connected to the seed points for a water level.
+    """
+    from hydro.hazard.inundation import map_inundation
+    from hydro.utils.dem_loader import get_elevation_from_dem
+
+    seeds = [tuple(float(v) for v in s.split(",")) for s in (seed or [])]
+
+    # 1. Water-surface elevation: explicit, or bed + depth (optionally raised by the bridge afflux)
+    if stage is None:
+        if bed_elevation is None:
+            if not seeds:
+                console.print("[bold red]❌ Provide --stage, --bed-elevation or a --seed to sample the bed from.[/bold red]")
+                raise typer.Exit(code=1)
+            bed_elevation = get_elevation_from_dem(seeds[0][0], seeds[0][1], dem_file)
+        level = depth
+        if contraction is not None:
+            from hydro.simulation.engine import HydraulicEngine
+
+            level = HydraulicEngine(profile).calculate_bridge_afflux(depth, contraction)['new_water_level']
+        stage = bed_elevation + level
+
+    # 2. Tiled connected flood fill
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    start = time.perf_counter()
+    with console.status("[bold green]Flood-filling DEM tiles...[/bold green]"):
+        try:
+            res = map_inundation(dem_file, stage, output, seeds=seeds or None,
+                                 tile_size=tile_size, connectivity=connectivity)
+        except (OSError, ImportError, ValueError) as e:
+            console.print(f"[bold red]❌ Could not map inundation: {e}[/bold red]")
+            raise typer.Exit(code=1)
+    elapsed = time.perf_counter() - start
+
+    console.print(Panel(
+        f"🌊 Stage: [bold]{res['stage']:.2f} m[/bold]\n"
+        f"🗺️ Flooded Area: [bold red]{res['area_m2'] / 1e6:.3f} km²[/bold red] ({res['flooded_cells']:,} cells)\n"
+        f"💧 Volume: [bold yellow]{res['volume_m3']:,.0f} m³[/bold yellow] (mean depth {res['mean_depth']:.2f} m)\n"
+        f"⏱️ Mapped in {elapsed:.2f} s\n"
+        f"📂 Mask: {res['mask']}",
+        title="Inundation Extent",
+        border_style="blue"
+    ))
+
 @app.command()
 def design(
-    target_q: float = typer.Option(..., help="Target Discharge required (m³/s)"),
-    max_depth: float = typer.Option(4.0, help="Maximum allowable depth in meters")
+    target_q: float = typer.Option(None, help="Target Discharge required (m³/s)"),
+    max_depth: float = typer.Option(4.0, help="Maximum allowable depth in meters"),
+    profile: str = typer.Option("data/profiles/ona.json", help="Baseline profile for slope/roughness"),
+    sweep: str = typer.Option(None, help="Grid spec (.json) or case table (.csv) for a parametric sweep"),
+    output: str = typer.Option("local_workspace/design_envelope.csv", help="Sweep results table (.csv or .parquet)"),
+    no_cache: bool = typer.Option(False, help="Skip the result cache and recompute"),
+    server: str = typer.Option(None, envvar="HYDRO_SERVER", help="Route through a running `hydro serve` (http://host:port or unix:///path)")
 ):
     """
     🤖 AUTO-DESIGNER: Solves the Inverse Problem to find the optimal channel width.
     """
+    if sweep:
+        from hydro.simulation.engine import HydraulicEngine
+        from hydro.simulation.design import design_envelope
+
+        # The profile is the baseline for slope/roughness
+        engine = HydraulicEngine(profile)
+        console.print("[bold yellow]📐 Solving Inverse Design Sweep...[/bold yellow]")
+        start = time.perf_counter()
+        summary = design_envelope(sweep, engine.profile, max_depth, output, cache=not no_cache)
+        source = "result cache" if summary['cached'] else "solved"
+        elapsed = time.perf_counter() - start
+
+        console.print(Panel(
+            f"✅ [bold green]DESIGN ENVELOPE COMPLETE[/bold green] in {elapsed:.2f} s ({source})\n"
+            f"Feasible Cases: [bold yellow]{summary['feasible']:,}[/bold yellow] / {summary['cases']:,}\n"
+            f"Results Table: {output}",
+            title="Civil Engineering Auto-Designer",
+            border_style="green"
+        ))
+        return
+
+    if target_q is None:
+        console.print("[bold red]❌ Provide --target-q (or --sweep for a parametric grid).[/bold red]")
+        raise typer.Exit(code=1)
+
     console.print(f"[bold yellow]📐 Solving Inverse Design Problem for Q={target_q} m³/s...[/bold yellow]")
-    
-    # We use the Ona profile as the baseline for slope/roughness
-    engine = HydraulicEngine("data/profiles/ona.json")
-    
-    with console.status("[bold green]Running Newton-Raphson Optimization...[/bold green]"):
-        result = engine.design_optimal_channel(target_q, max_depth)
+
+    with console.status("[bold green]Running Bracketed Root-Finder...[/bold green]"):
+        if server:
+            result = _remote(server, "design", profile=profile, target_q=target_q, max_depth=max_depth)
+        else:
+            from hydro.simulation.engine import HydraulicEngine
+
+            result = HydraulicEngine(profile).design_optimal_channel(target_q, max_depth)
     
     if result.get('status') == "Optimized":
         console.print(Panel(
             f"✅ [bold green]OPTIMAL DESIGN FOUND[/bold green]\n"
-            f"Recommended Width: [bold yellow]{result['optimal_width']} m[/bold yellow]\n"
-            f"Excavation Volume: {result['excavation_area']} m²/unit\n"
+            f"Recommended Width: [bold yellow]{result['optimal_width']:.2f} m[/bold yellow]\n"
+            f"Excavation Volume: {result['excavation_area']:.2f} m²/unit\n"
             f"Constraints: Flow > {target_q} m³/s | Depth < {max_depth} m",
             title="Civil Engineering Auto-Designer",
             border_style="green"
@@ -183,50 +548,586 @@ def design(
 @app.command()
 def stress_test(
     depth: float = typer.Option(3.5, help="Base water depth"),
-    iterations: int = typer.Option(1000, help="Number of Monte Carlo simulations")
+    profile: str = typer.Option("data/profiles/ona.json", help="Path to basin JSON profile"),
+    iterations: int = typer.Option(1000, help="Number of Monte Carlo simulations"),
+    seed: int = typer.Option(None, help="Random seed for reproducible runs"),
+    workers: int = typer.Option(1, help="Worker processes to spread the chunks over"),
+    chunk_size: int = typer.Option(1_000_000, help="Samples per chunk (bounds memory per worker; capped at iterations/64 with --target-ci)"),
+    sampler: str = typer.Option("uniform", help="Sampler: uniform, lhs, sobol or importance"),
+    target_ci: float = typer.Option(None, help="Stop once the 95% CI half-width on failure probability (percentage points) is reached"),
+    no_cache: bool = typer.Option(False, help="Skip the result cache and recompute"),
+    samples_out: str = typer.Option(None, help="Folder to stream every sample to (memory-mapped .npy columns)"),
+    server: str = typer.Option(None, envvar="HYDRO_SERVER", help="Route through a running `hydro serve` (http://host:port or unix:///path)")
 ):
     """
     MONTE CARLO SIMULATION: Predicts failure probability & Plots Histogram.
     """
+    with trace.span("import"):
+        from hydro.simulation.monte_carlo import GRAPH_PATH, SAMPLERS, run_flood_risk_simulation
+
+    if sampler not in SAMPLERS:
+        console.print(f"[bold red]❌ Unknown sampler '{sampler}'. Choose from: {', '.join(SAMPLERS)}[/bold red]")
+        raise typer.Exit(code=1)
+
     console.print(f"[bold magenta]🎲 Running {iterations} Monte Carlo Simulations...[/bold magenta]")
     
     with console.status("[bold magenta]Crunching Statistics & Generating Graph...[/bold magenta]"):
-        result = run_flood_risk_simulation("data/profiles/ona.json", depth, iterations)
-        time.sleep(1)
+        options = dict(seed=seed, workers=workers, chunk_size=chunk_size, sampler=sampler,
+                       target_ci=target_ci, cache=not no_cache, samples_out=samples_out)
+        if server:
+            # The graph lands under this working directory, not the server's
+            result = _remote(server, "stress-test", profile=profile, depth=depth,
+                             iterations=iterations, graph_path=GRAPH_PATH, **options)
+        else:
+            result = run_flood_risk_simulation(profile, depth, iterations, **options)
+        if not result.get('cached'):
+            _pause(1)
 
     risk_color = "green"
     if result['probability'] > 20: risk_color = "yellow"
     if result['probability'] > 50: risk_color = "red"
 
-    console.print(Panel(
-        f"📊 [bold]Failure Probability:[/bold] [{risk_color}]{result['probability']:.1f}%[/{risk_color}]\n"
-        f"🌊 [bold]95th Percentile Flow:[/bold] {result['p95_discharge']:.2f} m³/s\n"
-        f"📈 [bold]Mean Flow:[/bold] {result['mean_discharge']:.2f} m³/s\n"
-        f"🖼️ [bold]Risk Graph Saved:[/bold] {result['graph']}",
-        title="Hydraulic Reliability Analysis",
-        border_style=risk_color
-    ))
+    with trace.span("render"):
+        console.print(Panel(
+            f"📊 [bold]Failure Probability:[/bold] [{risk_color}]{result['probability']:.1f}%[/{risk_color}] "
+            f"(± {result['ci_halfwidth']:.2f}%, {result['evaluations']:,} evaluations, {result['sampler']})\n"
+            f"🌊 [bold]95th Percentile Flow:[/bold] {result['p95_discharge']:.2f} m³/s\n"
+            f"🌊 [bold]99th Percentile Flow:[/bold] {result['p99_discharge']:.2f} m³/s\n"
+            f"📈 [bold]Mean Flow:[/bold] {result['mean_discharge']:.2f} m³/s\n"
+            f"🖼️ [bold]Risk Graph Saved:[/bold] {result['graph']}"
+            + (f"\n🗃️ [bold]Samples Saved:[/bold] {result['samples']} ({result['evaluations']:,} rows)" if result.get('samples') else "")
+            + ("\n♻️ [dim]Served from the result cache[/dim]" if result.get('cached') else ""),
+            title="Hydraulic Reliability Analysis",
+            border_style=risk_color
+        ))
+
+@app.command()
+def sensitivity(
+    depth: float = typer.Option(3.5, help="Base water depth"),
+    profile: str = typer.Option("data/profiles/ona.json", help="Path to basin JSON profile"),
+    samples: int = typer.Option(65_536, help="Base sample size N (N·(d+2) model evaluations)"),
+    param_range: List[str] = typer.Option(None, "--range", help="Parameter range as name=low:high (repeatable), e.g. manning_n=0.025:0.045"),
+    design_q: float = typer.Option(None, help="Flow for the exceedance output (default: capacity at threshold_high)"),
+    bootstrap: int = typer.Option(200, help="Poisson-bootstrap replicates for the confidence intervals"),
+    seed: int = typer.Option(None, help="Random seed for reproducible runs"),
+    chunk_size: int = typer.Option(16_384, help="Base rows per vectorized chunk (bounds memory)"),
+    sampler: str = typer.Option("sobol", help="Sampler: sobol or uniform")
+):
+    """
+    GLOBAL SENSITIVITY: Sobol indices of discharge & exceedance risk per uncertain input.
+    """
+    from rich.table import Table
+    from hydro.simulation.sensitivity import sobol_analysis
+
+    ranges = {}
+    for item in param_range or []:
+        name, _, bounds = item.partition("=")
+        low, _, high = bounds.partition(":")
+        try:
+            ranges[name.strip()] = (float(low), float(high))
+        except ValueError:
+            console.print(f"[bold red]❌ Invalid range '{item}' (expected name=low:high)[/bold red]")
+            raise typer.Exit(code=1)
+
+    console.print(f"[bold magenta]🎯 Saltelli sampling: {samples:,} base rows...[/bold magenta]")
+    start = time.perf_counter()
+    try:
+        result = sobol_analysis(profile, depth, samples, ranges, seed=seed, chunk_size=chunk_size,
+                                bootstrap=bootstrap, sampler=sampler, design_q=design_q)
+    except (ValueError, KeyError) as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        raise typer.Exit(code=1)
+    elapsed = time.perf_counter() - start
+
+    titles = {"discharge": "🌊 Discharge", "exceedance": f"🚨 Exceedance of {result['design_q']:.1f} m³/s"}
+    for output, indices in result['outputs'].items():
+        table = Table(title=titles[output], header_style="bold magenta", border_style="blue")
+        table.add_column("Parameter", style="cyan")
+        table.add_column("Range", justify="right")
+        table.add_column("First-order S₁", justify="right")
+        table.add_column("Total-order Sₜ", justify="right")
+        for i, name in enumerate(result['parameters']):
+            low, high = result['ranges'][name]
+            first_ci = (indices['first_ci'][i][1] - indices['first_ci'][i][0]) / 2
+            total_ci = (indices['total_ci'][i][1] - indices['total_ci'][i][0]) / 2
+            color = "red" if indices['total'][i] >= 0.3 else "yellow" if indices['total'][i] >= 0.05 else "green"
+            table.add_row(
+                name, f"{low:.4g} – {high:.4g}",
+                f"{indices['first'][i]:.3f} [dim]± {first_ci:.3f}[/dim]",
+                f"[{color}]{indices['total'][i]:.3f}[/{color}] [dim]± {total_ci:.3f}[/dim]"
+            )
+        console.print(table)
+        if indices['variance'] == 0:
+            console.print("[yellow]⚠️ Output is constant over these ranges - every index is 0.[/yellow]")
+
+    console.print(
+        f"[bold green]✅ {result['evaluations']:,} evaluations in {elapsed:.2f} s[/bold green] "
+        f"({result['sampler']}, {result['confidence']:.0%} bootstrap intervals)"
+    )
 
 @app.command()
 def bridge_check(
-    depth: float = typer.Option(3.5, help="Upstream water depth"),
-    contraction: float = typer.Option(0.7, help="Bridge width ratio (0.7 = 30% blocked)")
+    depth: List[float] = typer.Option(None, help="Upstream water depth (repeatable, default 3.5)"),
+    contraction: List[float] = typer.Option(None, help="Bridge width ratio, 0.7 = 30% blocked (repeatable, default 0.7)"),
+    profile: str = typer.Option("data/profiles/ona.json", help="Basin profile (channel defaults for the inventory)"),
+    inventory: str = typer.Option(None, help="Bridge inventory (.csv/.parquet) to screen every bridge x ratio x depth"),
+    output: str = typer.Option(None, help="Stream every screened case to this file (.csv or .parquet)"),
+    top: int = typer.Option(20, help="Worst cases to rank in the terminal"),
+    server: str = typer.Option(None, envvar="HYDRO_SERVER", help="Route through a running `hydro serve` (http://host:port or unix:///path)")
 ):
     """
     Check Backwater Effect (Afflux) at a bridge constriction.
     """
-    engine = HydraulicEngine("data/profiles/ona.json")
-    res = engine.calculate_bridge_afflux(depth, contraction)
+    depths = depth or [3.5]
+    ratios = contraction or [0.7]
+
+    if inventory or len(depths) > 1 or len(ratios) > 1:
+        _screen_bridges(profile, inventory, depths, ratios, output, top)
+        return
+
+    if server:
+        res = _remote(server, "afflux", profile=profile, depth=depths[0], contraction=ratios[0])
+    else:
+        from hydro.simulation.engine import HydraulicEngine
+
+        engine = HydraulicEngine(profile)
+        res = engine.calculate_bridge_afflux(depths[0], ratios[0])
     
     console.print(Panel(
         f"🌉 [bold]Bridge Impact Analysis[/bold]\n"
-        f"Rise in Water Level (Afflux): [bold red]+{res['afflux']} m[/bold red]\n"
-        f"Velocity Under Bridge: [bold yellow]{res['bridge_velocity']} m/s[/bold yellow]\n"
-        f"New Upstream Level: {res['new_water_level']} m",
+        f"Rise in Water Level (Afflux): [bold red]+{res['afflux']:.3f} m[/bold red]\n"
+        f"Velocity Under Bridge: [bold yellow]{res['bridge_velocity']:.2f} m/s[/bold yellow]\n"
+        f"New Upstream Level: {res['new_water_level']:.3f} m",
         title="Hydraulic Constriction (Bernoulli)",
         border_style="cyan"
     ))
 
+def _screen_bridges(profile: str, inventory, depths, ratios, output, top: int):
+    """Vectorized afflux screen over an inventory (or the profile's own bridge), worst cases first."""
+    import pandas as pd
+    from rich.table import Table
+    from hydro.simulation.bridges import CHANNEL_COLUMNS, load_inventory, screen_bridges, worst_cases
+    from hydro.utils.tables import TableStream
+
+    with open(profile, 'r') as f:
+        data = json.load(f)
+    if inventory:
+        try:
+            bridges = load_inventory(inventory, data)
+        except (OSError, ValueError) as e:
+            console.print(f"[bold red]❌ Could not read bridge inventory: {e}[/bold red]")
+            raise typer.Exit(code=1)
+    else:
+        # The profile's own channel as a one-bridge inventory
+        bridges = pd.DataFrame([{"bridge_id": data['basin_name'], **{col: data.get(col, 0.0) for col in CHANNEL_COLUMNS}}])
+    console.print(f"[bold blue]🌉 Screening {len(bridges):,} bridges[/bold blue] "
+                  f"x {len(ratios) if 'contraction' not in bridges else 1} ratios x {len(depths)} depths")
+
+    start = time.perf_counter()
+    worst, cases = None, 0
+    stream = TableStream(output) if output else None
+    try:
+        for chunk in screen_bridges(bridges, depths, ratios):
+            if stream:
+                stream.write(chunk)
+            worst = worst_cases(worst, chunk, top)
+            cases += len(chunk)
+    finally:
+        if stream:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    if worst is None:
+        console.print("[yellow]⚠️ No bridges to screen - the inventory has no rows.[/yellow]")
+        return
+
+    table = Table(title="🌉 Worst Bridge Afflux Cases", header_style="bold magenta", border_style="cyan")
+    for column in ("Bridge", "Depth (m)", "Ratio", "Afflux (m)", "Bridge Velocity (m/s)", "New Level (m)"):
+        table.add_column(column, justify="right")
+    for row in worst.itertuples():
+        table.add_row(
+            str(row.bridge_id), f"{row.depth:.2f}", f"{row.contraction:.2f}",
+            f"[bold red]+{row.afflux:.3f}[/bold red]", f"{row.bridge_velocity:.2f}", f"{row.new_water_level:.3f}"
+        )
+    console.print(table)
+    console.print(f"[dim]{cases:,} cases screened in {elapsed * 1000:.1f} ms.[/dim]")
+    if stream:
+        console.print(f"[bold green]✅ Every case written to {output}[/bold green]")
+
+@app.command()
+def rating_curve(
+    profile: str = typer.Option("data/profiles/ona.json", help="Path to basin JSON profile"),
+    flow: List[float] = typer.Option(None, help="Discharge to convert to normal depth (repeatable)"),
+    flows_file: str = typer.Option(None, help="CSV with a 'discharge' column to convert in bulk"),
+    output: str = typer.Option(None, help="Write the converted depths to this CSV"),
+    max_depth: float = typer.Option(None, help="Top of the table in meters (default 4x threshold)"),
+    points: int = typer.Option(4096, help="Number of table points"),
+    rebuild: bool = typer.Option(False, help="Ignore the cached table and recompute it")
+):
+    """
+    STAGE-DISCHARGE RATING CURVE: Builds (or reuses) the cached table and solves Q -> depth.
+    """
+    import numpy as np
+    import pandas as pd
+    from rich.table import Table
+    from hydro.simulation.rating import RatingCurve
+
+    with open(profile, 'r') as f:
+        data = json.load(f)
+
+    start = time.perf_counter()
+    curve = RatingCurve.load(data, max_depth, points, rebuild=rebuild)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    table = Table(title=f"📈 Rating Curve: {data['basin_name']}", header_style="bold cyan", border_style="blue")
+    table.add_column("Depth (m)", justify="right")
+    table.add_column("Discharge (m³/s)", justify="right")
+    for i in np.linspace(0, len(curve.depths) - 1, 11).astype(int):
+        table.add_row(f"{curve.depths[i]:.2f}", f"{curve.discharges[i]:.2f}")
+    console.print(table)
+    console.print(f"[dim]{len(curve.depths)} points up to {curve.max_depth:.2f} m, loaded in {load_ms:.1f} ms[/dim]")
+
+    flows = np.asarray(flow or [], dtype=float)
+    if flows_file:
+        flows = np.concatenate([flows, pd.read_csv(flows_file)['discharge'].to_numpy(dtype=float)])
+    if flows.size == 0:
+        return
+
+    start = time.perf_counter()
+    depths = curve.normal_depth(flows)
+    solve_ms = (time.perf_counter() - start) * 1000
+
+    if output:
+        pd.DataFrame({"discharge": flows, "normal_depth": depths}).to_csv(output, index=False)
+        console.print(f"[bold green]✅ {flows.size:,} depths written to {output}[/bold green] ({solve_ms:.1f} ms)")
+    else:
+        for q, y in zip(flows, depths):
+            depth_text = f"{y:.3f} m" if np.isfinite(y) else "[red]above table - raise --max-depth[/red]"
+            console.print(f"🌊 Q = {q:.2f} m³/s  →  Normal Depth: [bold]{depth_text}[/bold]")
+
+@app.command()
+def backwater(
+    profile: str = typer.Option("data/profiles/ona_reach.json", help="Basin profile with a 'stations' list"),
+    flow: List[float] = typer.Option(None, help="Discharge scenario in m³/s (repeatable)"),
+    flows_file: str = typer.Option(None, help="CSV with a 'discharge' column of scenarios"),
+    downstream_stage: float = typer.Option(None, help="Water level at the last station (default: normal depth)"),
+    output: str = typer.Option(None, help="Write every flow x station result (.csv, .parquet or .json)")
+):
+    """
+    GRADUALLY-VARIED FLOW: Standard-step water-surface profiles along a multi-section reach.
+    """
+    import numpy as np
+    import pandas as pd
+    from rich.table import Table
+    from hydro.simulation.engine import HydraulicEngine
+
+    engine = HydraulicEngine(profile)
+    flows = np.asarray(flow or [], dtype=float)
+    if flows_file:
+        flows = np.concatenate([flows, pd.read_csv(flows_file)['discharge'].to_numpy(dtype=float)])
+    if flows.size == 0:
+        console.print("[bold red]❌ Provide at least one --flow or a --flows-file.[/bold red]")
+        raise typer.Exit(code=1)
+
+    start = time.perf_counter()
+    try:
+        res = engine.backwater_profile(flows, downstream_stage)
+    except (KeyError, ValueError) as e:
+        console.print(f"[bold red]❌ Invalid reach profile: {e}[/bold red]")
+        raise typer.Exit(code=1)
+    elapsed = time.perf_counter() - start
+
+    # Terminal view: the largest flow, at most ~12 stations
+    worst = int(np.argmax(flows))
+    table = Table(title=f"🌊 Backwater Profile: Q = {flows[worst]:.2f} m³/s", header_style="bold cyan", border_style="blue")
+    for column in ("Chainage (m)", "Bed (m)", "Depth (m)", "Water Level (m)", "Velocity (m/s)", "Froude"):
+        table.add_column(column, justify="right")
+    n_sections = res['chainage'].size
+    for i in np.unique(np.linspace(0, n_sections - 1, min(n_sections, 12)).astype(int)):
+        depth_text = f"{res['depth'][worst, i]:.3f}" + (" [yellow](critical)[/yellow]" if res['critical'][worst, i] else "")
+        table.add_row(
+            f"{res['chainage'][i]:.1f}", f"{res['bed_elevation'][i]:.2f}", depth_text,
+            f"{res['water_level'][worst, i]:.3f}", f"{res['velocity'][worst, i]:.2f}", f"{res['froude'][worst, i]:.2f}"
+        )
+    console.print(table)
+    console.print(
+        f"[dim]{flows.size:,} flows x {n_sections:,} sections solved in {elapsed * 1000:.1f} ms; "
+        f"{int(res['critical'].sum()):,} section results clamped to critical depth.[/dim]"
+    )
+
+    if output:
+        from hydro.utils.tables import write_table
+
+        df = pd.DataFrame({
+            "discharge": np.repeat(flows, n_sections),
+            "chainage": np.tile(res['chainage'], flows.size),
+            "bed_elevation": np.tile(res['bed_elevation'], flows.size),
+            **{key: res[key].ravel() for key in ("depth", "water_level", "velocity", "froude", "critical")}
+        })
+        write_table(df, output)
+        console.print(f"[bold green]✅ {len(df):,} profile points written to {output}[/bold green]")
+
+@app.command()
+def route(
+    profile: str = typer.Option("data/profiles/ona_reach.json", help="Basin profile (a 'stations' list is routed as surveyed)"),
+    inflow: str = typer.Option(None, help="Inflow hydrographs: .npy (steps x members) or CSV with one column per member"),
+    peak: List[float] = typer.Option(None, help="Synthetic inflow peak in m³/s (repeatable, one member each)"),
+    base_flow: float = typer.Option(5.0, help="Synthetic baseflow (m³/s)"),
+    time_to_peak: float = typer.Option(6.0, help="Synthetic time to peak (hours)"),
+    hours: float = typer.Option(48.0, help="Synthetic record length (hours)"),
+    dt: float = typer.Option(900.0, help="Time step of the record (seconds)"),
+    method: str = typer.Option("muskingum-cunge", help="muskingum-cunge (from the channel) or muskingum (--k-hours, --x)"),
+    k_hours: float = typer.Option(None, help="Muskingum travel time K for the whole channel (hours)"),
+    x: float = typer.Option(0.2, help="Muskingum weighting X (0 - 0.5)"),
+    length: float = typer.Option(10_000.0, help="Channel length (m) for a profile without stations"),
+    stations: int = typer.Option(5, help="Report stations for a profile without stations"),
+    chunk_steps: int = typer.Option(4096, help="Time steps per streamed chunk (bounds memory)"),
+    output: str = typer.Option(None, help="Write every member x station peak (.csv, .parquet or .json)")
+):
+    """
+    FLOOD ROUTING: Routes hydrograph ensembles down the reach (peak flow, stage & timing per station).
+    """
+    import numpy as np
+    from rich.table import Table
+    from hydro.simulation.engine import HydraulicEngine
+    from hydro.simulation.routing import hydrograph_chunks, route_hydrographs, synthetic_hydrographs
+
+    if inflow:
+        source = inflow
+    elif peak:
+        source = synthetic_hydrographs(peak, base_flow, time_to_peak, hours, dt)
+    else:
+        console.print("[bold red]❌ Provide an --inflow file or at least one --peak.[/bold red]")
+        raise typer.Exit(code=1)
+
+    start = time.perf_counter()
+    try:
+        res = route_hydrographs(hydrograph_chunks(source, chunk_steps), HydraulicEngine(profile).profile, dt=dt,
+                                method=method, length=length, stations=stations, k_hours=k_hours, x=x)
+    except (KeyError, ValueError) as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        raise typer.Exit(code=1)
+    elapsed = time.perf_counter() - start
+
+    # Terminal view: ensemble mean (and max) per station, at most ~12 stations
+    table = Table(title=f"🌊 Flood Routing: {res['members']:,} hydrographs", header_style="bold cyan", border_style="blue")
+    for column in ("Station", "Chainage (m)", "Peak Q (m³/s)", "Max Q (m³/s)", "Peak Stage (m)", "Lag (h)", "Attenuation"):
+        table.add_column(column, justify="right")
+    n_stations = res['chainage'].size
+    for i in np.unique(np.linspace(0, n_stations - 1, min(n_stations, 12)).astype(int)):
+        lag = res['peak_time'][:, i] - res['inflow_peak_time']
+        attenuation = 1 - res['peak_flow'][:, i] / res['inflow_peak']
+        table.add_row(
+            res['stations'][i], f"{res['chainage'][i]:.0f}",
+            f"{res['peak_flow'][:, i].mean():.2f}", f"{res['peak_flow'][:, i].max():.2f}",
+            f"{res['peak_stage'][:, i].mean():.3f}", f"{lag.mean():.2f}", f"{attenuation.mean():.1%}"
+        )
+    console.print(table)
+    detail = f"Q_ref = {res['q_ref']:.1f} m³/s" if res['q_ref'] is not None else f"K = {k_hours:g} h, X = {x:g}"
+    console.print(
+        f"[dim]{res['members']:,} members x {res['steps']:,} steps x {res['pieces']} sub-reaches routed in "
+        f"{elapsed * 1000:.1f} ms ({res['method']}, {detail}).[/dim]"
+    )
+
+    if output:
+        import pandas as pd
+        from hydro.utils.tables import write_table
+
+        df = pd.DataFrame({
+            "member": np.repeat(np.arange(res['members']), n_stations),
+            "station": np.tile(res['stations'], res['members']),
+            "chainage": np.tile(res['chainage'], res['members']),
+            **{key: res[key].ravel() for key in ("peak_flow", "peak_time", "peak_depth", "peak_stage")},
+            "lag": (res['peak_time'] - res['inflow_peak_time'][:, None]).ravel(),
+        })
+        write_table(df, output)
+        console.print(f"[bold green]✅ {len(df):,} station peaks written to {output}[/bold green]")
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(DEFAULT_PORT, help="TCP port"),
+    socket: str = typer.Option(None, help="Listen on this Unix socket instead of TCP"),
+    workers: int = typer.Option(2, help="Worker processes for Monte Carlo jobs")
+):
+    """
+    ENGINE SERVER: Keeps profiles & engines warm and batches concurrent requests.
+    """
+    from hydro.service.server import serve as run_server
+
+    where = f"unix://{socket}" if socket else f"http://{host}:{port}"
+    console.print(Panel(
+        f"🛰️ [bold]Hydro-Flow engine server[/bold] listening on [bold cyan]{where}[/bold cyan]\n"
+        f"Endpoints: POST /discharge /afflux /design /stress-test · GET /health\n"
+        f"Point the CLI at it with [cyan]--server {where}[/cyan] or HYDRO_SERVER={where}",
+        border_style="cyan"
+    ))
+    try:
+        run_server(host, port, socket, workers)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Server stopped.[/dim]")
+
+@app.command()
+def batch(
+    profiles: str = typer.Argument(..., help="Profile directory (every *.json) or a glob like 'data/profiles/*.json'"),
+    manifest: str = typer.Option(..., help="Scenario manifest (JSON): depths, afflux, design, stress_test"),
+    output: str = typer.Option("local_workspace/batch_results.csv", help="Consolidated results (.csv, .parquet or .json)"),
+    workers: int = typer.Option(None, help="Worker processes (default: all cores)"),
+    graph_dir: str = typer.Option("local_workspace/batch_graphs", help="Folder for stress-test histograms")
+):
+    """
+    NETWORK ASSESSMENT: Runs a scenario manifest over many basin profiles in parallel.
+    """
+    from rich.progress import Progress
+    from rich.table import Table
+    from hydro.simulation.batch import find_profiles, load_manifest, plan_jobs, run_batch, results_table
+    from hydro.utils.tables import write_table
+
+    paths = find_profiles(profiles)
+    if not paths:
+        console.print(f"[bold red]❌ No profiles found in {profiles}[/bold red]")
+        raise typer.Exit(code=1)
+    try:
+        scenarios = load_manifest(manifest)
+    except (OSError, ValueError) as e:
+        console.print(f"[bold red]❌ Invalid manifest: {e}[/bold red]")
+        raise typer.Exit(code=1)
+
+    try:
+        jobs, rows = plan_jobs(paths, scenarios, graph_dir)
+    except ValueError as e:
+        console.print(f"[bold red]❌ {e}[/bold red]")
+        raise typer.Exit(code=1)
+    console.print(f"[bold blue]🗺️ {len(paths)} basins → {len(jobs)} jobs on {workers or os.cpu_count()} worker(s)[/bold blue]")
+
+    start = time.perf_counter()
+    with Progress(console=console) as progress:
+        bar = progress.add_task("[cyan]Assessing basins...", total=len(jobs))
+        rows += run_batch(jobs, workers, on_done=lambda _: progress.advance(bar))
+    elapsed = time.perf_counter() - start
+
+    results = results_table(rows)
+    write_table(results, output)
+
+    # Per-basin headline: worst of each scenario kind
+    table = Table(title="🌊 Network Assessment", header_style="bold magenta", border_style="blue")
+    for column in ("Basin", "Max Q (m³/s)", "Worst Afflux (m)", "Max Width (m)", "Max Failure (%)", "Errors"):
+        table.add_column(column, justify="right")
+    for basin, group in results.groupby("basin", sort=True):
+        errors = group['status'].astype(str).str.startswith("Error").sum() if "status" in group else 0
+        table.add_row(str(basin), *(_worst(group, column) for column in ("discharge", "afflux", "optimal_width", "probability")),
+                      f"[red]{errors}[/red]" if errors else "0")
+    console.print(table)
+    console.print(f"[bold green]✅ {len(results):,} result rows written to {output}[/bold green] ({elapsed:.2f} s)")
+
+def _worst(group, column: str):
+    """Largest value of a result column for one basin, formatted ("-" when absent)."""
+    values = group[column].dropna() if column in group else []
+    return f"{values.max():.2f}" if len(values) else "-"
+
+cache_app = typer.Typer(help="Inspect and purge the on-disk caches (results, rating tables, follow checkpoints).")
+app.add_typer(cache_app, name="cache")
+
+@cache_app.command("info")
+def cache_info():
+    """Show what the caches hold and the result-cache limits."""
+    from rich.table import Table
+    from hydro.utils.cache import ResultCache, cache_dir, cache_usage
+
+    table = Table(title="🗄️ Hydro-Flow Caches", header_style="bold cyan", border_style="blue")
+    table.add_column("Section")
+    table.add_column("Files", justify="right")
+    table.add_column("Size (MB)", justify="right")
+    for section, (files, size) in cache_usage().items():
+        table.add_row(section, f"{files:,}", f"{size / 1e6:.2f}")
+    console.print(table)
+
+    results = ResultCache()
+    entries = results.entries()
+    console.print(
+        f"📂 Root: {cache_dir()}\n"
+        f"♻️ Result entries: {len(entries):,} "
+        f"(limit {results.max_bytes / 1e6:,.0f} MB, unused for {results.max_age / 86400:g} days expire)"
+    )
+
+@cache_app.command("purge")
+def cache_purge(
+    older_than: float = typer.Option(None, help="Only drop results unused for this many days"),
+    all_sections: bool = typer.Option(False, "--all", help="Also clear rating tables and follow checkpoints")
+):
+    """Remove cached results (or everything with --all)."""
+    import shutil
+    from hydro.utils.cache import ResultCache, cache_dir
+
+    removed = ResultCache().purge(None if older_than is None else older_than * 86400)
+    console.print(f"[bold green]🧹 Removed {removed:,} cached results.[/bold green]")
+    if all_sections:
+        for section in cache_dir().iterdir():
+            if section.is_dir() and section.name != "results":
+                shutil.rmtree(section, ignore_errors=True)
+                console.print(f"[bold green]🧹 Cleared {section.name}/[/bold green]")
+
+@app.command()
+def bench(
+    scale: str = typer.Option("small", help="Problem size: small, medium or large"),
+    only: List[str] = typer.Option(None, help="Run just these benchmarks (repeatable)"),
+    repeat: int = typer.Option(3, help="Timed runs per benchmark (best one counts)"),
+    save: str = typer.Option(None, help="Write the results as a JSON baseline"),
+    compare: str = typer.Option(None, help="Baseline JSON to compare against (exit 1 on regression)"),
+    tolerance: float = typer.Option(0.25, help="Allowed throughput drop / memory growth vs the baseline (0.25 = 25%)"),
+    workdir: str = typer.Option(None, help="Folder for the synthetic inputs (default: a temporary folder)")
+):
+    """
+    PERFORMANCE SUITE: Throughput & peak memory of every engine hot path on synthetic data.
+    """
+    import tempfile
+    from rich.table import Table
+    from hydro.utils import bench as suite
+
+    baseline = suite.load_results(compare) if compare else None
+    console.print(f"[bold magenta]⏱️ Benchmarking at scale '{scale}' ({repeat} runs each)...[/bold magenta]")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with console.status("[bold magenta]Generating synthetic data & timing...[/bold magenta]") as status:
+            try:
+                results = suite.run_suite(
+                    workdir or tmp, scale, only, repeat,
+                    on_result=lambda name, _: status.update(f"[bold magenta]Finished {name}...[/bold magenta]")
+                )
+                verdicts = suite.compare(results, baseline, tolerance) if baseline else {}
+            except ValueError as e:
+                console.print(f"[bold red]❌ {e}[/bold red]")
+                raise typer.Exit(code=1)
+
+    styles = {"ok": "[green]ok[/green]", "faster": "[bold green]🚀 faster[/bold green]", "new": "[dim]new[/dim]",
+              "slower": "[bold red]🐢 slower[/bold red]", "heavier": "[bold red]🐘 heavier[/bold red]"}
+    table = Table(title=f"⏱️ Benchmarks ({scale})", header_style="bold magenta", border_style="blue")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Items", justify="right")
+    table.add_column("Best (ms)", justify="right")
+    table.add_column("Throughput (/s)", justify="right")
+    table.add_column("Peak (MB)", justify="right")
+    if baseline:
+        table.add_column("vs Baseline", justify="right")
+        table.add_column("Status", justify="center")
+    for name, result in results['results'].items():
+        row = [name, f"{result['items']:,} {result['unit']}", f"{result['best_s'] * 1000:.1f}",
+               f"{result['throughput']:,.0f}", f"{result['peak_mb']:.1f}"]
+        if baseline:
+            verdict = verdicts[name]
+            row += [f"{verdict['speed']:.2f}x" if 'speed' in verdict else "-", styles[verdict['status']]]
+        table.add_row(*row)
+    console.print(table)
+
+    if save:
+        console.print(f"[bold green]💾 Baseline saved to {suite.save_results(results, save)}[/bold green]")
+    regressions = [name for name, verdict in verdicts.items() if verdict['status'] in ("slower", "heavier")]
+    if regressions:
+        console.print(f"[bold red]🚨 Regressions beyond {tolerance:.0%}: {', '.join(regressions)}[/bold red]")
+        raise typer.Exit(code=1)
+    if baseline:
+        console.print("[bold green]✅ No regressions against the baseline.[/bold green]")
+
 @app.command()
 def test_suite():
     """Run the automated engineering validation suite."""
@@ -1,31 +1,373 @@
+import glob
+import json
 import os
+import re
+import struct
+import threading
+from pathlib import Path
 
-# Try to import heavy tools, but don't crash if they are missing
-try:
-    import rasterio
-    import geopandas as gpd
-    HAS_GEO_TOOLS = True
-except ImportError:
-    HAS_GEO_TOOLS = False
+# Layers the header readers understand
+VECTOR_SUFFIXES = (".geojson",)
+RASTER_SUFFIXES = (".tif", ".tiff")
+SHAPE_SUFFIXES = (".shp",)
+SUPPORTED = VECTOR_SUFFIXES + RASTER_SUFFIXES + SHAPE_SUFFIXES
+
+# RFC 7946: GeoJSON without a "crs" member is WGS 84 (lon/lat)
+GEOJSON_DEFAULT = "EPSG:4326"
+
+# Bytes read per step while scanning GeoJSON
+BLOCK_SIZE = 64 * 1024
+
+# Label prefix of a .prj whose WKT maps to no EPSG code (reported apart, not as a mismatch)
+UNRESOLVED = "Unresolved"
+
+# Bump when readers change what they report (invalidates the header cache)
+HEADER_VERSION = 2
+
+# --- GeoJSON -------------------------------------------------------------------
+
+_SPECIAL = re.compile(rb'["\[\]{}:]')
+_STRING_END = re.compile(rb'(?:[^"\\]|\\.)*"', re.DOTALL)
+
+def _normalize_crs_name(name: str):
+    """'urn:ogc:def:crs:EPSG::32631' / 'EPSG:32631' / CRS84 URNs -> 'EPSG:32631' / 'EPSG:4326'."""
+    if re.search(r"CRS84$", name, re.IGNORECASE):
+        return "EPSG:4326"  # Same datum and units as EPSG:4326, only the axis order differs
+    match = re.search(r"EPSG:{1,2}(?:[\d.]*:)?(\d+)$", name, re.IGNORECASE)
+    return f"EPSG:{match.group(1)}" if match else name
+
+def _geojson_crs_value(value):
+    if not isinstance(value, dict):
+        raise ValueError("Malformed 'crs' member")
+    properties = value.get("properties") or {}
+    if value.get("type") == "name" and "name" in properties:
+        return _normalize_crs_name(str(properties['name']))
+    if value.get("type") in ("EPSG", "epsg") and "code" in properties:
+        return f"EPSG:{properties['code']}"
+    return json.dumps(value, sort_keys=True)
+
+def read_geojson_crs(path: str):
+    """
+    CRS of a GeoJSON file from its top-level "crs" member, read as a stream.
+
+    Only strings and brackets are tokenized (numbers are never parsed), and
+    scanning stops as soon as the member is found - writers put it before
+    "features", so usually only the first block is read. Returns
+    (crs, declared): without a "crs" member (or with "crs": null) the
+    RFC 7946 default applies.
+    """
+    with open(path, 'rb') as f:
+        # One block in memory at a time: a refill replaces the consumed buffer
+        buffer, pos, depth = f.read(BLOCK_SIZE), 0, 0
+        last_string = None
+        while True:
+            match = _SPECIAL.search(buffer, pos)
+            if match is None:
+                more = f.read(BLOCK_SIZE)
+                if not more:
+                    break
+                buffer, pos = more, 0
+                continue
+            token, pos = match.group(), match.end()
+
+            if token == b'"':
+                end = _STRING_END.match(buffer, pos)
+                while end is None:
+                    more = f.read(BLOCK_SIZE)
+                    if not more:
+                        raise ValueError("Unterminated string")
+                    buffer, pos = buffer[pos - 1:] + more, 1
+                    end = _STRING_END.match(buffer, pos)
+                last_string = buffer[pos:end.end() - 1] if depth == 1 else None
+                pos = end.end()
+            elif token == b':':
+                if last_string == b"crs":
+                    # The member value is small: decode it straight from the buffer
+                    text = (buffer[pos:] + f.read(BLOCK_SIZE)).decode("utf-8", errors="replace")
+                    value, _ = json.JSONDecoder().raw_decode(text.lstrip())
+                    if value is None:
+                        return GEOJSON_DEFAULT, False  # "crs": null (GeoJSON 2008) means the default
+                    return _geojson_crs_value(value), True
+                last_string = None
+            elif token in (b'{', b'['):
+                depth += 1
+                last_string = None
+            else:
+                depth -= 1
+                if depth == 0:
+                    break
+    return GEOJSON_DEFAULT, False
+
+# --- GeoTIFF -------------------------------------------------------------------
+
+# TIFF field types -> (struct code, size)
+_TIFF_TYPES = {1: ("B", 1), 2: ("s", 1), 3: ("H", 2), 4: ("I", 4), 5: ("II", 8), 6: ("b", 1),
+               7: ("B", 1), 8: ("h", 2), 9: ("i", 4), 11: ("f", 4), 12: ("d", 8), 16: ("Q", 8), 17: ("q", 8)}
+
+GEO_KEY_DIRECTORY = 34735
+GEO_DOUBLE_PARAMS = 34736
+GEO_ASCII_PARAMS = 34737
+
+# GeoKey ids
+GT_MODEL_TYPE = 1024
+GT_CITATION = 1026
+GEOGRAPHIC_TYPE = 2048
+GEOG_CITATION = 2049
+PROJECTED_CS_TYPE = 3072
+PCS_CITATION = 3073
+USER_DEFINED = 32767
+
+def _tiff_tags(f, wanted):
+    """Values of the `wanted` tags of the first IFD (reads the header and that IFD only)."""
+    header = f.read(16)
+    order = {b"II": "<", b"MM": ">"}.get(header[:2])
+    if order is None:
+        raise ValueError("Not a TIFF file")
+    magic = struct.unpack(order + "H", header[2:4])[0]
+    if magic == 42:
+        ifd, count_fmt, entry_fmt, entry_size, inline = struct.unpack(order + "I", header[4:8])[0], "H", "HHI", 12, 4
+    elif magic == 43:
+        ifd, count_fmt, entry_fmt, entry_size, inline = struct.unpack(order + "Q", header[8:16])[0], "Q", "HHQ", 20, 8
+    else:
+        raise ValueError("Not a TIFF file")
+
+    f.seek(ifd)
+    count_size = struct.calcsize(count_fmt)
+    entries = struct.unpack(order + count_fmt, f.read(count_size))[0]
+    table = f.read(entries * entry_size)
+    tags = {}
+    for i in range(entries):
+        raw = table[i * entry_size:(i + 1) * entry_size]
+        tag, kind, count = struct.unpack(order + entry_fmt, raw[:struct.calcsize(entry_fmt)])
+        if tag not in wanted or kind not in _TIFF_TYPES:
+            continue
+        code, size = _TIFF_TYPES[kind]
+        data = raw[-inline:]
+        if size * count > inline:
+            offset = struct.unpack(order + ("I" if inline == 4 else "Q"), data)[0]
+            f.seek(offset)
+            data = f.read(size * count)
+        data = data[:size * count]
+        if kind == 2:
+            tags[tag] = data.decode("latin-1")
+        else:
+            tags[tag] = struct.unpack(order + code * count, data)
+    return tags
+
+def read_geotiff_crs(path: str):
+    """
+    CRS of a GeoTIFF from its GeoKeys (EPSG code of the projected or
+    geographic system, else the citation); pixel data is never read.
+    Returns (crs, declared).
+    """
+    with open(path, 'rb') as f:
+        tags = _tiff_tags(f, {GEO_KEY_DIRECTORY, GEO_DOUBLE_PARAMS, GEO_ASCII_PARAMS})
+    directory = tags.get(GEO_KEY_DIRECTORY)
+    if not directory:
+        return None, False
+
+    ascii_params = tags.get(GEO_ASCII_PARAMS, "")
+    keys = {}
+    for i in range(directory[3]):
+        key, location, count, value = directory[4 + 4 * i:8 + 4 * i]
+        if location == 0:
+            keys[key] = value
+        elif location == GEO_ASCII_PARAMS:
+            keys[key] = ascii_params[value:value + count].rstrip("|\x00")
+
+    for key in (PROJECTED_CS_TYPE, GEOGRAPHIC_TYPE):
+        code = keys.get(key)
+        if isinstance(code, int) and 0 < code < USER_DEFINED:
+            return f"EPSG:{code}", True
+    for key in (PCS_CITATION, GEOG_CITATION, GT_CITATION):
+        if keys.get(key):
+            return f"User-defined ({keys[key]})", True
+    return "User-defined", True
+
+# --- Shapefile -------------------------------------------------------------------
+
+# ESRI / OGC WKT names without an AUTHORITY clause (spaces and case ignored)
+WKT_NAMES = {
+    "gcs_wgs_1984": 4326, "wgs_84": 4326, "wgs_1984": 4326,
+    "gcs_north_american_1983": 4269, "nad83": 4269,
+    "gcs_north_american_1927": 4267, "nad27": 4267,
+    "gcs_etrs_1989": 4258, "etrs89": 4258,
+    "wgs_1984_web_mercator_auxiliary_sphere": 3857, "wgs_84_/_pseudo-mercator": 3857,
+}
+
+# UTM zone names: datum -> (north base, south base or None); EPSG code = base + zone
+_UTM_NAME = re.compile(r"^(?P<datum>[a-z0-9_]+?)_(?:/_)?utm_zone_(?P<zone>\d{1,2})(?P<hemisphere>[ns])$")
+_UTM_BASES = {
+    "wgs_1984": (32600, 32700), "wgs_84": (32600, 32700),
+    "nad_1983": (26900, None), "nad83": (26900, None),
+    "nad_1927": (26700, None), "nad27": (26700, None),
+    "etrs_1989": (25800, None), "etrs89": (25800, None),
+}
+
+def _wkt_name_epsg(name: str):
+    """EPSG code for a well-known PROJCS / GEOGCS name, else None."""
+    key = re.sub(r"\s+", "_", name.strip()).lower()
+    if key in WKT_NAMES:
+        return WKT_NAMES[key]
+    match = _UTM_NAME.match(key)
+    if match and 1 <= int(match.group("zone")) <= 60:
+        bases = _UTM_BASES.get(match.group("datum"))
+        base = bases and bases[match.group("hemisphere") == "s"]
+        if base:
+            return base + int(match.group("zone"))
+    return None
+
+def _pyproj_epsg(wkt: str):
+    """EPSG code through pyproj when it is installed (optional), else None."""
+    try:
+        from pyproj import CRS
+    except ImportError:
+        return None
+    try:
+        return CRS.from_wkt(wkt).to_epsg()
+    except Exception:
+        return None
+
+def read_prj_crs(path: str):
+    """
+    CRS of a shapefile from its .prj (WKT): the root AUTHORITY code, else
+    pyproj's match (if installed), else a lookup of the ESRI / OGC CRS name.
+    A WKT none of these resolve comes back as "Unresolved (<name>)".
+    """
+    prj = Path(path).with_suffix(".prj")
+    if not prj.exists():
+        return None, False
+    wkt = prj.read_text(errors="replace").strip()
+    authority = re.search(r'AUTHORITY\["EPSG",\s*"?(\d+)"?\]\]\s*$', wkt)
+    if authority:
+        return f"EPSG:{authority.group(1)}", True
+    name = re.match(r'\s*\w+\["([^"]+)"', wkt)
+    name = name.group(1) if name else wkt[:60]
+    code = _pyproj_epsg(wkt) or _wkt_name_epsg(name)
+    return (f"EPSG:{code}" if code else f"{UNRESOLVED} ({name})"), True
+
+# --- Single file / bulk ---------------------------------------------------------------
+
+def read_crs(path: str):
+    """(crs, declared) from the file header; crs is None when the layer declares none."""
+    suffix = Path(path).suffix.lower()
+    if suffix in RASTER_SUFFIXES:
+        return read_geotiff_crs(path)
+    if suffix in VECTOR_SUFFIXES:
+        return read_geojson_crs(path)
+    if suffix in SHAPE_SUFFIXES:
+        return read_prj_crs(path)
+    raise ValueError("Unsupported format.")
 
 def validate_crs(file_path: str):
     if not os.path.exists(file_path):
         return "Error: File not found."
+    if Path(file_path).suffix.lower() not in SUPPORTED:
+        return "Unsupported format."
+    try:
+        crs, declared = read_crs(file_path)
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+    if crs is None:
+        return "Error: No CRS defined."
+    return crs if declared else f"{crs} (GeoJSON default, no 'crs' member)"
 
-    # If we don't have the heavy tools installed yet
-    if not HAS_GEO_TOOLS:
-        return "[Simulation Mode] Tools missing. Assuming WGS 84 (EPSG:4326) for demo."
+def find_layers(sources):
+    """Every supported layer under the given files / directories (recursive) / glob patterns, sorted."""
+    found = set()
+    for source in sources:
+        if os.path.isdir(source):
+            found.update(str(p) for p in Path(source).rglob("*") if p.suffix.lower() in SUPPORTED and p.is_file())
+        elif os.path.exists(source):
+            found.add(source)
+        else:
+            found.update(p for p in glob.glob(source, recursive=True) if Path(p).suffix.lower() in SUPPORTED)
+    return sorted(found)
 
-    # Real logic (only runs if installed)
+class HeaderCache:
+    """
+    CRS results keyed on absolute path + mtime + size, stored as one JSON file
+    in the cache folder, so a rerun only opens files that changed.
+    """
+    def __init__(self):
+        from hydro.utils.cache import cache_dir
+
+        self.path = cache_dir("crs") / "headers.json"
+        try:
+            stored = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            stored = {}
+        self.entries = stored.get("entries", {}) if stored.get("version") == HEADER_VERSION else {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def stamp(path: str):
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, path: str, stamp):
+        entry = self.entries.get(os.path.abspath(path))
+        return entry['result'] if entry and entry['stamp'] == stamp else None
+
+    def put(self, path: str, stamp, result: dict):
+        with self.lock:
+            self.entries[os.path.abspath(path)] = {"stamp": stamp, "result": result}
+
+    def save(self):
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": HEADER_VERSION, "entries": self.entries}))
+        os.replace(tmp, self.path)
+
+def _check_one(path: str, cache):
+    """Header check of one layer -> {path, crs, declared, error, cached}."""
     try:
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext in ['.tif', '.tiff']:
-            with rasterio.open(file_path) as src:
-                return src.crs.to_string()
-        elif ext in ['.geojson', '.shp']:
-            data = gpd.read_file(file_path)
-            return data.crs.to_string()
+        stamp = HeaderCache.stamp(path)
+    except OSError as e:
+        return {"path": path, "crs": None, "declared": False, "error": str(e), "cached": False}
+    if cache is not None:
+        hit = cache.get(path, stamp)
+        if hit is not None:
+            return {**hit, "path": path, "cached": True}
+    try:
+        crs, declared = read_crs(path)
+        result = {"crs": crs, "declared": declared,
+                  "error": None if crs is not None else "No CRS defined"}
     except Exception as e:
-        return f"Error reading file: {str(e)}"
-    
-    return "Unsupported format."
\ No newline at end of file
+        result = {"crs": None, "declared": False, "error": str(e) or type(e).__name__}
+    if cache is not None:
+        cache.put(path, stamp, result)
+    return {**result, "path": path, "cached": False}
+
+def scan_crs(paths, workers: int = 8, use_cache: bool = True):
+    """
+    Read the CRS of many layers concurrently (thread pool; the work is file
+    I/O). Results come back in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = HeaderCache() if use_cache else None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda path: _check_one(path, cache), paths))
+    if cache is not None and any(not row['cached'] for row in results):
+        cache.save()
+    return results
+
+def group_by_crs(results, expected=None):
+    """
+    {crs: [paths]} for every resolved layer (largest group first), the
+    reference CRS (`expected`, else the most common one), the layers that
+    could not be read and those whose CRS maps to no EPSG code (neither
+    counted as a match nor as a mismatch).
+    """
+    results = list(results)
+    groups = {}
+    for row in results:
+        if row['error'] is None and not row['crs'].startswith(UNRESOLVED):
+            groups.setdefault(row['crs'], []).append(row['path'])
+    groups = dict(sorted(groups.items(), key=lambda item: (-len(item[1]), item[0])))
+    if expected:
+        expected = _normalize_crs_name(expected)
+    reference = expected or next(iter(groups), None)
+    errors = [row for row in results if row['error'] is not None]
+    unresolved = [row for row in results if row['error'] is None and row['crs'].startswith(UNRESOLVED)]
+    return groups, reference, errors, unresolved
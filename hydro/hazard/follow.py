@@ -0,0 +1,177 @@
+import io
+import json
+import os
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from hydro.hazard.report import classify_levels
+from hydro.hazard.advisor import advise_on_risk
+from hydro.utils.cache import cache_dir
+
+# Bytes read per block when catching up on a feed
+BLOCK_SIZE = 8 * 1024 * 1024
+
+def default_checkpoint(csv_path: str):
+    """Checkpoint file for a feed, kept in the cache folder and keyed by its absolute path."""
+    key = hashlib.sha256(str(Path(csv_path).resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir("follow") / f"{key}.json"
+
+class GaugeFollower:
+    """
+    Incremental reader for a gauge CSV that keeps growing (`hazard --follow`).
+
+    Remembers the byte offset of the last complete line and per-station state
+    (last level, rolling max, time above threshold, current status) in a JSON
+    checkpoint. Each poll parses only the bytes appended since the previous one,
+    so the cost follows the new data, not the file size, and a restart resumes
+    where it left off. Time above threshold uses a `timestamp` column when the
+    feed has one, otherwise the time each batch was read.
+    """
+    def __init__(self, csv_path: str, threshold: float, checkpoint_path=None):
+        self.csv_path = str(csv_path)
+        self.threshold = threshold
+        self.checkpoint_path = Path(checkpoint_path or default_checkpoint(csv_path))
+        self.offset = 0
+        self.header = None
+        self.stations = {}
+        self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return
+        with open(self.checkpoint_path, 'r') as f:
+            state = json.load(f)
+        # A checkpoint from another file or threshold would give wrong statuses
+        if state.get("path") != str(Path(self.csv_path).resolve()) or state.get("threshold") != self.threshold:
+            return
+        self.offset = state["offset"]
+        self.header = state["header"]
+        self.stations = state["stations"]
+
+    def save_checkpoint(self):
+        """Persist offset + station state (atomic replace, safe against crashes mid-write)."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "path": str(Path(self.csv_path).resolve()),
+            "threshold": self.threshold,
+            "offset": self.offset,
+            "header": self.header,
+            "stations": self.stations,
+        }
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _read_new_blocks(self, block_size: int = None):
+        """
+        Yield the complete lines appended since the last poll, about
+        `block_size` bytes at a time; a partial last line is carried into the
+        next block (or left for the next poll), so memory stays bounded however
+        far behind the checkpoint is.
+        """
+        block_size = block_size or BLOCK_SIZE
+        size = os.path.getsize(self.csv_path)
+        if size < self.offset:
+            # File was truncated / rotated: start again from the top
+            self.offset, self.header = 0, None
+
+        with open(self.csv_path, 'rb') as f:
+            f.seek(self.offset)
+            remaining = size - self.offset
+            carry = b""
+            while remaining > 0:
+                block = f.read(min(block_size, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                data = carry + block
+                end = data.rfind(b"\n")
+                if end < 0:
+                    carry = data  # Only a partial line so far
+                    continue
+                data, carry = data[:end + 1], data[end + 1:]
+                self.offset += len(data)
+
+                if self.header is None:
+                    first, _, data = data.partition(b"\n")
+                    self.header = first.decode("utf-8").strip().split(",")
+                if data.strip():
+                    yield data
+
+    def poll(self, block_size: int = None):
+        """
+        Process newly appended readings, block by block.
+        Returns one alert per status change: dicts with station, level,
+        previous / new status and the advise_on_risk text.
+        """
+        alerts = []
+        for data in self._read_new_blocks(block_size):
+            alerts += self._process(data)
+        self.save_checkpoint()
+        return alerts
+
+    def _process(self, data: bytes):
+        """Fold one block of complete CSV lines into the station state; returns its alerts."""
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self.header)
+        df = df.dropna(subset=["station", "level"])
+        df['station'] = df['station'].astype(str)
+        levels = df['level'].to_numpy(dtype=float)
+        if "timestamp" in df:
+            times = pd.to_datetime(df['timestamp']).to_numpy(dtype="datetime64[ns]").astype(np.int64) / 1e9
+        else:
+            times = np.full(len(df), time.time())
+
+        # 1. Vectorized status for every new reading
+        df = df.assign(level=levels, time=times, status=classify_levels(levels, self.threshold))
+
+        # 2. Previous reading of each station: in this batch, or from the checkpoint
+        grouped = df.groupby("station", sort=False)
+        stored = {name: self.stations.get(name, {}) for name in grouped.groups}
+        first = ~df['station'].duplicated().to_numpy()
+        first_names = df['station'].to_numpy()[first]
+        prev_status = np.array(grouped['status'].shift(1), dtype=object)
+        prev_level = np.array(grouped['level'].shift(1), dtype=float)
+        prev_time = np.array(grouped['time'].shift(1), dtype=float)
+        prev_status[first] = [stored[name].get("status", "SAFE") for name in first_names]
+        prev_level[first] = [stored[name].get("last_level", -np.inf) for name in first_names]
+        prev_time[first] = [stored[name].get("last_time", t) for name, t in zip(first_names, times[first])]
+
+        # 3. Time above threshold: intervals that started above it
+        df['above_time'] = np.where(prev_level >= self.threshold, times - prev_time, 0.0)
+
+        # 4. Fold the batch into the per-station state
+        batch = grouped.agg(
+            last_level=("level", "last"), max_level=("level", "max"), last_time=("time", "last"),
+            status=("status", "last"), readings=("level", "size")
+        )
+        above_time = df.groupby("station", sort=False)['above_time'].sum()
+        for name, row in batch.iterrows():
+            state = stored[name]
+            self.stations[name] = {
+                "last_level": float(row['last_level']),
+                "max_level": max(float(row['max_level']), state.get("max_level", -np.inf)),
+                "last_time": float(row['last_time']),
+                "time_above": state.get("time_above", 0.0) + float(above_time[name]),
+                "readings": state.get("readings", 0) + int(row['readings']),
+                "status": row['status'],
+            }
+
+        # 5. Alerts only where the status changed
+        changed = np.flatnonzero(df['status'].to_numpy(dtype=object) != prev_status)
+        alerts = [
+            {
+                "station": station,
+                "level": level,
+                "previous": previous,
+                "status": status,
+                "advice": advise_on_risk(station, level, self.threshold),
+            }
+            for station, level, previous, status in zip(
+                df['station'].to_numpy()[changed], levels[changed],
+                prev_status[changed], df['status'].to_numpy()[changed]
+            )
+        ]
+        return alerts
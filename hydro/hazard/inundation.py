@@ -0,0 +1,165 @@
+import json
+import numpy as np
+from pathlib import Path
+from scipy import ndimage
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from hydro.utils.dem_loader import open_dem
+
+def _tiles(rows: int, cols: int, tile_size: int):
+    """Row-major tile windows: (row0, row1, col0, col1)."""
+    for row0 in range(0, rows, tile_size):
+        for col0 in range(0, cols, tile_size):
+            yield row0, min(row0 + tile_size, rows), col0, min(col0 + tile_size, cols)
+
+def _label_tile(handle, window, stage: float, structure):
+    """Wet cells (ground below the stage) of one window and their local component labels."""
+    block = handle.read_window(*window)
+    if handle.nodata is not None:
+        block[block == handle.nodata] = np.nan
+    with np.errstate(invalid="ignore"):
+        wet = block < stage
+    labels, count = ndimage.label(wet, structure=structure)
+    return block, labels, count
+
+def _border_pairs(a, b):
+    """Label pairs of touching wet cells on two sides of a tile border."""
+    both = (a > 0) & (b > 0)
+    return np.stack([a[both], b[both]])
+
+class _MaskWriter:
+    """Mask raster writer: GeoTIFF through rasterio (.tif) or memory-mapped .npy + JSON sidecar."""
+    def __init__(self, path: str, handle, transform):
+        self.path = Path(path)
+        rows, cols = handle.shape
+        x0, dx, y0, dy = transform
+        if self.path.suffix.lower() in (".tif", ".tiff"):
+            import rasterio
+            from rasterio.transform import Affine
+
+            self.dst = rasterio.open(
+                self.path, "w", driver="GTiff", height=rows, width=cols, count=1, dtype="uint8",
+                crs=getattr(getattr(handle, "src", None), "crs", None),
+                transform=Affine(dx, 0, x0, 0, dy, y0), compress="deflate", nbits=1
+            )
+            self.array = None
+        else:
+            self.path = self.path.with_suffix(".npy")
+            self.array = np.lib.format.open_memmap(self.path, mode="w+", dtype=np.uint8, shape=(rows, cols))
+            with open(self.path.with_suffix(".json"), "w") as f:
+                json.dump({"transform": [x0, dx, 0, y0, 0, dy], "nodata": None}, f)
+
+    def write(self, window, mask):
+        row0, row1, col0, col1 = window
+        if self.array is not None:
+            self.array[row0:row1, col0:col1] = mask
+        else:
+            from rasterio.windows import Window
+
+            self.dst.write(mask.astype(np.uint8), 1, window=Window(col0, row0, col1 - col0, row1 - row0))
+
+    def close(self):
+        if self.array is not None:
+            self.array.flush()
+            self.array = None
+        else:
+            self.dst.close()
+
+def map_inundation(dem_path: str, stage: float, output_path: str, seeds=None,
+                   tile_size: int = 1024, connectivity: int = 8):
+    """
+    Flood extent for a water-surface elevation `stage`, hydraulically connected
+    to the seed points ((lat, lon) pairs in the DEM's CRS). Without seeds every
+    cell below the stage counts (plain "bathtub" fill).
+
+    Works out-of-core: pass 1 labels wet cells tile by tile and stitches labels
+    across tile borders (only one row of labels is kept between tile rows);
+    pass 2 re-labels each tile and writes the mask window by window. Area and
+    volume assume a projected CRS in meters.
+    """
+    handle = open_dem(dem_path)
+    rows, cols = handle.shape
+    x0, dx, y0, dy = handle.transform
+    structure = ndimage.generate_binary_structure(2, 2 if connectivity == 8 else 1)
+
+    seed_cells = [
+        (int((lat - y0) // dy), int((lon - x0) // dx)) for lat, lon in (seeds or [])
+    ]
+    seed_cells = [(r, c) for r, c in seed_cells if 0 <= r < rows and 0 <= c < cols]
+    if seeds and not seed_cells:
+        raise ValueError("None of the seed points fall inside the DEM.")
+
+    # --- PASS 1: label tiles, stitch borders, find seed components ---
+    offsets, pairs, seed_labels = [], [], []
+    total = 0
+    prev_bottom = np.zeros(cols, dtype=np.int64)   # labels of the row just above this tile row
+    cur_bottom = np.zeros(cols, dtype=np.int64)
+    prev_right = None
+
+    for window in _tiles(rows, cols, tile_size):
+        row0, row1, col0, col1 = window
+        if col0 == 0 and row0 > 0:
+            prev_bottom, cur_bottom = cur_bottom, prev_bottom
+            padded = np.pad(prev_bottom, 1)
+        _, labels, count = _label_tile(handle, window, stage, structure)
+        offsets.append(total)
+        glabels = np.where(labels > 0, labels.astype(np.int64) + total, 0)
+        total += count
+
+        # Stitch with the tile above (and its diagonal neighbours for 8-connectivity)
+        if row0 > 0:
+            top = glabels[0]
+            pairs.append(_border_pairs(top, prev_bottom[col0:col1]))
+            if connectivity == 8:
+                pairs.append(_border_pairs(top, padded[col0:col1]))          # north-west
+                pairs.append(_border_pairs(top, padded[col0 + 2:col1 + 2]))  # north-east
+
+        # Stitch with the tile to the left
+        if col0 > 0:
+            left = glabels[:, 0]
+            pairs.append(_border_pairs(left, prev_right))
+            if connectivity == 8:
+                pairs.append(_border_pairs(left[1:], prev_right[:-1]))
+                pairs.append(_border_pairs(left[:-1], prev_right[1:]))
+
+        cur_bottom[col0:col1] = glabels[-1]
+        prev_right = glabels[:, -1]
+
+        for r, c in seed_cells:
+            if row0 <= r < row1 and col0 <= c < col1 and glabels[r - row0, c - col0] > 0:
+                seed_labels.append(glabels[r - row0, c - col0])
+
+    # Components of the label graph (label 0 = dry)
+    edges = np.concatenate(pairs, axis=1) if pairs else np.zeros((2, 0), dtype=np.int64)
+    graph = coo_matrix((np.ones(edges.shape[1]), (edges[0], edges[1])), shape=(total + 1, total + 1))
+    _, component = connected_components(graph, directed=False)
+    if seeds:
+        flooded = np.isin(component, component[seed_labels]) if seed_labels else np.zeros(total + 1, bool)
+    else:
+        flooded = np.ones(total + 1, dtype=bool)
+    flooded[0] = False
+
+    # --- PASS 2: re-label each tile, write the mask, accumulate statistics ---
+    writer = _MaskWriter(output_path, handle, (x0, dx, y0, dy))
+    cells, volume = 0, 0.0
+    try:
+        for window, offset in zip(_tiles(rows, cols, tile_size), offsets):
+            block, labels, _ = _label_tile(handle, window, stage, structure)
+            mask = flooded[np.where(labels > 0, labels.astype(np.int64) + offset, 0)]
+            writer.write(window, mask.astype(np.uint8))
+            cells += int(mask.sum())
+            volume += float((stage - block[mask]).sum())
+    finally:
+        writer.close()
+        handle.close()
+
+    cell_area = abs(dx * dy)
+    return {
+        "stage": stage,
+        "flooded_cells": cells,
+        "area_m2": cells * cell_area,
+        "volume_m3": volume * cell_area,
+        "mean_depth": volume / cells if cells else 0.0,
+        "components": int(len(np.unique(component[flooded]))) if flooded.any() else 0,
+        "mask": str(writer.path),
+    }
@@ -1,28 +1,115 @@
+import numpy as np
 import pandas as pd
+from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from hydro.utils import trace
 
 console = Console()
 
-def generate_styled_report(csv_path: str, threshold: float):
-    df = pd.read_csv(csv_path)
-    
+# Status labels, worst first (index = severity rank)
+STATUS_LABELS = ["HIGH RISK", "WARNING", "SAFE"]
+STATUS_STYLES = {
+    "HIGH RISK": "[bold red]🚨 HIGH RISK[/bold red]",
+    "WARNING": "[bold yellow]⚠️ WARNING[/bold yellow]",
+    "SAFE": "[bold green]✅ SAFE[/bold green]",
+}
+
+def classify_levels(levels, threshold: float):
+    """Vectorized status for an array of water levels."""
+    levels = np.asarray(levels, dtype=float)
+    return np.select(
+        [levels >= threshold, levels >= threshold * 0.7],
+        STATUS_LABELS[:2],
+        default=STATUS_LABELS[2]
+    )
+
+def _iter_level_chunks(path: str, chunksize: int):
+    """Yield (station, level) DataFrames from a CSV or Parquet file, chunk by chunk."""
+    if Path(path).suffix.lower() == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=["station", "level"]):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            path, usecols=["station", "level"], dtype={"station": str, "level": float},
+            chunksize=chunksize
+        )
+
+def summarize_levels(path: str, threshold: float, chunksize: int = 500_000):
+    """
+    Single streaming pass over station telemetry.
+    Per station: number of readings, max / last level, readings at or above the
+    threshold and the warning band, plus the status of the worst reading.
+    Memory is bounded by the chunk size and the number of stations, not the file.
+    """
+    summary = None
+    trace.count("bytes_read", Path(path).stat().st_size)
+    chunks = _iter_level_chunks(path, chunksize)
+    while True:
+        with trace.span("read chunk"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+        trace.count("rows", len(chunk))
+        with trace.span("aggregate", rows=len(chunk)):
+            levels = chunk['level'].to_numpy(dtype=float)
+            chunk = chunk.assign(
+                exceedances=levels >= threshold,
+                warnings=(levels >= threshold * 0.7) & (levels < threshold)
+            )
+            part = chunk.groupby("station", sort=False).agg(
+                readings=("level", "size"),
+                max_level=("level", "max"),
+                last_level=("level", "last"),
+                exceedances=("exceedances", "sum"),
+                warnings=("warnings", "sum"),
+            )
+            if summary is None:
+                summary = part
+            else:
+                summary = pd.concat([summary, part]).groupby(level=0, sort=False).agg({
+                    "readings": "sum", "max_level": "max", "last_level": "last",
+                    "exceedances": "sum", "warnings": "sum",
+                })
+
+    if summary is None:
+        summary = pd.DataFrame(columns=["readings", "max_level", "last_level", "exceedances", "warnings"])
+
+    summary = summary.rename_axis("station").reset_index()
+    summary['status'] = classify_levels(summary['max_level'], threshold)
+    return summary.sort_values("max_level", ascending=False, ignore_index=True)
+
+def generate_styled_report(csv_path: str, threshold: float, top: int = 20, summary=None):
+    """
+    Prints the hazard table for the `top` worst stations (by peak level) and a
+    status breakdown for the whole file. Returns the full per-station summary.
+    """
+    if summary is None:
+        summary = summarize_levels(csv_path, threshold)
+    shown = summary.head(top)
+
     table = Table(title="🌊 Flood Hazard Analysis", header_style="bold magenta", border_style="blue")
     table.add_column("Station ID", justify="center")
-    table.add_column("Water Level (m)", justify="right")
+    table.add_column("Peak Level (m)", justify="right")
+    table.add_column("Readings", justify="right")
+    table.add_column("Exceedances", justify="right")
     table.add_column("Status", justify="center")
 
-    for _, row in df.iterrows():
-        level = row['level']
-        if level >= threshold:
-            status = "[bold red]🚨 HIGH RISK[/bold red]"
-        elif level >= (threshold * 0.7):
-            status = "[bold yellow]⚠️ WARNING[/bold yellow]"
-        else:
-            status = "[bold green]✅ SAFE[/bold green]"
-            
-        table.add_row(str(row['station']), f"{level:.2f}", status)
-
-    console.print(Panel.fit("Hydro-Flow Analysis Results", style="bold cyan"))
-    console.print(table)
\ No newline at end of file
+    for station, level, readings, exceedances, status in zip(
+        shown['station'], shown['max_level'], shown['readings'], shown['exceedances'], shown['status']
+    ):
+        table.add_row(str(station), f"{level:.2f}", f"{readings:,}", f"{exceedances:,}", STATUS_STYLES[status])
+
+    counts = summary['status'].value_counts()
+    breakdown = " | ".join(f"{STATUS_STYLES[label]}: {counts.get(label, 0):,}" for label in STATUS_LABELS)
+
+    with trace.span("render", rows=len(shown)):
+        console.print(Panel.fit("Hydro-Flow Analysis Results", style="bold cyan"))
+        console.print(table)
+        if len(summary) > len(shown):
+            console.print(f"[dim]Showing {len(shown)} of {len(summary):,} stations (worst first).[/dim]")
+        console.print(breakdown)
+    return summary
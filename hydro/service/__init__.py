@@ -0,0 +1,2 @@
+# Shared by the server and its (numpy-free) client
+DEFAULT_PORT = 8765
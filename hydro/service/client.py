@@ -0,0 +1,59 @@
+import http.client
+import json
+import os
+import socket
+from urllib.parse import urlparse
+from hydro.service import DEFAULT_PORT
+
+class _UnixConnection(http.client.HTTPConnection):
+    """HTTP over a Unix domain socket."""
+    def __init__(self, path: str, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+class ServerError(RuntimeError):
+    """The server answered with an error status."""
+
+class HydroClient:
+    """
+    Thin client for `hydro serve`.
+    `address` is http://host:port or unix:///path/to.sock; the connection is
+    kept alive between calls.
+    """
+    def __init__(self, address: str, timeout: float = 600.0):
+        url = urlparse(address)
+        if url.scheme == "unix":
+            self.connection = _UnixConnection(url.path, timeout=timeout)
+        else:
+            self.connection = http.client.HTTPConnection(url.hostname or "127.0.0.1", url.port or DEFAULT_PORT, timeout=timeout)
+
+    def _request(self, method: str, path: str, params=None):
+        body = json.dumps(params).encode("utf-8") if params is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        payload = json.loads(response.read() or b"{}")
+        if response.status != 200:
+            raise ServerError(payload.get("error", f"HTTP {response.status}"))
+        return payload
+
+    def call(self, operation: str, **params):
+        """
+        POST /<operation> with JSON params. Profile, sample and graph paths are
+        sent absolute, so they resolve against the client's working directory.
+        """
+        for name in ("profile", "samples_out", "graph_path"):
+            if params.get(name):
+                params[name] = os.path.abspath(params[name])
+        return self._request("POST", f"/{operation}", params)
+
+    def health(self):
+        return self._request("GET", "/health")
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,244 @@
+import asyncio
+import functools
+import json
+import os
+import numpy as np
+from hydro.simulation.engine import HydraulicEngine, bridge_afflux
+from hydro.simulation.design import solve_min_width
+from hydro.service import DEFAULT_PORT
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+def _json_default(value):
+    """NumPy scalars/arrays -> plain JSON types."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+class _Coalescer:
+    """
+    Collects small requests that arrive within `window` seconds of each other
+    and evaluates them as one vectorized batch per key (operation + profile).
+    """
+    def __init__(self, evaluate, window: float):
+        self.evaluate = evaluate  # evaluate(key, [params, ...]) -> [result, ...]
+        self.window = window
+        self.pending = {}
+        self.batches = 0
+
+    async def submit(self, key, params):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if key not in self.pending:
+            self.pending[key] = []
+            loop.call_later(self.window, self._flush, key)
+        self.pending[key].append((params, future))
+        return await future
+
+    def _flush(self, key):
+        items = self.pending.pop(key)
+        self.batches += 1
+        try:
+            results = self.evaluate(key, [params for params, _ in items])
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+class HydroServer:
+    """
+    Long-running engine service (`hydro serve`).
+
+    Parsed profiles / engines stay in memory (reloaded when the file changes),
+    concurrent discharge, afflux and design requests are coalesced into single
+    vectorized evaluations, and Monte Carlo jobs run in a process pool so they
+    never block the event loop. Speaks plain HTTP/1.1 + JSON with keep-alive,
+    over TCP or a Unix socket.
+    """
+    def __init__(self, workers: int = 2, batch_window: float = 0.002):
+        self.workers = workers
+        self.pool = None
+        self.engines = {}
+        self.requests = 0
+        self.coalescer = _Coalescer(self._evaluate_batch, batch_window)
+        self.operations = {
+            "/discharge": self._discharge,
+            "/afflux": self._afflux,
+            "/design": self._design,
+            "/stress-test": self._stress_test,
+        }
+
+    # --- Engines -------------------------------------------------------------
+
+    def engine(self, profile: str):
+        """Warm engine for a profile path (re-read only when the file changes)."""
+        path = os.path.abspath(profile)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.engines.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, HydraulicEngine(path))
+            self.engines[path] = cached
+        return cached[1]
+
+    # --- Operations ----------------------------------------------------------
+
+    async def _discharge(self, params):
+        profile = params.get("profile", "data/profiles/ona.json")
+        self.engine(profile)
+        return await self.coalescer.submit(("discharge", os.path.abspath(profile)), {"depth": float(params["depth"])})
+
+    async def _afflux(self, params):
+        profile = params.get("profile", "data/profiles/ona.json")
+        self.engine(profile)
+        return await self.coalescer.submit(("afflux", os.path.abspath(profile)), {
+            "depth": float(params["depth"]),
+            "contraction": float(params.get("contraction", 0.8)),
+        })
+
+    async def _design(self, params):
+        profile = params.get("profile", "data/profiles/ona.json")
+        self.engine(profile)
+        return await self.coalescer.submit(("design", os.path.abspath(profile)), {
+            "target_q": float(params["target_q"]),
+            "max_depth": float(params["max_depth"]),
+        })
+
+    async def _stress_test(self, params):
+        from concurrent.futures import ProcessPoolExecutor
+        from hydro.simulation.monte_carlo import run_flood_risk_simulation
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        profile = os.path.abspath(params.get("profile", "data/profiles/ona.json"))
+        self.engine(profile)  # fail fast on a bad profile path
+        job = functools.partial(
+            run_flood_risk_simulation, profile, float(params["depth"]),
+            int(params.get("iterations", 1000)),
+            seed=params.get("seed"), workers=int(params.get("workers", 1)),
+            chunk_size=int(params.get("chunk_size", 1_000_000)),
+            sampler=params.get("sampler", "uniform"), target_ci=params.get("target_ci"),
+            cache=bool(params.get("cache", True)), samples_out=params.get("samples_out"),
+            **({"graph_path": params["graph_path"]} if params.get("graph_path") else {})
+        )
+        return await asyncio.get_running_loop().run_in_executor(self.pool, job)
+
+    def _evaluate_batch(self, key, items):
+        """One vectorized evaluation for every coalesced request of a key."""
+        operation, profile = key
+        engine = self.engines[profile][1]
+        columns = {name: np.array([item[name] for item in items]) for name in items[0]}
+
+        if operation == "discharge":
+            result = engine.calculate_discharge_batch(columns['depth'])
+            extra = {"basin_name": engine.profile.get('basin_name')}
+        elif operation == "afflux":
+            flow = engine.calculate_discharge_batch(columns['depth'])
+            result = bridge_afflux(columns['depth'], flow['velocity'], columns['contraction'])
+            extra = {}
+        else:
+            result = solve_min_width(
+                columns['target_q'], columns['max_depth'],
+                engine.profile['slope'], engine.profile['manning_n'], engine.profile.get('side_slope', 0.0)
+            )
+            return [
+                {"optimal_width": float(width), "excavation_area": float(area), "status": "Optimized"}
+                if status == "Optimized" else {"status": "Failed to Converge"}
+                for width, area, status in zip(result['optimal_width'], result['excavation_area'], result['status'])
+            ]
+
+        return [
+            {**{name: float(values[i]) for name, values in result.items()}, **extra}
+            for i in range(len(items))
+        ]
+
+    def health(self):
+        return {
+            "status": "ok",
+            "engines": len(self.engines),
+            "requests": self.requests,
+            "batches": self.coalescer.batches,
+        }
+
+    # --- HTTP ----------------------------------------------------------------
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/health":
+            return 200, self.health()
+        handler = self.operations.get(path)
+        if method != "POST" or handler is None:
+            return 404, {"error": f"Unknown endpoint: {method} {path}"}
+
+        self.requests += 1
+        try:
+            return 200, await handler(json.loads(body or b"{}"))
+        except KeyError as e:
+            return 400, {"error": f"Missing parameter: {e.args[0]}"}
+        except (TypeError, ValueError, OSError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self.dispatch(method, path, body)
+                data = json.dumps(payload, default=_json_default).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, unix_socket=None):
+        """Start listening; returns the asyncio server (port 0 picks a free port)."""
+        if unix_socket:
+            return await asyncio.start_unix_server(self._handle, path=unix_socket)
+        return await asyncio.start_server(self._handle, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, unix_socket=None,
+          workers: int = 2, on_ready=None):
+    """Run the server until interrupted."""
+    service = HydroServer(workers=workers)
+
+    async def main():
+        server = await service.start(host, port, unix_socket)
+        if on_ready:
+            on_ready(server)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    finally:
+        service.close()
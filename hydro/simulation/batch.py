@@ -0,0 +1,176 @@
+import glob
+import json
+import os
+import numpy as np
+from pathlib import Path
+from hydro.simulation.engine import HydraulicEngine, bridge_afflux
+from hydro.simulation.design import solve_min_width
+
+# Column order of the consolidated results table
+COLUMNS = [
+    "basin", "task", "status", "depth", "discharge", "velocity", "area",
+    "contraction", "afflux", "new_water_level", "bridge_velocity",
+    "target_q", "max_depth", "optimal_width", "excavation_area",
+    "probability", "ci_halfwidth", "p95_discharge", "p99_discharge", "mean_discharge", "evaluations", "graph",
+]
+
+def find_profiles(source: str):
+    """Profile files from a directory (every *.json) or a glob pattern, sorted."""
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "*.json"))
+    else:
+        paths = glob.glob(source)
+    return sorted(paths)
+
+def basin_names(profile_paths):
+    """
+    Basin label per profile: its path relative to the common folder, without
+    the suffix ("alpha", or "north/alpha" when a glob spans several folders).
+    Two profiles with the same label would overwrite each other's results.
+    """
+    paths = [Path(os.path.abspath(path)) for path in profile_paths]
+    if not paths:
+        return []
+    root = os.path.commonpath([str(path.parent) for path in paths])
+    names = [path.relative_to(root).with_suffix("").as_posix() for path in paths]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate basin profiles: {', '.join(duplicates)}")
+    return names
+
+def load_manifest(path: str):
+    """
+    Scenario manifest (JSON). Every section is optional:
+      "depths":      [..]                              -> discharge at each depth
+      "afflux":      {"depths": [..], "contractions": [..]}
+      "design":      {"targets": [..], "max_depth": 4.0}
+      "stress_test": {"depths": [..], "iterations": 100000, "seed": 1, "sampler": "uniform", ...}
+    """
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    known = {"depths", "afflux", "design", "stress_test"}
+    unknown = set(manifest) - known
+    if unknown:
+        raise ValueError(f"Unknown manifest sections: {', '.join(sorted(unknown))}")
+    return manifest
+
+def _hydraulics_job(task):
+    """Worker: every cheap scenario of one basin, each kind in one vectorized call."""
+    basin, profile, manifest = task
+    engine = HydraulicEngine(profile)
+    rows = []
+
+    # 1. Discharge per depth
+    if manifest.get("depths"):
+        depths = np.asarray(manifest['depths'], dtype=float)
+        flow = engine.calculate_discharge_batch(depths)
+        for i, depth in enumerate(depths):
+            rows.append({"basin": basin, "task": "simulate", "depth": depth,
+                         **{key: float(flow[key][i]) for key in ("discharge", "velocity", "area")}})
+
+    # 2. Bridge afflux over depth x contraction
+    if manifest.get("afflux"):
+        depths = np.asarray(manifest['afflux'].get("depths", manifest.get("depths", [])), dtype=float)
+        ratios = np.asarray(manifest['afflux'].get("contractions", [0.7]), dtype=float)
+        grid_depth, grid_ratio = (g.ravel() for g in np.meshgrid(depths, ratios, indexing="ij"))
+        result = bridge_afflux(grid_depth, engine.calculate_discharge_batch(grid_depth)['velocity'], grid_ratio)
+        for i in range(grid_depth.size):
+            rows.append({"basin": basin, "task": "bridge-check", "depth": grid_depth[i], "contraction": grid_ratio[i],
+                         **{key: float(result[key][i]) for key in ("afflux", "new_water_level", "bridge_velocity")}})
+
+    # 3. Minimal channel width per design target
+    if manifest.get("design"):
+        spec = manifest['design']
+        targets = np.asarray(spec['targets'], dtype=float)
+        solved = solve_min_width(
+            targets, spec.get("max_depth", 4.0),
+            profile['slope'], profile['manning_n'], profile.get('side_slope', 0.0)
+        )
+        for i, target in enumerate(targets):
+            rows.append({"basin": basin, "task": "design", "target_q": target, "max_depth": spec.get("max_depth", 4.0),
+                         "optimal_width": float(solved['optimal_width'][i]),
+                         "excavation_area": float(solved['excavation_area'][i]),
+                         "status": str(solved['status'][i])})
+    return rows
+
+def _stress_job(task):
+    """Worker: one Monte Carlo run (single process - the pool provides the parallelism)."""
+    from hydro.simulation.monte_carlo import run_flood_risk_simulation
+
+    basin, profile, depth, settings, graph_dir = task
+    result = run_flood_risk_simulation(
+        profile, depth, int(settings.get("iterations", 1000)),
+        seed=settings.get("seed"), workers=1,
+        chunk_size=int(settings.get("chunk_size", 1_000_000)),
+        sampler=settings.get("sampler", "uniform"), target_ci=settings.get("target_ci"),
+        cache=bool(settings.get("cache", True)),
+        graph_path=str(Path(graph_dir) / f"{basin}_{depth:g}.png")
+    )
+    keys = ("probability", "ci_halfwidth", "p95_discharge", "p99_discharge", "mean_discharge", "evaluations", "graph")
+    return [{"basin": basin, "task": "stress-test", "depth": depth, **{key: result[key] for key in keys}}]
+
+def _run(task):
+    """Run one job; failures become a single error row so the night run carries on."""
+    kind, args = task
+    try:
+        return (_hydraulics_job if kind == "hydraulics" else _stress_job)(args)
+    except Exception as e:
+        return [{"basin": args[0], "task": kind, "status": f"Error: {e}"}]
+
+def plan_jobs(profile_paths, manifest: dict, graph_dir="local_workspace/batch_graphs"):
+    """
+    Read each profile once and split the manifest into pool jobs: one cheap
+    vectorized job per basin plus one job per stress-test depth (the long ones).
+    Unreadable profiles become error rows straight away. Basins are labelled
+    by basin_names (duplicates raise ValueError).
+    """
+    jobs, errors = [], []
+    stress = manifest.get("stress_test")
+    for path, basin in zip(profile_paths, basin_names(profile_paths)):
+        try:
+            with open(path, 'r') as f:
+                profile = json.load(f)
+        except (OSError, ValueError) as e:
+            errors.append({"basin": basin, "task": "load", "status": f"Error: {e}"})
+            continue
+        jobs.append(("hydraulics", (basin, profile, manifest)))
+        for depth in (stress or {}).get("depths", []):
+            jobs.append(("stress", (basin, profile, float(depth), stress, graph_dir)))
+    return jobs, errors
+
+def run_batch(jobs, workers=None, on_done=None):
+    """
+    Fan jobs out over a process pool (all cores by default); `on_done(rows)` is
+    called as each job finishes. Returns every result row.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    rows = []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = (_run(job) for job in jobs)
+        for job_rows in results:
+            rows.extend(job_rows)
+            if on_done:
+                on_done(job_rows)
+        return rows
+
+    # Long stress-test jobs first, so they do not end up as stragglers
+    ordered = sorted(jobs, key=lambda job: job[0] != "stress")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, job) for job in ordered]
+        for future in as_completed(futures):
+            job_rows = future.result()
+            rows.extend(job_rows)
+            if on_done:
+                on_done(job_rows)
+    return rows
+
+def results_table(rows):
+    """Consolidated results, one row per basin x scenario, in a stable order."""
+    import pandas as pd
+
+    table = pd.DataFrame(rows)
+    table = table[[col for col in COLUMNS if col in table]]
+    keys = [col for col in ("basin", "task", "depth", "contraction", "target_q") if col in table]
+    return table.sort_values(keys, ignore_index=True, na_position="first")
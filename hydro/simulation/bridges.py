@@ -0,0 +1,85 @@
+import numpy as np
+from pathlib import Path
+from hydro.simulation.engine import trapezoid_flow, bridge_afflux
+
+# Channel columns a bridge row may override; anything missing comes from the profile
+CHANNEL_COLUMNS = ("channel_width", "slope", "manning_n", "side_slope")
+
+RESULT_COLUMNS = (
+    "bridge_id", *CHANNEL_COLUMNS, "depth", "contraction",
+    "discharge", "velocity", "bridge_velocity", "afflux", "new_water_level"
+)
+
+def load_inventory(path: str, profile: dict):
+    """
+    Read a bridge inventory (.csv or .parquet), one bridge per row.
+    Needs a `bridge_id` column; channel columns and an optional per-bridge
+    `contraction` ratio default to the basin profile.
+    """
+    import pandas as pd
+
+    if Path(path).suffix.lower() == ".parquet":
+        inventory = pd.read_parquet(path)
+    else:
+        inventory = pd.read_csv(path)
+
+    if "bridge_id" not in inventory:
+        raise ValueError("Bridge inventory must provide a 'bridge_id' column.")
+    inventory['bridge_id'] = inventory['bridge_id'].astype(str)
+    for col in CHANNEL_COLUMNS:
+        if col not in inventory:
+            inventory[col] = profile.get(col, 0.0)
+    return inventory
+
+def screen_bridges(inventory, depths, contractions, chunk_rows: int = 1_000_000):
+    """
+    Afflux for every bridge x contraction ratio x depth, at full precision.
+
+    A `contraction` column in the inventory replaces the contraction list for
+    that bridge. Bridges are taken in blocks so each yielded DataFrame holds at
+    most about `chunk_rows` cases - memory stays bounded for any inventory size.
+    """
+    import pandas as pd
+
+    depths = np.asarray(depths, dtype=float)
+    per_bridge = "contraction" in inventory
+    contractions = np.asarray(contractions, dtype=float)
+    cases_per_bridge = depths.size * (1 if per_bridge else contractions.size)
+    block = max(1, chunk_rows // cases_per_bridge)
+
+    for start in range(0, len(inventory), block):
+        part = inventory.iloc[start:start + block]
+        # Grid axes: (bridge, contraction, depth)
+        channel = {col: part[col].to_numpy(dtype=float)[:, None, None] for col in CHANNEL_COLUMNS}
+        ratio = (part['contraction'].to_numpy(dtype=float)[:, None, None] if per_bridge
+                 else contractions[None, :, None])
+        depth = depths[None, None, :]
+
+        flow = trapezoid_flow(depth, channel['manning_n'], channel['slope'],
+                              channel['channel_width'], channel['side_slope'])
+        shape = np.broadcast_shapes(flow['velocity'].shape, ratio.shape)
+        bridge = bridge_afflux(depth, flow['velocity'], ratio)
+
+        columns = {"bridge_id": np.broadcast_to(part['bridge_id'].to_numpy()[:, None, None], shape)}
+        columns.update({col: np.broadcast_to(values, shape) for col, values in channel.items()})
+        columns.update({
+            "depth": np.broadcast_to(depth, shape),
+            "contraction": np.broadcast_to(ratio, shape),
+            "discharge": np.broadcast_to(flow['discharge'], shape),
+            "velocity": np.broadcast_to(flow['velocity'], shape),
+            "bridge_velocity": bridge['bridge_velocity'],
+            "afflux": bridge['afflux'],
+            "new_water_level": bridge['new_water_level'],
+        })
+        yield pd.DataFrame({col: np.broadcast_to(columns[col], shape).ravel() for col in RESULT_COLUMNS})
+
+def worst_cases(current, chunk, top: int = 20):
+    """Merge a chunk into the running table of the `top` largest afflux cases."""
+    import pandas as pd
+
+    if current is not None:
+        chunk = pd.concat([current, chunk], ignore_index=True)
+    if len(chunk) > top:
+        keep = np.argpartition(-chunk['afflux'].to_numpy(), top - 1)[:top]
+        chunk = chunk.iloc[keep]
+    return chunk.sort_values("afflux", ascending=False, ignore_index=True)
@@ -0,0 +1,136 @@
+import json
+import math
+import numpy as np
+from pathlib import Path
+from hydro.simulation.engine import trapezoid_flow
+
+# Search range for the channel bottom width (m)
+WIDTH_BOUNDS = (0.5, 100.0)
+
+# Columns a sweep case can vary; anything missing comes from the basin profile
+SWEEP_COLUMNS = ("target_q", "max_depth", "slope", "manning_n", "side_slope")
+
+def solve_min_width(target_q, max_depth, slope, manning_n, side_slope=0.0,
+                    bounds=WIDTH_BOUNDS, tol: float = 1e-6):
+    """
+    SOLVES THE INVERSE PROBLEM for many cases at once:
+    minimal bottom width whose Manning capacity at max_depth reaches target_q.
+
+    Capacity grows monotonically with width, so the cheapest feasible channel
+    sits exactly on the root of capacity(b) = target_q. A vectorized bisection
+    keeps every case bracketed. Infeasible cases (even the widest channel is
+    too small) come back as NaN.
+    """
+    target_q, max_depth, slope, manning_n, side_slope = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (target_q, max_depth, slope, manning_n, side_slope))
+    )
+
+    def capacity(width):
+        return trapezoid_flow(max_depth, manning_n, slope, width, side_slope)['discharge']
+
+    # 1. Bracket: [low, high] with capacity(low) < target <= capacity(high)
+    low = np.full(target_q.shape, bounds[0])
+    high = np.full(target_q.shape, bounds[1])
+    feasible = capacity(high) >= target_q
+    already = capacity(low) >= target_q
+
+    # 2. Bisection - fixed iteration count, so the whole grid advances together
+    for _ in range(math.ceil(math.log2((bounds[1] - bounds[0]) / tol))):
+        mid = 0.5 * (low + high)
+        enough = capacity(mid) >= target_q
+        high = np.where(enough, mid, high)
+        low = np.where(enough, low, mid)
+
+    width = np.where(already, bounds[0], high)
+    width = np.where(feasible, width, np.nan)
+    area = (width + side_slope * max_depth) * max_depth
+
+    return {
+        "optimal_width": width,
+        "excavation_area": area,
+        "capacity": capacity(width),
+        "status": np.where(feasible, "Optimized", "Failed to Converge")
+    }
+
+def _grid_values(spec):
+    """A grid axis is a list, a single number or {"start", "stop", "num"}."""
+    if isinstance(spec, dict):
+        return np.linspace(spec['start'], spec['stop'], int(spec['num']))
+    return np.atleast_1d(np.asarray(spec, dtype=float))
+
+def load_sweep_cases(path: str, profile: dict, max_depth=None):
+    """
+    Read a sweep definition into a case table.
+    - .json: a grid spec, every combination of the listed axes is solved
+    - .csv:  one case per row
+    Missing columns are filled from the basin profile.
+    """
+    import pandas as pd
+
+    defaults = {
+        "max_depth": max_depth,
+        "slope": profile['slope'],
+        "manning_n": profile['manning_n'],
+        "side_slope": profile.get('side_slope', 0.0),
+    }
+
+    if Path(path).suffix.lower() == ".json":
+        with open(path, 'r') as f:
+            spec = json.load(f)
+        axes = {col: _grid_values(spec[col]) for col in SWEEP_COLUMNS if col in spec}
+        mesh = np.meshgrid(*axes.values(), indexing="ij")
+        cases = pd.DataFrame({col: grid.ravel() for col, grid in zip(axes, mesh)})
+    else:
+        cases = pd.read_csv(path)
+
+    if "target_q" not in cases:
+        raise ValueError("Sweep definition must provide 'target_q'.")
+    for col, value in defaults.items():
+        if col not in cases:
+            if value is None:
+                raise ValueError(f"Sweep definition must provide '{col}'.")
+            cases[col] = value
+    return cases[list(SWEEP_COLUMNS)]
+
+def run_design_sweep(cases):
+    """Solve every case of a sweep in one vectorized pass -> results table."""
+    solved = solve_min_width(*(cases[col].to_numpy(dtype=float) for col in SWEEP_COLUMNS))
+    results = cases.copy()
+    for key, values in solved.items():
+        results[key] = values
+    return results
+
+def design_envelope(sweep: str, profile: dict, max_depth=None, output: str = "design_envelope.csv",
+                    cache: bool = True):
+    """
+    Solve a sweep file and write its results table to `output`.
+
+    With `cache=True` the table is stored in the result cache under a key of
+    the profile, the sweep file contents, max_depth and the output format; an
+    identical later sweep copies the stored table into place instead of
+    solving. Returns {"cases", "feasible", "output", "cached"}.
+    """
+    import hashlib
+    import shutil
+    from hydro.utils.cache import ResultCache
+    from hydro.utils.tables import write_table
+
+    if cache:
+        result_cache = ResultCache()
+        with open(sweep, 'rb') as f:
+            sweep_hash = hashlib.sha256(f.read()).hexdigest()
+        key = result_cache.key("design-sweep", profile, sweep=sweep_hash, max_depth=max_depth,
+                               format=Path(output).suffix.lower())
+        hit = result_cache.get(key)
+        if hit is not None:
+            summary, artifacts = hit
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(artifacts['table'], output)
+            return {**summary, "output": str(output), "cached": True}
+
+    results = run_design_sweep(load_sweep_cases(sweep, profile, max_depth))
+    write_table(results, output)
+    summary = {"cases": len(results), "feasible": int((results['status'] == "Optimized").sum())}
+    if cache:
+        result_cache.put(key, summary, artifacts={"table": output})
+    return {**summary, "output": str(output), "cached": False}
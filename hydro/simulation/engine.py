@@ -1,86 +1,123 @@
 import json
-import math
+import os
+import numpy as np
 from pathlib import Path
-from scipy.optimize import minimize_scalar  # <--- The CS Powerhouse
+from hydro.utils import trace
+
+def trapezoid_flow(depth, n, slope, width, side_slope=0.0):
+    """
+    Vectorized Manning's equation for a Trapezoidal Channel.
+    Every argument may be a scalar or a NumPy array; they are broadcast together
+    and a column dict of full-precision arrays is returned.
+    """
+    depth = np.asarray(depth, dtype=float)
+    b, z = np.asarray(width, dtype=float), np.asarray(side_slope, dtype=float)
+
+    # 1. Geometric Properties
+    area = (b + z * depth) * depth
+    perimeter = b + 2 * depth * np.sqrt(1 + z**2)
+    area, perimeter = np.broadcast_arrays(area, perimeter)
+    radius = np.divide(area, perimeter, out=np.zeros(area.shape), where=perimeter > 0)
+
+    # 2. Discharge (Manning's Equation)
+    discharge = (1 / np.asarray(n, dtype=float)) * area * np.power(radius, 2/3) * np.sqrt(slope)
+    discharge = np.broadcast_to(discharge, area.shape)
+    velocity = np.divide(discharge, area, out=np.zeros(area.shape), where=area > 0)
+
+    return {
+        "discharge": discharge,
+        "velocity": velocity,
+        "area": area,
+        "perimeter": perimeter,
+        "hydraulic_radius": radius
+    }
+
+def bridge_afflux(depth, velocity, contraction_ratio, k_loss: float = 0.5):
+    """
+    Vectorized afflux (rise in water level) at a bridge constriction from the
+    Energy Equation (Bernoulli). Arguments broadcast together.
+    """
+    g = 9.81
+    v1 = np.asarray(velocity, dtype=float)
+
+    # Velocity increases at bridge (V2 = V1 / ratio)
+    v2 = v1 / np.asarray(contraction_ratio, dtype=float)
+
+    # Calculate Head Loss (hL) due to turbulence
+    head_loss = k_loss * ((v2**2) / (2*g))
+
+    # Afflux (Rise in water level)
+    afflux = ((v2**2 - v1**2) / (2*g)) + head_loss
+
+    return {
+        "afflux": afflux,
+        "new_water_level": depth + afflux,
+        "bridge_velocity": v2
+    }
 
 class HydraulicEngine:
     def __init__(self, profile_path: str):
         self.profile = self._load_profile(profile_path)
+        self._ratings = {}
 
     def _load_profile(self, path):
-        with open(path, 'r') as f:
-            return json.load(f)
+        # An already-parsed profile dict is used as is (batch runs load each file once)
+        if isinstance(path, dict):
+            return path
+        with trace.span("profile load", path=str(path)):
+            with open(path, 'r') as f:
+                trace.count("bytes_read", os.fstat(f.fileno()).st_size)
+                return json.load(f)
+
+    def calculate_discharge_batch(self, depth, n=None, slope=None, width=None, side_slope=None):
+        """
+        Array-native Manning's calculation: one call for any number of depths.
+        Optional per-element n / slope / width / side_slope arrays are broadcast
+        against depth; anything left as None comes from the basin profile.
+        Returns a column dict of full-precision NumPy arrays.
+        """
+        return trapezoid_flow(
+            depth,
+            self.profile['manning_n'] if n is None else n,
+            self.profile['slope'] if slope is None else slope,
+            self.profile['channel_width'] if width is None else width,
+            self.profile.get('side_slope', 0.0) if side_slope is None else side_slope
+        )
 
     def calculate_discharge(self, depth: float):
         """
         Standard Manning's Calculation (The 'Forward' Problem).
-        Calculates discharge for a Trapezoidal Channel.
+        Calculates discharge for a Trapezoidal Channel (full precision -
+        rounding is left to the presentation layer).
         """
-        b = self.profile['channel_width']
-        z = self.profile.get('side_slope', 0.0)
-        n = self.profile['manning_n']
-        s = self.profile['slope']
-        
-        # 1. Calculate Geometric Properties
-        area = (b + (z * depth)) * depth
-        perimeter = b + (2 * depth * math.sqrt(1 + (z**2)))
-        radius = area / perimeter if perimeter > 0 else 0
-        
-        # 2. Calculate Discharge (Manning's Equation)
-        discharge = (1/n) * area * (math.pow(radius, 2/3)) * (math.sqrt(s))
-        velocity = discharge / area if area > 0 else 0
-        
-        return {
-            "discharge": round(discharge, 2),
-            "velocity": round(velocity, 2),
-            "area": round(area, 2),
-            "perimeter": round(perimeter, 2)
-        }
+        result = self.calculate_discharge_batch(depth)
+        return {key: float(value) for key, value in result.items()}
 
     def design_optimal_channel(self, target_discharge: float, max_depth: float):
         """
         SOLVES THE INVERSE PROBLEM (Auto-Design):
         Find the minimal channel width (b) required to carry specific flow (Q).
         Objective: Minimize Excavation Cost (Cross-Sectional Area).
+
+        Capacity rises monotonically with width, so the cheapest channel is the
+        root of capacity(b) = Q, found by a bracketed solver between 0.5m and 100m.
         """
-        n = self.profile['manning_n']
-        s = self.profile['slope']
-        z = self.profile.get('side_slope', 0.0)
-        
-        # We define a Cost Function that the AI tries to minimize
-        def cost_function(trial_width):
-            if trial_width <= 0: return 999999 # Physical impossibility penalty
-            
-            # 1. Calculate Hydraulic Properties for this trial width
-            area = (trial_width + z * max_depth) * max_depth
-            perimeter = trial_width + 2 * max_depth * math.sqrt(1 + z**2)
-            
-            if perimeter <= 0: return 999999
-            radius = area / perimeter
-            
-            # 2. Calculate Capacity (Manning's)
-            capacity = (1/n) * area * (radius**(2/3)) * (s**0.5)
-            
-            # 3. Constraint: We MUST meet the Target Discharge
-            # If capacity is too low, return a huge penalty so the optimizer avoids this width
-            if capacity < target_discharge:
-                return 999999 + (target_discharge - capacity) # Penalty + Gap
-            
-            # 4. Objective: If capacity is met, return the Area (Excavation Cost)
-            return area
-
-        # Run the Scipy Optimizer (Bounded search between 0.5m and 100m width)
-        result = minimize_scalar(cost_function, bounds=(0.5, 100.0), method='bounded')
-        
-        if result.success and result.fun < 900000:
+        from hydro.simulation.design import solve_min_width
+
+        result = solve_min_width(
+            target_discharge, max_depth,
+            self.profile['slope'], self.profile['manning_n'], self.profile.get('side_slope', 0.0)
+        )
+
+        if result['status'] == "Optimized":
             return {
-                "optimal_width": round(result.x, 2),
-                "excavation_area": round(result.fun, 2),
+                "optimal_width": float(result['optimal_width']),
+                "excavation_area": float(result['excavation_area']),
                 "status": "Optimized"
             }
         else:
             return {"status": "Failed to Converge"}
-        
+
     def calculate_bridge_afflux(self, upstream_depth: float, contraction_ratio: float = 0.8):
         """
         Calculates the rise in water level (Afflux) caused by a bridge constriction.
@@ -88,21 +125,31 @@ class HydraulicEngine:
         """
         # Normal Flow State
         normal_flow = self.calculate_discharge(upstream_depth)
-        v1 = normal_flow['velocity']
-        g = 9.81
-        
-        # Velocity increases at bridge (V2 = V1 / ratio)
-        v2 = v1 / contraction_ratio
-        
-        # Calculate Head Loss (hL) due to turbulence
-        k_loss = 0.5
-        head_loss = k_loss * ((v2**2) / (2*g))
-        
-        # Afflux (Rise in water level)
-        afflux = ((v2**2 - v1**2) / (2*g)) + head_loss
-        
-        return {
-            "afflux": round(afflux, 3),
-            "new_water_level": round(upstream_depth + afflux, 3),
-            "bridge_velocity": round(v2, 2)
-        }
\ No newline at end of file
+        result = bridge_afflux(upstream_depth, normal_flow['velocity'], contraction_ratio)
+        return {key: float(value) for key, value in result.items()}
+
+    def rating_curve(self, max_depth=None, points: int = 4096):
+        """Cached stage-discharge table for this profile (see hydro.simulation.rating)."""
+        from hydro.simulation.rating import RatingCurve
+
+        key = (max_depth, points)
+        if key not in self._ratings:
+            self._ratings[key] = RatingCurve.load(self.profile, max_depth, points)
+        return self._ratings[key]
+
+    def normal_depth(self, discharge, max_depth=None):
+        """
+        SOLVES THE INVERSE OF calculate_discharge:
+        Depth at which the channel carries the given flow(s) (scalar or array).
+        """
+        depth = self.rating_curve(max_depth).normal_depth(discharge)
+        return float(depth) if np.ndim(depth) == 0 else depth
+
+    def backwater_profile(self, flows, downstream_stage=None):
+        """
+        Water-surface profiles along the profile's "stations" for one or many
+        flows (standard-step method, see hydro.simulation.reach).
+        """
+        from hydro.simulation.reach import Reach
+
+        return Reach(self.profile).water_surface_profile(flows, downstream_stage)
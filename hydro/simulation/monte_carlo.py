@@ -1,66 +1,272 @@
-import random
+import shutil
+import warnings
 import numpy as np
-import matplotlib.pyplot as plt
+from collections import deque
 from pathlib import Path
-from hydro.simulation.engine import HydraulicEngine
+from concurrent.futures import ProcessPoolExecutor
+from hydro.simulation.engine import HydraulicEngine, trapezoid_flow
+from hydro.simulation.stats import StreamingStats
+from hydro.utils import trace
 
-def run_flood_risk_simulation(profile_path: str, base_depth: float, iterations: int = 1000):
+# Variability factors (fractions of the base value)
+N_RANGE = (0.9, 1.1)      # Vegetation growth: roughness +/- 10%
+DEPTH_RANGE = (0.8, 1.3)  # Flash flood surge: depth -20% / +30%
+
+SAMPLERS = ("uniform", "lhs", "sobol", "importance")
+
+# Share of importance samples forced into the failure region of the depth axis
+IMPORTANCE_MIX = 0.5
+
+# Adaptive (target_ci) runs: at least this many chunks, each of at least MIN_TARGET_CI_CHUNK samples
+TARGET_CI_CHUNKS = 64
+MIN_TARGET_CI_CHUNK = 1000
+
+# Where the risk histogram is rendered
+GRAPH_PATH = "local_workspace/risk_distribution.png"
+
+def _unit_samples(sampler: str, rng, size: int, u_threshold: float):
+    """
+    Draw `size` points in the unit square (roughness axis, depth axis) plus
+    their likelihood-ratio weights (None means every weight is 1).
+    """
+    if sampler == "uniform":
+        return rng.random(size), rng.random(size), None
+
+    if sampler in ("lhs", "sobol"):
+        from scipy.stats import qmc
+
+        engine = (qmc.LatinHypercube(d=2, seed=rng) if sampler == "lhs"
+                  else qmc.Sobol(d=2, scramble=True, seed=rng))
+        with warnings.catch_warnings():
+            # Sobol prefers powers of 2; any chunk size is still a valid scrambled set
+            warnings.simplefilter("ignore", UserWarning)
+            points = engine.random(size)
+        return points[:, 0], points[:, 1], None
+
+    if sampler == "importance":
+        u_n = rng.random(size)
+        if not 0.0 < u_threshold < 1.0:
+            # Failure is impossible (or certain): nothing to bias toward
+            return u_n, rng.random(size), None
+
+        # Defensive mixture: half the depths from the failure region, half uniform
+        in_tail = rng.random(size) < IMPORTANCE_MIX
+        u_depth = np.where(in_tail, u_threshold + (1 - u_threshold) * rng.random(size), rng.random(size))
+        density = (1 - IMPORTANCE_MIX) + IMPORTANCE_MIX * (u_depth > u_threshold) / (1 - u_threshold)
+        return u_n, u_depth, 1.0 / density
+
+    raise ValueError(f"Unknown sampler '{sampler}'. Choose from: {', '.join(SAMPLERS)}")
+
+def _simulate_chunk(task):
+    """
+    Worker kernel: simulate one chunk with its own seed stream and return a
+    fixed-size StreamingStats summary (never the raw samples).
+    """
+    params, size, entropy, index = task
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+
+    # 1. Random n and Random Depth, drawn as arrays from the chosen sampler
+    with trace.span("sampling", sampler=params['sampler'], size=size):
+        u_n, u_depth, weights = _unit_samples(params['sampler'], rng, size, params['u_threshold'])
+        random_n = params['manning_n'] * (N_RANGE[0] + (N_RANGE[1] - N_RANGE[0]) * u_n)
+        random_depth = params['base_depth'] * (DEPTH_RANGE[0] + (DEPTH_RANGE[1] - DEPTH_RANGE[0]) * u_depth)
+
+    # 2. Physics for every sample in one pass
+    with trace.span("physics", size=size):
+        discharge = trapezoid_flow(
+            random_depth, random_n, params['slope'], params['channel_width'], params['side_slope']
+        )['discharge']
+    trace.count("evaluations", size)
+
+    # 3. Check Failure (Did random depth exceed threshold?)
+    failed = random_depth > params['threshold']
+
+    # 4. Raw samples straight into the store, at this chunk's offset
+    if params['samples_out']:
+        from hydro.simulation.samples import write_chunk
+
+        with trace.span("write samples", size=size):
+            write_chunk(params['samples_out'], index * params['chunk_size'], manning_n=random_n,
+                        depth=random_depth, discharge=discharge, failed=failed, weight=weights)
+        trace.count("bytes_written", size * (25 + (8 if weights is not None else 0)))
+
+    with trace.span("statistics", size=size):
+        stats = StreamingStats(params['q_low'], params['q_high'])
+        return stats.update(discharge, failed, weights)
+
+def _iter_shards(tasks, workers: int):
+    """
+    Yield chunk summaries in task order. With a pool only a small window of
+    chunks is in flight, so a caller that stops early wastes little work and
+    the merged prefix is the same whatever the worker count.
+    """
+    if workers <= 1:
+        for task in tasks:
+            yield _simulate_chunk(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(pool.submit(_simulate_chunk, task))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _plot_histogram(stats: StreamingStats, iterations: int, output: str):
+    """Render the risk histogram from the merged (binned) summary."""
+    from hydro.visualization.plotter import plot_risk_histogram
+
+    counts, edges = stats.coarse_histogram(30)
+    return plot_risk_histogram(counts, edges, stats.mean, iterations, output)
+
+def run_flood_risk_simulation(profile_path: str, base_depth: float, iterations: int = 1000,
+                              seed=None, workers: int = 1, chunk_size: int = 1_000_000,
+                              sampler: str = "uniform", target_ci=None, cache: bool = False,
+                              graph_path: str = GRAPH_PATH, samples_out=None):
     """
     Performs a Monte Carlo simulation AND generates a risk histogram.
     Variability factors:
     - Rainfall spikes (Depth variation)
     - Vegetation growth (Manning's n variation)
+
+    Iterations are split into chunks of `chunk_size`. Each chunk gets its own
+    SeedSequence child stream and is reduced to mergeable streaming statistics,
+    so memory stays constant and chunks can be spread over `workers` processes.
+    For a fixed seed and chunk size the result does not depend on `workers`.
+
+    Samplers: "uniform" (plain Monte Carlo), "lhs" (Latin hypercube), "sobol"
+    (scrambled Sobol QMC) and "importance" (depth biased toward threshold_high,
+    re-weighted by the likelihood ratio). With `target_ci` (95% CI half-width on
+    the failure probability, in percentage points) the run stops after the first
+    chunk that reaches it and `iterations` becomes the maximum budget; chunks
+    are then capped at iterations / TARGET_CI_CHUNKS (but at least
+    MIN_TARGET_CI_CHUNK samples) so the check runs often enough to stop early.
+
+    The histogram is written to `graph_path`. With `cache=True` the finished result and its histogram are stored in the
+    result cache under a key of the profile contents, the run parameters and the
+    code version; an identical later run is answered from there (the PNG is
+    copied back into place instead of being re-rendered). Only seeded runs are
+    cached: without a seed every call is a new draw.
+
+    With `samples_out` every sample (n, depth, discharge, failure flag and the
+    importance weight) is also written, chunk by chunk, to a folder of
+    memory-mapped .npy columns; reopen it with
+    hydro.simulation.samples.open_samples. Such runs bypass the cache.
     """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{sampler}'. Choose from: {', '.join(SAMPLERS)}")
+
     engine = HydraulicEngine(profile_path)
-    failures = 0
-    results = []
-    
-    # Base parameters
-    base_n = engine.profile['manning_n']
-    threshold = engine.profile['threshold_high']
-    
-    for _ in range(iterations):
-        # 1. Random n (roughness changes +/- 10%)
-        random_n = base_n * random.uniform(0.9, 1.1)
-        # 2. Random Depth (Flash flood surge +/- 20%)
-        random_depth = base_depth * random.uniform(0.8, 1.3)
-        
-        # Temporary profile update in memory
-        engine.profile['manning_n'] = random_n
-        
-        output = engine.calculate_discharge(random_depth)
-        
-        # Check Failure (Did random depth exceed threshold?)
-        if random_depth > threshold:
-            failures += 1
-            
-        results.append(output['discharge'])
-        
-    probability = (failures / iterations) * 100
-    
+    profile = engine.profile
+
+    # An unseeded run is a fresh random draw by request: never replay one
+    cache = cache and not samples_out and seed is not None
+    if cache:
+        from hydro.utils.cache import ResultCache
+
+        with trace.span("cache lookup"):
+            result_cache = ResultCache()
+            key = result_cache.key(
+                "stress-test", profile, depth=base_depth, iterations=iterations, seed=seed,
+                chunk_size=chunk_size, sampler=sampler, target_ci=target_ci
+            )
+            hit = result_cache.get(key)
+        if hit is not None:
+            trace.count("cache_hits")
+            result, artifacts = hit
+            Path(graph_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(artifacts['graph'], graph_path)
+            return {**result, "graph": str(graph_path), "cached": True}
+    root = np.random.SeedSequence(seed)
+
+    # Base parameters (read only - the shared profile is never mutated)
+    params = {
+        "manning_n": profile['manning_n'],
+        "channel_width": profile['channel_width'],
+        "side_slope": profile.get('side_slope', 0.0),
+        "slope": profile['slope'],
+        "threshold": profile['threshold_high'],
+        "base_depth": base_depth,
+        "sampler": sampler,
+        "samples_out": str(samples_out) if samples_out else None,
+    }
+
+    # Failure threshold expressed on the unit depth axis (for importance sampling)
+    params['u_threshold'] = (
+        (params['threshold'] / base_depth - DEPTH_RANGE[0]) / (DEPTH_RANGE[1] - DEPTH_RANGE[0])
+        if base_depth > 0 else float("inf")
+    )
+
+    # Discharge is monotone in depth and 1/n, so the sampling bounds give the
+    # exact value range for the fixed-bin histogram / quantile sketch.
+    params['q_low'], params['q_high'] = (
+        float(engine.calculate_discharge_batch(base_depth * d, n=params['manning_n'] * n)['discharge'])
+        for d, n in ((DEPTH_RANGE[0], N_RANGE[1]), (DEPTH_RANGE[1], N_RANGE[0]))
+    )
+
+    if target_ci is not None:
+        # The stopping rule is checked per chunk (and the replicate CI needs
+        # several), so cap the chunk size at a fraction of the budget
+        chunk_size = min(chunk_size, max(MIN_TARGET_CI_CHUNK, -(-iterations // TARGET_CI_CHUNKS)))
+    chunk_size = max(1, min(chunk_size, iterations))
+    sizes = [chunk_size] * (iterations // chunk_size)
+    if iterations % chunk_size:
+        sizes.append(iterations % chunk_size)
+    params['chunk_size'] = chunk_size
+    tasks = ((params, size, root.entropy, i) for i, size in enumerate(sizes))
+
+    if samples_out:
+        from hydro.simulation import samples
+
+        samples_meta = {
+            "profile": profile, "base_depth": base_depth, "iterations": iterations, "seed": seed,
+            "chunk_size": chunk_size, "sampler": sampler, "threshold": params['threshold'],
+            "q_low": params['q_low'], "q_high": params['q_high'],
+        }
+        samples.create_store(samples_out, iterations, weighted=sampler == "importance", **samples_meta)
+
+    # Scrambled QMC / LHS chunks are independent randomized replicates: their
+    # spread is a far tighter (and still valid) error estimate than per-sample variance
+    replicates = sampler in ("lhs", "sobol")
+
+    stats = StreamingStats(params['q_low'], params['q_high'])
+    with trace.span("chunks", workers=workers, chunks=len(sizes)):
+        for shard in _iter_shards(tasks, workers if len(sizes) > 1 else 1):
+            with trace.span("merge"):
+                stats.merge(shard)
+            if target_ci is not None and stats.failure_halfwidth(replicates=replicates) * 100 <= target_ci:
+                break
+
+    probability = stats.failure_probability * 100
+    if samples_out:
+        # Chunks are merged in order, so the first `count` rows are exactly the merged ones
+        columns = [name for name in samples.COLUMNS if sampler == "importance" or name != "weight"]
+        samples.write_meta(samples_out, count=stats.count, columns=columns, **samples_meta)
+
     # --- VISUALIZATION: GENERATE HISTOGRAM ---
-    plt.figure(figsize=(10, 6))
-    plt.hist(results, bins=30, color='#4682B4', edgecolor='black', alpha=0.7)
-    
-    # Add mean line
-    mean_val = np.mean(results)
-    plt.axvline(mean_val, color='red', linestyle='dashed', linewidth=2, label=f'Mean Flow: {mean_val:.1f}')
-    
-    plt.title(f"Monte Carlo Risk Distribution ({iterations} Iterations)", fontsize=14)
-    plt.xlabel("Discharge (m³/s)")
-    plt.ylabel("Frequency")
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    
-    # Save Graph
-    output_path = Path("local_workspace") / "risk_distribution.png"
-    output_path.parent.mkdir(exist_ok=True)
-    plt.savefig(output_path)
-    plt.close()
-    
-    return {
-        "probability": probability,
-        "p95_discharge": np.percentile(results, 95),
-        "mean_discharge": np.mean(results),
-        "graph": str(output_path)
-    }
\ No newline at end of file
+    with trace.span("histogram"):
+        graph = _plot_histogram(stats, stats.count, graph_path)
+
+    with trace.span("percentiles"):
+        result = {
+            "probability": probability,
+            "p95_discharge": stats.quantile(0.95),
+            "p99_discharge": stats.quantile(0.99),
+            "mean_discharge": stats.mean,
+            "std_discharge": stats.variance ** 0.5,
+            "ci_halfwidth": stats.failure_halfwidth(replicates=replicates) * 100,
+            "evaluations": stats.count,
+            "sampler": sampler,
+            "graph": graph,
+            "samples": str(samples_out) if samples_out else None,
+            "cached": False
+        }
+    if cache:
+        result_cache.put(key, result, artifacts={"graph": graph})
+    return result
@@ -0,0 +1,183 @@
+import numpy as np
+
+G = 9.81
+
+# Upper-bracket doublings before giving up (from 1 m: far beyond any real depth)
+MAX_DOUBLINGS = 60
+
+def _bisect_increasing(fn, target, low, tol: float = 1e-9):
+    """
+    Vectorized root of fn(y) = target for a function increasing in y.
+    The upper bracket is grown by doubling until every element is enclosed;
+    non-finite targets, or ones fn never reaches within MAX_DOUBLINGS
+    doublings, raise ValueError instead of looping forever.
+    """
+    target = np.asarray(target, dtype=float)
+    if not np.isfinite(target).all():
+        raise ValueError("Cannot solve for a non-finite target (check flows and section geometry).")
+    low = np.broadcast_to(np.asarray(low, dtype=float), target.shape).copy()
+    high = np.maximum(low, 1.0)
+    for _ in range(MAX_DOUBLINGS):
+        short = fn(high) < target
+        if not short.any():
+            break
+        high = np.where(short, 2.0 * high, high)
+    else:
+        raise ValueError(f"Target not reached within a bracket of {np.max(high):.3g}: "
+                         "the section cannot carry this value (zero width or slope?).")
+
+    while np.max(high - low) > tol:
+        mid = 0.5 * (low + high)
+        enough = fn(mid) >= target
+        high = np.where(enough, mid, high)
+        low = np.where(enough, low, mid)
+    return high
+
+class Reach:
+    """
+    Multi-section channel reach from the profile's "stations" list.
+
+    Each station is a dict with "chainage" (m downstream of the reach head) and
+    "bed_elevation" (m); "channel_width", "side_slope" and "manning_n" default
+    to the profile values. Section geometry is held in contiguous arrays,
+    ordered upstream -> downstream.
+    """
+    def __init__(self, profile: dict):
+        stations = sorted(profile.get('stations', []), key=lambda s: s['chainage'])
+        if len(stations) < 2:
+            raise ValueError("Profile needs a 'stations' list with at least two cross sections.")
+
+        def column(key, default=None):
+            return np.ascontiguousarray([s.get(key, default) for s in stations], dtype=float)
+
+        self.profile = profile
+        self.chainage = column('chainage')
+        self.bed = column('bed_elevation')
+        self.width = column('channel_width', profile.get('channel_width'))
+        self.side_slope = column('side_slope', profile.get('side_slope', 0.0))
+        self.manning_n = column('manning_n', profile.get('manning_n'))
+        if np.any(np.diff(self.chainage) <= 0):
+            raise ValueError("Station chainages must be distinct.")
+
+    @property
+    def bed_slope(self):
+        """Mean bed slope of the reach (falls back to the profile slope if flat/adverse)."""
+        slope = (self.bed[0] - self.bed[-1]) / (self.chainage[-1] - self.chainage[0])
+        return slope if slope > 0 else self.profile['slope']
+
+    def _section(self, depth, idx=slice(None)):
+        """Area, top width, wetted perimeter and dP/dy for depths at the given sections."""
+        b, z = self.width[idx], self.side_slope[idx]
+        area = (b + z * depth) * depth
+        top = b + 2 * z * depth
+        wall = 2 * np.sqrt(1 + z**2)
+        return area, top, b + wall * depth, wall
+
+    def friction_slope(self, flows, depth, idx=slice(None)):
+        """Manning friction slope Sf = (Q n)^2 P^(4/3) / A^(10/3)."""
+        area, _, perimeter, _ = self._section(depth, idx)
+        return (flows * self.manning_n[idx])**2 * perimeter**(4/3) / area**(10/3)
+
+    def critical_depth(self, flows):
+        """Critical depth (Q^2 T = g A^3) for every flow x section -> (F, S)."""
+        flows = np.asarray(flows, dtype=float)[:, None]
+
+        def section_factor(y):
+            area, top, _, _ = self._section(y)
+            return area**3 / top
+
+        return _bisect_increasing(section_factor, np.broadcast_to(flows**2 / G, (flows.shape[0], self.bed.size)), 0.0)
+
+    def normal_depth(self, flows, idx=-1):
+        """Normal depth at one section for the reach bed slope."""
+        flows = np.asarray(flows, dtype=float)
+
+        def conveyance(y):
+            area, _, perimeter, _ = self._section(y, idx)
+            return area**(5/3) / perimeter**(2/3) / self.manning_n[idx]
+
+        return _bisect_increasing(conveyance, flows / np.sqrt(self.bed_slope), 0.0)
+
+    def water_surface_profile(self, flows, downstream_stage=None, tol: float = 1e-6, max_iter: int = 50):
+        """
+        STANDARD-STEP METHOD (subcritical, marching upstream) for many flows at once.
+
+        At each section the energy equation
+            WS_i + V_i^2/2g = WS_i+1 + V_i+1^2/2g + L * (Sf_i + Sf_i+1) / 2
+        is solved for every flow together with a bracketed Newton iteration;
+        the energy function only rises above critical depth, so the bracket is
+        [critical depth, level that ignores the local velocity head]. Where no
+        subcritical solution exists the section is set to critical depth.
+
+        downstream_stage: water-surface elevation at the last station (scalar or
+        one per flow); defaults to normal depth there.
+        Returns a dict of (flows x stations) arrays plus the station geometry.
+        """
+        flows = np.atleast_1d(np.asarray(flows, dtype=float))
+        n_flows, n_sections = flows.size, self.bed.size
+        critical = self.critical_depth(flows)
+
+        # 1. Downstream boundary (never below critical depth)
+        if downstream_stage is None:
+            y_end = self.normal_depth(flows)
+        else:
+            y_end = np.broadcast_to(np.asarray(downstream_stage, dtype=float) - self.bed[-1], flows.shape)
+        depth = np.empty((n_flows, n_sections))
+        depth[:, -1] = np.maximum(y_end, critical[:, -1])
+        is_critical = np.zeros((n_flows, n_sections), dtype=bool)
+        is_critical[:, -1] = y_end <= critical[:, -1]
+        iterations = 0
+
+        def energy_terms(y, i, reach_length):
+            area, top, perimeter, wall = self._section(y, i)
+            velocity_head = flows**2 / (2 * G * area**2)
+            sf = (flows * self.manning_n[i])**2 * perimeter**(4/3) / area**(10/3)
+            residual = y + self.bed[i] + velocity_head - 0.5 * reach_length * sf
+            slope = 1 - flows**2 * top / (G * area**3) \
+                - 0.5 * reach_length * sf * (4/3 * wall / perimeter - 10/3 * top / area)
+            return residual, slope, sf
+
+        # 2. March upstream, one section at a time, all flows together
+        for i in range(n_sections - 2, -1, -1):
+            reach_length = self.chainage[i + 1] - self.chainage[i]
+            y_down = depth[:, i + 1]
+            area_down = self._section(y_down, i + 1)[0]
+            target = (y_down + self.bed[i + 1] + flows**2 / (2 * G * area_down**2)
+                      + 0.5 * reach_length * self.friction_slope(flows, y_down, i + 1))
+
+            low = critical[:, i]
+            r_low, _, sf_low = energy_terms(low, i, reach_length)
+            no_solution = r_low >= target
+            high = np.maximum(target - self.bed[i] + 0.5 * reach_length * sf_low, low)
+            y = np.clip(y_down + self.bed[i + 1] - self.bed[i], low, high)
+
+            for _ in range(max_iter):
+                iterations += 1
+                r, slope, _ = energy_terms(y, i, reach_length)
+                r = r - target
+                low = np.where(r < 0, y, low)
+                high = np.where(r > 0, y, high)
+                step = y - r / slope
+                step = np.where((step > low) & (step < high), step, 0.5 * (low + high))
+                done = np.abs(step - y) < tol
+                y = step
+                if done.all():
+                    break
+
+            depth[:, i] = np.where(no_solution, critical[:, i], y)
+            is_critical[:, i] = no_solution
+
+        area, top, _, _ = self._section(depth)
+        velocity = flows[:, None] / area
+        return {
+            "flows": flows,
+            "chainage": self.chainage,
+            "bed_elevation": self.bed,
+            "depth": depth,
+            "water_level": depth + self.bed,
+            "velocity": velocity,
+            "froude": velocity / np.sqrt(G * area / top),
+            "critical_depth": critical,
+            "critical": is_critical,
+            "iterations": iterations,
+        }
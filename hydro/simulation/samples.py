@@ -0,0 +1,86 @@
+import json
+import numpy as np
+from pathlib import Path
+
+# Column name -> dtype of a sample store (one .npy file per column)
+COLUMNS = {"manning_n": "<f8", "depth": "<f8", "discharge": "<f8", "failed": "|b1", "weight": "<f8"}
+
+META_FILE = "meta.json"
+
+def create_store(path, size: int, weighted: bool = False, **meta):
+    """
+    Pre-allocate a sample store: a folder of `size`-long .npy columns that
+    chunks (possibly in other processes) fill in place at their own offsets.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    names = [name for name in COLUMNS if weighted or name != "weight"]
+    for name in names:
+        column = np.lib.format.open_memmap(path / f"{name}.npy", mode="w+", dtype=COLUMNS[name], shape=(size,))
+        del column
+    write_meta(path, count=0, columns=names, **meta)
+    return str(path)
+
+def write_chunk(path, offset: int, **columns):
+    """Write one chunk of every column at `offset` (opened memory-mapped, so only the touched pages are loaded)."""
+    for name, values in columns.items():
+        if values is None:
+            continue
+        column = np.load(Path(path) / f"{name}.npy", mmap_mode="r+")
+        column[offset:offset + len(values)] = values
+        column.flush()
+        del column
+
+def write_meta(path, **meta):
+    (Path(path) / META_FILE).write_text(json.dumps(meta, indent=2, default=str))
+
+class SampleSet:
+    """
+    Read-only, zero-copy view of a sample store written by
+    `run_flood_risk_simulation(samples_out=...)`.
+
+    Columns are memory-mapped .npy arrays trimmed to the samples that were
+    actually simulated (an adaptive run may stop before the budget); they
+    work with any NumPy / pandas code without loading the file.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE, 'r') as f:
+            self.meta = json.load(f)
+        self.count = int(self.meta['count'])
+        self.columns = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode="r")[:self.count]
+            for name in self.meta['columns']
+        }
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def chunks(self, chunk_size: int = 1_000_000):
+        """Yield {column: slice} views of `chunk_size` rows (for bounded-memory passes)."""
+        for start in range(0, self.count, chunk_size):
+            yield {name: values[start:start + chunk_size] for name, values in self.columns.items()}
+
+    def statistics(self, chunk_size: int = 1_000_000):
+        """Re-run the streaming summary (moments, histogram, failure rate) over the stored samples."""
+        from hydro.simulation.stats import StreamingStats
+
+        stats = StreamingStats(self.meta['q_low'], self.meta['q_high'])
+        for chunk in self.chunks(chunk_size):
+            stats.merge(StreamingStats(stats.low, stats.high, stats.bins).update(
+                chunk['discharge'], chunk['failed'], chunk.get('weight')
+            ))
+        return stats
+
+    def plot(self, output, chunk_size: int = 1_000_000):
+        """Re-draw the risk histogram from the stored samples (no simulation)."""
+        from hydro.simulation.monte_carlo import _plot_histogram
+
+        return _plot_histogram(self.statistics(chunk_size), self.count, output)
+
+def open_samples(path):
+    """Open a --samples-out folder; see SampleSet."""
+    return SampleSet(path)
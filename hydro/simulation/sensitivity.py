@@ -0,0 +1,200 @@
+import warnings
+import numpy as np
+from hydro.simulation.engine import HydraulicEngine, trapezoid_flow
+from hydro.simulation.monte_carlo import N_RANGE, DEPTH_RANGE
+
+# Uncertain inputs, in the order of the sample matrix columns
+PARAMETERS = ("manning_n", "slope", "channel_width", "side_slope", "depth")
+
+# Default ranges as fractions of the base value (n and depth as in stress-test)
+DEFAULT_SPREAD = {
+    "manning_n": N_RANGE,
+    "slope": (0.8, 1.2),          # Survey / bed-level uncertainty
+    "channel_width": (0.95, 1.05),
+    "side_slope": (0.8, 1.2),     # Bank erosion / slumping
+    "depth": DEPTH_RANGE,
+}
+
+OUTPUTS = ("discharge", "exceedance")
+
+# Rows per bootstrap block (Poisson weights are drawn per block, not per row)
+BLOCK_ROWS = 64
+
+def parameter_ranges(profile: dict, base_depth: float, overrides=None):
+    """(low, high) per parameter: explicit overrides, else the default spread around the profile value."""
+    ranges = {}
+    for name in PARAMETERS:
+        base = base_depth if name == "depth" else profile.get(name, 0.0)
+        low, high = DEFAULT_SPREAD[name]
+        ranges[name] = (base * low, base * high)
+    for name, bounds in (overrides or {}).items():
+        if name not in ranges:
+            raise ValueError(f"Unknown parameter '{name}'. Choose from: {', '.join(PARAMETERS)}")
+        low, high = (float(v) for v in bounds)
+        if high < low:
+            raise ValueError(f"Range for '{name}' must be low:high, got {low}:{high}")
+        ranges[name] = (low, high)
+    return ranges
+
+class SobolStats:
+    """
+    Mergeable accumulators for Saltelli (first-order) and Jansen (total-order)
+    Sobol estimators, for any number of model outputs.
+
+    Per output the running sums are: f_A, f_B, f_A², f_B², and per parameter i
+    f_B·(f_ABi − f_A) and (f_A − f_ABi)². Confidence intervals come from a
+    streaming Poisson bootstrap: every block of rows gets a Poisson(1) weight
+    per replicate, and each replicate keeps its own weighted sums, so the
+    samples themselves are never stored.
+    """
+    def __init__(self, outputs: int, parameters: int, replicates: int = 200, seed=None):
+        self.d = parameters
+        self.k = 4 + 2 * parameters
+        self.count = 0
+        self.sums = np.zeros((outputs, self.k))
+        self.replicate_counts = np.zeros(replicates)
+        self.replicate_sums = np.zeros((replicates, outputs, self.k))
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, f_a, f_b, f_ab):
+        """
+        Add one chunk. f_a, f_b: (outputs, m); f_ab: (parameters, outputs, m)
+        where f_ab[i] is the model with column i of A taken from B.
+        """
+        m = f_a.shape[-1]
+        terms = np.concatenate([
+            f_a[:, None], f_b[:, None], (f_a ** 2)[:, None], (f_b ** 2)[:, None],
+            np.moveaxis(f_b * (f_ab - f_a), 0, 1),
+            np.moveaxis((f_a - f_ab) ** 2, 0, 1),
+        ], axis=1)  # (outputs, k, m)
+        self.count += m
+        self.sums += terms.sum(axis=-1)
+
+        # Block sums, then one Poisson weight per (replicate, block)
+        starts = np.arange(0, m, BLOCK_ROWS)
+        blocks = np.add.reduceat(terms, starts, axis=-1)
+        sizes = np.diff(np.append(starts, m))
+        weights = self.rng.poisson(1.0, (len(self.replicate_counts), len(starts))).astype(float)
+        self.replicate_counts += weights @ sizes
+        self.replicate_sums += np.einsum("rb,okb->rok", weights, blocks)
+        return self
+
+    def _indices(self, sums, count):
+        """First- and total-order indices from (..., outputs, k) sums; count broadcasts against (..., outputs)."""
+        count = np.asarray(count, dtype=float)
+        d = self.d
+        mean = (sums[..., 0] + sums[..., 1]) / (2 * count)
+        variance = (sums[..., 2] + sums[..., 3]) / (2 * count) - mean ** 2
+        # Constant output (e.g. the flow never exceeds design): every index is 0
+        variance = np.where(variance > 1e-12 * mean ** 2, variance, 0.0)
+        safe = np.where(variance > 0, variance, 1.0)[..., None]
+        first = sums[..., 4:4 + d] / count[..., None] / safe
+        total = sums[..., 4 + d:] / (2 * count[..., None]) / safe
+        constant = (variance == 0)[..., None]
+        return np.where(constant, 0.0, first), np.where(constant, 0.0, total), variance
+
+    def indices(self, confidence: float = 0.95):
+        """Point estimates plus percentile bootstrap bounds, each (outputs, parameters)."""
+        first, total, variance = self._indices(self.sums, self.count)
+        boot_first, boot_total, _ = self._indices(self.replicate_sums, np.maximum(self.replicate_counts, 1)[:, None])
+        tail = (1 - confidence) / 2 * 100
+        return {
+            "first": first,
+            "total": total,
+            "first_ci": np.percentile(boot_first, [tail, 100 - tail], axis=0),
+            "total_ci": np.percentile(boot_total, [tail, 100 - tail], axis=0),
+            "variance": variance,
+        }
+
+def _evaluate(points, profile: dict, design_q: float):
+    """Model outputs for (..., d) parameter points: discharge and the exceedance indicator."""
+    columns = dict(zip(PARAMETERS, np.moveaxis(points, -1, 0)))
+    discharge = trapezoid_flow(
+        columns['depth'], columns['manning_n'], columns['slope'],
+        columns['channel_width'], columns['side_slope']
+    )['discharge']
+    return np.stack([discharge, (discharge > design_q).astype(float)])
+
+def sobol_analysis(profile_path, base_depth: float, samples: int = 65_536, ranges=None,
+                   seed=None, chunk_size: int = 16_384, bootstrap: int = 200,
+                   confidence: float = 0.95, sampler: str = "sobol", design_q=None):
+    """
+    Variance-based global sensitivity of discharge and of flow exceedance to
+    Manning's n, bed slope, bottom width, side slope and water depth.
+
+    Builds Saltelli sample matrices A, B and AB_i (A with column i from B) over
+    the parameter `ranges` and evaluates all N·(d+2) points through the
+    vectorized Manning kernel, `chunk_size` base rows at a time so memory is
+    bounded whatever N is. "exceedance" is the indicator that the flow exceeds
+    `design_q` (default: the base profile's capacity at threshold_high).
+
+    Samplers: "sobol" (scrambled Sobol points over the 2d columns of [A | B])
+    or "uniform". Returns first-order (Saltelli 2010) and total-order (Jansen)
+    indices with Poisson-bootstrap confidence intervals per output.
+    """
+    if sampler not in ("sobol", "uniform"):
+        raise ValueError(f"Unknown sampler '{sampler}'. Choose from: sobol, uniform")
+
+    engine = HydraulicEngine(profile_path)
+    profile = engine.profile
+    ranges = parameter_ranges(profile, base_depth, ranges)
+    if design_q is None:
+        design_q = float(engine.calculate_discharge_batch(profile['threshold_high'])['discharge'])
+
+    d = len(PARAMETERS)
+    low = np.array([ranges[name][0] for name in PARAMETERS])
+    span = np.array([ranges[name][1] - ranges[name][0] for name in PARAMETERS])
+
+    sample_seed, bootstrap_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(sample_seed)
+    if sampler == "sobol":
+        from scipy.stats import qmc
+
+        sequence = qmc.Sobol(d=2 * d, scramble=True, seed=rng)
+    stats = SobolStats(len(OUTPUTS), d, bootstrap, bootstrap_seed)
+
+    done = 0
+    chunk_size = max(1, min(chunk_size, samples))
+    while done < samples:
+        m = min(chunk_size, samples - done)
+
+        # 1. Base matrices A | B on the unit hypercube, scaled to the ranges
+        if sampler == "sobol":
+            with warnings.catch_warnings():
+                # Sobol prefers powers of 2; any chunk size is still a valid scrambled set
+                warnings.simplefilter("ignore", UserWarning)
+                unit = sequence.random(m)
+        else:
+            unit = rng.random((m, 2 * d))
+        a = low + span * unit[:, :d]
+        b = low + span * unit[:, d:]
+
+        # 2. AB_i: A with column i swapped in from B, all d at once -> (d, m, d)
+        ab = np.broadcast_to(a, (d, m, d)).copy()
+        ab[np.arange(d), :, np.arange(d)] = b.T
+
+        # 3. One vectorized pass over the (d+2)·m points
+        f = _evaluate(np.concatenate([a[None], b[None], ab]), profile, design_q)  # (outputs, d+2, m)
+        stats.update(f[:, 0], f[:, 1], np.moveaxis(f[:, 2:], 1, 0))
+        done += m
+
+    result = stats.indices(confidence)
+    return {
+        "parameters": list(PARAMETERS),
+        "ranges": ranges,
+        "outputs": {
+            name: {
+                "first": result['first'][o],
+                "total": result['total'][o],
+                "first_ci": result['first_ci'][:, o].T,
+                "total_ci": result['total_ci'][:, o].T,
+                "variance": float(result['variance'][o]),
+            }
+            for o, name in enumerate(OUTPUTS)
+        },
+        "design_q": design_q,
+        "samples": samples,
+        "evaluations": samples * (d + 2),
+        "sampler": sampler,
+        "confidence": confidence,
+    }
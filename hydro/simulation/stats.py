@@ -0,0 +1,148 @@
+import numpy as np
+
+class StreamingStats:
+    """
+    Fixed-size, mergeable summary of a stream of discharge samples.
+
+    Keeps running moments (count / weight / mean / M2) plus a fine fixed-bin
+    histogram over a known value range. The histogram doubles as a quantile
+    sketch (error bounded by one bin width) and is re-binned for the risk plot,
+    so memory stays constant no matter how many samples are pushed through.
+
+    Samples may carry likelihood-ratio weights (importance sampling); with no
+    weights every sample counts as 1 and the plain Monte Carlo formulas apply.
+    Each `update` call is also recorded as one replicate estimate of the failure
+    probability, which gives a valid interval for randomized QMC / LHS chunks.
+    """
+    def __init__(self, low: float, high: float, bins: int = 3000):
+        if high <= low:
+            high = low + 1e-9
+        self.low = float(low)
+        self.high = float(high)
+        self.count = 0
+        self.weight = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.failures = 0.0
+        self.failures_sq = 0.0
+        self.replicates = 0
+        self.replicate_sum = 0.0
+        self.replicate_sumsq = 0.0
+        self.histogram = np.zeros(bins, dtype=float)
+
+    @property
+    def bins(self):
+        return len(self.histogram)
+
+    @property
+    def variance(self):
+        if self.count < 2 or self.weight <= 0:
+            return 0.0
+        return self.m2 / self.weight * self.count / (self.count - 1)
+
+    @property
+    def failure_probability(self):
+        """Unbiased estimate of P(failure) as a fraction (mean of weight * indicator)."""
+        return self.failures / self.count if self.count else 0.0
+
+    def failure_halfwidth(self, z: float = 1.96, replicates: bool = False):
+        """
+        Half-width of the confidence interval on the failure probability.
+        With `replicates` (and at least 8 chunks) the spread between chunk
+        estimates is used, otherwise the per-sample variance. With no failures
+        seen yet the 'rule of three' (3/N) is used instead of 0, so adaptive
+        runs cannot stop before the tail has been explored.
+        """
+        if self.count == 0:
+            return float("inf")
+        if self.failures == 0:
+            return 3.0 / self.count
+        if replicates and self.replicates >= 8:
+            r = self.replicates
+            var = max(self.replicate_sumsq - self.replicate_sum**2 / r, 0.0) / (r - 1)
+            return z * (var / r) ** 0.5
+        p = self.failure_probability
+        var = max(self.failures_sq / self.count - p**2, 0.0)
+        return z * (var / max(self.count - 1, 1)) ** 0.5
+
+    def update(self, values, failures=None, weights=None):
+        """
+        Push a chunk of samples into the summary.
+        `failures` is a boolean mask (or a plain count when unweighted).
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return self
+        w = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float)
+
+        # 1. Moments of this chunk, merged in with Chan's parallel formula
+        chunk = StreamingStats(self.low, self.high, self.bins)
+        chunk.count = values.size
+        chunk.weight = float(w.sum())
+        chunk.mean = float(np.dot(w, values) / chunk.weight)
+        chunk.m2 = float(np.dot(w, (values - chunk.mean) ** 2))
+
+        # 2. Failure estimator terms
+        if failures is None:
+            pass
+        elif np.ndim(failures) == 0:
+            chunk.failures = chunk.failures_sq = float(failures)
+        else:
+            wf = np.where(failures, w, 0.0)
+            chunk.failures = float(wf.sum())
+            chunk.failures_sq = float(np.dot(wf, wf))
+        chunk.replicates = 1
+        chunk.replicate_sum = chunk.failures / chunk.count
+        chunk.replicate_sumsq = chunk.replicate_sum**2
+
+        # 3. Histogram (values outside the range land in the edge bins)
+        scale = self.bins / (self.high - self.low)
+        idx = np.clip(((values - self.low) * scale).astype(np.int64), 0, self.bins - 1)
+        chunk.histogram = np.bincount(idx, weights=w, minlength=self.bins)
+
+        return self.merge(chunk)
+
+    def merge(self, other: "StreamingStats"):
+        """Combine another summary (e.g. from a worker shard) into this one."""
+        if other.count == 0:
+            return self
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Cannot merge summaries with different histogram ranges.")
+
+        total = self.weight + other.weight
+        delta = other.mean - self.mean
+        self.mean += delta * other.weight / total
+        self.m2 += other.m2 + delta**2 * self.weight * other.weight / total
+        self.weight = total
+        self.count += other.count
+        self.failures += other.failures
+        self.failures_sq += other.failures_sq
+        self.replicates += other.replicates
+        self.replicate_sum += other.replicate_sum
+        self.replicate_sumsq += other.replicate_sumsq
+        self.histogram += other.histogram
+        return self
+
+    def quantile(self, q: float):
+        """Approximate quantile (0-1) by linear interpolation inside the sketch bins."""
+        total = self.histogram.sum()
+        if total <= 0:
+            return float("nan")
+        width = (self.high - self.low) / self.bins
+        cumulative = np.cumsum(self.histogram)
+        rank = q * total
+        i = int(np.searchsorted(cumulative, rank, side="left"))
+        i = min(i, self.bins - 1)
+        below = cumulative[i - 1] if i > 0 else 0.0
+        inside = self.histogram[i]
+        fraction = (rank - below) / inside if inside > 0 else 0.0
+        return self.low + (i + fraction) * width
+
+    def coarse_histogram(self, bins: int = 30):
+        """Re-bin the sketch into a small histogram for plotting -> (counts, edges)."""
+        edges = np.linspace(self.low, self.high, bins + 1)
+        width = (self.high - self.low) / self.bins
+        centers = self.low + (np.arange(self.bins) + 0.5) * width
+        target = np.clip(np.searchsorted(edges, centers, side="right") - 1, 0, bins - 1)
+        counts = np.bincount(target, weights=self.histogram, minlength=bins)
+        return counts, edges
@@ -0,0 +1,271 @@
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+import numpy as np
+from pathlib import Path
+
+# Problem-size multipliers for every benchmark
+SCALES = {"small": 1, "medium": 4, "large": 16}
+
+# A benchmark is slower than its baseline when throughput drops by more than
+# the tolerance, and heavier when peak memory grows by more than it (+ slack)
+DEFAULT_TOLERANCE = 0.25
+MEMORY_SLACK_MB = 1.0
+
+# --- Synthetic inputs ----------------------------------------------------------
+
+def synthetic_profile(**overrides):
+    """A plausible trapezoidal basin profile."""
+    return {
+        "basin_name": "Synthetic",
+        "channel_width": 12.0,
+        "slope": 0.0015,
+        "manning_n": 0.032,
+        "side_slope": 1.5,
+        "threshold_high": 4.0,
+        **overrides,
+    }
+
+def write_profile(path, **overrides):
+    path = Path(path)
+    path.write_text(json.dumps(synthetic_profile(**overrides)))
+    return str(path)
+
+def synthetic_levels(path, rows: int, stations: int = 500, seed: int = 0):
+    """Telemetry CSV (station,level) with a few stations running hot."""
+    rng = np.random.default_rng(seed)
+    station = rng.integers(0, stations, rows)
+    level = rng.gamma(4.0, 0.6, rows) + (station % 50 == 0) * 2.0
+    with open(path, "w") as f:
+        f.write("station,level\n")
+        f.writelines(f"ST{s:05d},{v:.3f}\n" for s, v in zip(station.tolist(), level.tolist()))
+    return str(path)
+
+def synthetic_dem(path, size: int, seed: int = 0):
+    """Square .npy DEM (+ JSON sidecar): a valley along the middle column with noise."""
+    rng = np.random.default_rng(seed)
+    x = np.abs(np.linspace(-1.0, 1.0, size, dtype=np.float32))
+    y = np.linspace(0.0, 1.0, size, dtype=np.float32)[:, None]
+    dem = 40.0 + 25.0 * x[None, :] + 5.0 * y + rng.normal(0.0, 0.3, (size, size)).astype(np.float32)
+    path = Path(path)
+    np.save(path, dem)
+    path.with_suffix(".json").write_text(json.dumps({"transform": [3.0, 1e-4, 0, 7.5, 0, -1e-4]}))
+    return str(path)
+
+# --- Benchmarks ----------------------------------------------------------------
+# Each one prepares its inputs under `workdir` and returns (run, items, unit);
+# only `run()` is timed.
+
+def _bench_discharge_scalar(workdir, scale):
+    from hydro.simulation.engine import HydraulicEngine
+
+    engine = HydraulicEngine(synthetic_profile())
+    depths = np.linspace(0.1, 6.0, 5_000 * scale).tolist()
+    return (lambda: [engine.calculate_discharge(d) for d in depths]), len(depths), "calls"
+
+def _bench_discharge_batch(workdir, scale):
+    from hydro.simulation.engine import HydraulicEngine
+
+    engine = HydraulicEngine(synthetic_profile())
+    depths = np.linspace(0.1, 6.0, 1_000_000 * scale)
+    return (lambda: engine.calculate_discharge_batch(depths)), depths.size, "depths"
+
+def _bench_stress_test(workdir, scale):
+    from hydro.simulation.monte_carlo import run_flood_risk_simulation
+
+    profile = write_profile(Path(workdir) / "stress_profile.json")
+    iterations = 250_000 * scale
+    graph = str(Path(workdir) / "risk.png")
+    return (lambda: run_flood_risk_simulation(profile, 3.5, iterations, seed=1, graph_path=graph)), iterations, "samples"
+
+def _bench_design(workdir, scale):
+    from hydro.simulation.engine import HydraulicEngine
+
+    engine = HydraulicEngine(synthetic_profile())
+    targets = np.linspace(20.0, 800.0, 50 * scale).tolist()
+    return (lambda: [engine.design_optimal_channel(q, 4.0) for q in targets]), len(targets), "designs"
+
+def _bench_design_batch(workdir, scale):
+    from hydro.simulation.design import solve_min_width
+
+    profile = synthetic_profile()
+    targets = np.linspace(20.0, 800.0, 20_000 * scale)
+    return (lambda: solve_min_width(targets, 4.0, profile['slope'], profile['manning_n'], profile['side_slope'])), targets.size, "designs"
+
+def _bench_rating(workdir, scale):
+    from hydro.simulation.rating import RatingCurve
+
+    curve = RatingCurve.build(synthetic_profile())
+    flows = np.linspace(0.0, curve.max_discharge, 1_000_000 * scale)
+    return (lambda: curve.normal_depth(flows)), flows.size, "flows"
+
+def _bench_report(workdir, scale):
+    from hydro.hazard import report
+
+    rows = 200_000 * scale
+    path = synthetic_levels(Path(workdir) / "levels.csv", rows)
+
+    def run():
+        report.console.quiet = True
+        try:
+            return report.generate_styled_report(path, 4.5)
+        finally:
+            report.console.quiet = False
+    return run, rows, "readings"
+
+def _bench_cross_section(workdir, scale):
+    from hydro.visualization.plotter import plot_cross_section
+
+    profile = synthetic_profile()
+    depths = np.linspace(0.5, 5.0, 4 * scale).tolist()
+    output = Path(workdir) / "section.png"
+    return (lambda: [plot_cross_section(profile, d, output=output) for d in depths]), len(depths), "images"
+
+def _bench_dem_sample(workdir, scale):
+    from hydro.utils.dem_loader import DemSampler
+
+    dem = synthetic_dem(Path(workdir) / "sample_dem.npy", 2048)
+    rng = np.random.default_rng(1)
+    points = 200_000 * scale
+    lats = 7.5 - rng.random(points) * 2048e-4
+    lons = 3.0 + rng.random(points) * 2048e-4
+
+    def run():
+        sampler = DemSampler()
+        try:
+            return sampler.sample(dem, lats, lons)
+        finally:
+            sampler.close()
+    return run, points, "points"
+
+def _bench_inundation(workdir, scale):
+    from hydro.hazard.inundation import map_inundation
+
+    size = 1024 * int(round(scale ** 0.5))
+    dem = synthetic_dem(Path(workdir) / "flood_dem.npy", size)
+    output = str(Path(workdir) / "flood_mask.npy")
+    return (lambda: map_inundation(dem, 52.0, output, tile_size=512)), size * size, "cells"
+
+def _bench_sensitivity(workdir, scale):
+    from hydro.simulation.sensitivity import sobol_analysis
+
+    samples = 32_768 * scale
+    profile = synthetic_profile()
+    return (lambda: sobol_analysis(profile, 3.5, samples, seed=1, bootstrap=100)), samples * 7, "evaluations"
+
+BENCHMARKS = {
+    "discharge-scalar": _bench_discharge_scalar,
+    "discharge-batch": _bench_discharge_batch,
+    "stress-test": _bench_stress_test,
+    "design": _bench_design,
+    "design-batch": _bench_design_batch,
+    "rating-inverse": _bench_rating,
+    "report": _bench_report,
+    "cross-section": _bench_cross_section,
+    "dem-sample": _bench_dem_sample,
+    "inundation": _bench_inundation,
+    "sensitivity": _bench_sensitivity,
+}
+
+# --- Runner --------------------------------------------------------------------
+
+def measure(run, repeat: int = 3):
+    """Best / median wall time over `repeat` timed runs (after one warm-up), then peak memory of one traced run."""
+    run()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"best_s": min(times), "median_s": statistics.median(times), "peak_mb": peak / 1e6}
+
+def environment():
+    import hydro
+
+    return {
+        "hydro": hydro.__version__,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def run_suite(workdir, scale: str = "small", only=None, repeat: int = 3, on_result=None):
+    """
+    Run the selected benchmarks at one scale on synthetic inputs generated
+    under `workdir`. Returns {"environment", "scale", "results": {name: {...}}}
+    with throughput (items per second, from the best run) and traced peak memory.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale '{scale}'. Choose from: {', '.join(SCALES)}")
+    names = list(only) if only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}. Choose from: {', '.join(BENCHMARKS)}")
+
+    # Keep rating tables / cached results of the run out of the user's cache
+    previous = os.environ.get("HYDRO_CACHE_DIR")
+    os.environ["HYDRO_CACHE_DIR"] = str(Path(workdir) / "cache")
+    results = {}
+    try:
+        for name in names:
+            run, items, unit = BENCHMARKS[name](workdir, SCALES[scale])
+            timing = measure(run, repeat)
+            results[name] = {"items": items, "unit": unit, "throughput": items / timing['best_s'], **timing}
+            if on_result:
+                on_result(name, results[name])
+    finally:
+        if previous is None:
+            os.environ.pop("HYDRO_CACHE_DIR", None)
+        else:
+            os.environ["HYDRO_CACHE_DIR"] = previous
+    return {"environment": environment(), "scale": scale, "results": results}
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE):
+    """
+    Per benchmark: throughput and peak-memory ratios against the baseline and a
+    status of "ok", "faster", "slower", "heavier" or "new".
+    """
+    if baseline.get("scale") != current.get("scale"):
+        raise ValueError(f"Baseline was recorded at scale '{baseline.get('scale')}', not '{current.get('scale')}'")
+
+    rows = {}
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            rows[name] = {"status": "new"}
+            continue
+        speed = result['throughput'] / reference['throughput']
+        memory = result['peak_mb'] / reference['peak_mb'] if reference['peak_mb'] > 0 else 1.0
+        if speed < 1 - tolerance:
+            status = "slower"
+        elif result['peak_mb'] > reference['peak_mb'] * (1 + tolerance) + MEMORY_SLACK_MB:
+            status = "heavier"
+        elif speed > 1 + tolerance:
+            status = "faster"
+        else:
+            status = "ok"
+        rows[name] = {"status": status, "speed": speed, "memory": memory}
+    return rows
+
+def save_results(results: dict, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2))
+    return str(path)
+
+def load_results(path):
+    with open(path, 'r') as f:
+        return json.load(f)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+# Bump with any change that alters cached results (kernels, samplers,
+# statistics, design solver, result layout) - invalidates old entries
+RESULT_CACHE_VERSION = 1
+
+def cache_dir(*parts: str):
+    """
+    Root folder for on-disk caches (override with HYDRO_CACHE_DIR).
+    Sub-folders are created on demand.
+    """
+    root = os.environ.get("HYDRO_CACHE_DIR") or Path.home() / ".cache" / "hydro-flow"
+    path = Path(root).joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def profile_hash(profile: dict, **params):
+    """
+    Stable content hash of a basin profile plus any extra parameters.
+    Key order and file formatting do not change the hash, edits to any value do.
+    """
+    payload = json.dumps({"profile": profile, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResultCache:
+    """
+    Content-addressed store for finished runs (stress-test, design sweeps).
+
+    An entry is a folder named by the run key, holding `result.json` plus any
+    artifacts (rendered graphs, result tables). Reading an entry refreshes its
+    last-use time; after every write, entries unused for longer than `max_age`
+    seconds are dropped, then the least recently used ones until the store fits
+    in `max_bytes` (HYDRO_CACHE_MAX_MB / HYDRO_CACHE_MAX_AGE_DAYS override the
+    defaults).
+    """
+    def __init__(self, section: str = "results", max_bytes=None, max_age=None):
+        self.root = cache_dir(section)
+        if max_bytes is None:
+            max_bytes = float(os.environ.get("HYDRO_CACHE_MAX_MB", 512)) * 1e6
+        if max_age is None:
+            max_age = float(os.environ.get("HYDRO_CACHE_MAX_AGE_DAYS", 30)) * 86400
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def key(command: str, profile: dict, **params):
+        """Run key: profile contents + command parameters + RESULT_CACHE_VERSION."""
+        return profile_hash(profile, command=command, version=RESULT_CACHE_VERSION, **params)
+
+    def get(self, key: str):
+        """Cached (result, {artifact name: path}) or None."""
+        entry = self.root / key
+        meta = entry / "result.json"
+        try:
+            if time.time() - meta.stat().st_mtime > self.max_age:
+                shutil.rmtree(entry, ignore_errors=True)
+                return None
+            with open(meta, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        artifacts = {name: entry / filename for name, filename in record['artifacts'].items()}
+        if not all(path.exists() for path in artifacts.values()):
+            return None
+        os.utime(meta)  # LRU bookkeeping: last use
+        return record['result'], artifacts
+
+    def put(self, key: str, result: dict, artifacts=None):
+        """Store a result (JSON-serializable) and copies of its artifact files."""
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir()
+        names = {}
+        for name, path in (artifacts or {}).items():
+            names[name] = f"{name}{Path(path).suffix}"
+            shutil.copyfile(path, tmp / names[name])
+        with open(tmp / "result.json", 'w') as f:
+            json.dump({"result": result, "artifacts": names}, f)
+
+        entry = self.root / key
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp, entry)
+        self.evict()
+
+    def entries(self):
+        """[(last use, bytes, folder)] for every complete entry, least recently used first."""
+        found = []
+        for entry in self.root.iterdir():
+            meta = entry / "result.json"
+            if entry.name.startswith(".") or not meta.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            found.append((meta.stat().st_mtime, size, entry))
+        return sorted(found)
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under the size limit."""
+        entries = self.entries()
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for last_use, size, entry in entries:
+            if now - last_use > self.max_age or total > self.max_bytes:
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def purge(self, older_than=None):
+        """Remove every entry, or only those unused for more than `older_than` seconds."""
+        removed = 0
+        for last_use, _, entry in self.entries():
+            if older_than is None or time.time() - last_use > older_than:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        return removed
+
+def cache_usage():
+    """{section: (files, bytes)} for every folder under the cache root."""
+    usage = {}
+    for section in sorted(cache_dir().iterdir()):
+        if section.is_dir():
+            files = [f for f in section.rglob("*") if f.is_file()]
+            usage[section.name] = (len(files), sum(f.stat().st_size for f in files))
+    return usage
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+def write_table(df, path: str):
+    """Write a results table as Parquet (.parquet), JSON records (.json) or CSV (anything else)."""
+    suffix = Path(path).suffix.lower()
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix == ".json":
+        df.to_json(path, orient="records", indent=2)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+class TableStream:
+    """
+    Append-only results table written chunk by chunk, so a result set never
+    has to fit in memory: Parquet (.parquet) row groups or CSV (anything else).
+    """
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.parquet = self.path.suffix.lower() == ".parquet"
+        self._writer = None
+        self.rows = 0
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
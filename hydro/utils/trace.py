@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Active tracer; None means tracing is off and every hook is a no-op
+_TRACER = None
+
+class _NoSpan:
+    """Shared do-nothing context manager handed out while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "path", "start")
+
+    def __init__(self, tracer, name: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.path = (stack[-1] if stack else ()) + (self.name,)
+        stack.append(self.path)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer._stack().pop()
+        self.tracer.spans.append((self.path, self.start, end, threading.get_ident(), self.args))
+        return False
+
+class Tracer:
+    """
+    Records nested timing spans and named counters for one CLI run.
+
+    Spans are (path, start_ns, end_ns, thread, args) tuples, where `path` is
+    the tuple of enclosing span names, so the summary can nest them and the
+    Chrome trace can be opened in chrome://tracing or Perfetto for a flame view.
+    Work done inside worker processes is not traced.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.spans = []
+        self.counters = defaultdict(float)
+        self.samples = []
+        self._local = threading.local()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def count(self, name: str, value=1):
+        self.counters[name] += value
+        self.samples.append((name, time.perf_counter_ns(), self.counters[name]))
+
+    def summary(self):
+        """
+        One row per span path, in first-start order: calls, total and self time
+        (total minus time spent in direct child spans), in seconds.
+        """
+        rows = {}
+        for path, start, end, _, _ in sorted(self.spans, key=lambda span: span[1]):
+            row = rows.setdefault(path, {"path": path, "calls": 0, "total": 0.0, "children": 0.0})
+            row['calls'] += 1
+            row['total'] += (end - start) / 1e9
+        for path, start, end, _, _ in self.spans:
+            parent = rows.get(path[:-1])
+            if parent is not None:
+                parent['children'] += (end - start) / 1e9
+        for row in rows.values():
+            row['self'] = max(row['total'] - row.pop('children'), 0.0)
+        return list(rows.values())
+
+    def chrome_trace(self):
+        """Trace Event Format: complete ("X") events per span plus counter ("C") tracks."""
+        pid = os.getpid()
+        events = [
+            {"name": path[-1], "cat": "hydro", "ph": "X", "pid": pid, "tid": tid,
+             "ts": (start - self.origin) / 1000, "dur": (end - start) / 1000,
+             "args": {key: _plain(value) for key, value in args.items()}}
+            for path, start, end, tid, args in self.spans
+        ]
+        events += [
+            {"name": name, "cat": "hydro", "ph": "C", "pid": pid, "ts": (stamp - self.origin) / 1000,
+             "args": {name: value}}
+            for name, stamp, value in self.samples
+        ]
+        return {
+            "traceEvents": sorted(events, key=lambda event: event['ts']),
+            "displayTimeUnit": "ms",
+            "otherData": {"counters": dict(self.counters)},
+        }
+
+    def write(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+def _plain(value):
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+def enable():
+    """Start recording; returns the active tracer."""
+    global _TRACER
+    _TRACER = Tracer()
+    return _TRACER
+
+def disable():
+    """Stop recording; returns the tracer that was active (or None)."""
+    global _TRACER
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+def enabled():
+    return _TRACER is not None
+
+def span(name: str, **args):
+    """`with span("physics", rows=n):` - a timed, nestable stage (free when tracing is off)."""
+    if _TRACER is None:
+        return _NO_SPAN
+    return _Span(_TRACER, name, args)
+
+def count(name: str, value=1):
+    """Add to a named counter (evaluations, rows, bytes_read, ...)."""
+    if _TRACER is not None:
+        _TRACER.count(name, value)
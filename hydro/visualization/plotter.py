@@ -1,52 +1,188 @@
-import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
+from hydro.utils import trace
 
-def plot_cross_section(profile: dict, depth: float, filename: str = "cross_section.png"):
+# Default output folder for single images
+WORKSPACE = Path("local_workspace")
+
+def new_figure(figsize=(10, 6), dpi: int = 100):
+    """
+    Stand-alone Agg figure (object-oriented API, no pyplot state machine).
+    Safe to use from several threads / processes at once; matplotlib is
+    imported on first use so it stays out of CLI start-up.
+    """
+    with trace.span("import matplotlib"):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    return figure
+
+def _output_path(output):
+    path = Path(output)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+class CrossSectionRenderer:
+    """
+    Reusable cross-section figure for one channel profile.
+
+    The banks, axes and styling are rasterized once and kept as a background;
+    every frame restores it and redraws only the water polygon, the surface
+    line and the depth label (blitting), then encodes the pixel buffer. Axis limits
+    are fixed from `max_depth` so frames line up in an animation.
+    """
+    def __init__(self, profile: dict, max_depth: float, figsize=(10, 6), dpi: int = 100):
+        from matplotlib.patches import Polygon
+
+        self.b = profile['channel_width']
+        self.z = profile.get('side_slope', 0.0)
+        b, z = self.b, self.z
+        height = max_depth * 1.5  # Add some freeboard for visuals
+
+        self.figure = new_figure(figsize, dpi)
+        ax = self.figure.add_subplot()
+
+        # Coordinate points for the Trapezoid (Bank)
+        # Left Bank Top, Left Toe, Right Toe, Right Bank Top
+        x_bank = [-b/2 - z*height, -b/2, b/2, b/2 + z*height]
+        y_bank = [height, 0, 0, height]
+        ax.plot(x_bank, y_bank, 'k-', linewidth=3, label='River Bed')
+        ax.fill_between(x_bank, y_bank, 0, color='#8B4513', alpha=0.3)  # Earth color
+
+        # Water: filled trapezoid up to the surface + surface line (updated per frame)
+        self.water = Polygon(np.zeros((4, 2)), closed=True, color='#00BFFF', alpha=0.6)
+        ax.add_patch(self.water)
+        self.surface, = ax.plot([], [], 'b-', linewidth=2, label='Water Level')
+
+        # Styles
+        ax.set_title(f"Hydraulic Cross-Section: {profile['basin_name']}", fontsize=14)
+        ax.set_xlabel("Channel Width (m)")
+        ax.set_ylabel("Elevation (m)")
+        ax.set_xlim(x_bank[0] * 1.05, x_bank[-1] * 1.05)
+        ax.set_ylim(0, height * 1.05)
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend(loc="upper right")
+        self.label = ax.text(0.02, 0.96, "", transform=ax.transAxes, fontsize=12, va="top",
+                             bbox={"boxstyle": "round", "facecolor": "white", "alpha": 0.8})
+        self.ax = ax
+
+        # Dynamic artists are skipped by canvas.draw() and blitted per frame
+        for artist in (self.water, self.surface, self.label):
+            artist.set_animated(True)
+        self._background = None
+
+    def update(self, depth: float):
+        """Move the water artists to a new depth."""
+        b, z = self.b, self.z
+        left, right = -b/2 - z*depth, b/2 + z*depth
+        self.water.set_xy([(left, depth), (-b/2, 0), (b/2, 0), (right, depth)])
+        self.surface.set_data([left, right], [depth, depth])
+        self.label.set_text(f"Water Level: {depth:.2f} m")
+
+    def draw(self, depth: float):
+        """Blit one depth onto the cached background; returns the canvas."""
+        canvas = self.figure.canvas
+        if self._background is None:
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.figure.bbox)
+        self.update(depth)
+        canvas.restore_region(self._background)
+        for artist in (self.water, self.surface, self.label):
+            self.ax.draw_artist(artist)
+        return canvas
+
+    def render(self, depth: float, output):
+        """Draw one depth and save it (PNG fast path, other formats through savefig)."""
+        path = _output_path(output)
+        if path.suffix.lower() != ".png":
+            for artist in (self.water, self.surface, self.label):
+                artist.set_animated(False)
+            self.update(depth)
+            self.figure.savefig(path)
+            for artist in (self.water, self.surface, self.label):
+                artist.set_animated(True)
+            return str(path)
+
+        from PIL import Image
+
+        canvas = self.draw(depth)
+        Image.frombuffer("RGBA", canvas.get_width_height(), canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(path, compress_level=1)
+        return str(path)
+
+def plot_cross_section(profile: dict, depth: float, filename: str = "cross_section.png", output=None):
     """
     Generates a professional engineering cross-section of the river channel.
+    Written to `output`, or local_workspace/<filename> by default.
     """
-    b = profile['channel_width']
-    z = profile.get('side_slope', 0.0)
-    name = profile['basin_name']
-    
-    # Calculate dimensions for plotting
-    top_width = b + (2 * z * depth)
-    height = depth * 1.5 # Add some freeboard for visuals
-    
-    # Coordinate points for the Trapezoid (Bank)
-    # Left Bank Top, Left Toe, Right Toe, Right Bank Top
-    x_bank = [-b/2 - z*height, -b/2, b/2, b/2 + z*height]
-    y_bank = [height, 0, 0, height]
-    
-    # Coordinate points for Water Level
-    x_water = [-b/2 - z*depth, b/2 + z*depth]
-    y_water = [depth, depth]
-    
-    plt.figure(figsize=(10, 6))
-    
-    # Plot Banks
-    plt.plot(x_bank, y_bank, 'k-', linewidth=3, label='River Bed')
-    plt.fill_between(x_bank, y_bank, 0, color='#8B4513', alpha=0.3) # Earth color
-    
-    # Plot Water
-    plt.plot(x_water, y_water, 'b-', linewidth=2, label=f'Water Level ({depth}m)')
-    plt.fill_between(x_bank, y_bank, 0, where=(np.array(y_bank) <= depth), color='#00BFFF', alpha=0.6, interpolate=True)
-    
-    # Plot Water Surface specifically (to handle the fill correctly)
-    plt.fill_between([-b/2 - z*depth, b/2 + z*depth], [depth, depth], [0,0], color='#00BFFF', alpha=0.5)
-
-    # Styles
-    plt.title(f"Hydraulic Cross-Section: {name}", fontsize=14)
-    plt.xlabel("Channel Width (m)")
-    plt.ylabel("Elevation (m)")
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.legend()
-    
-    # Save
-    output_path = Path("local_workspace") / filename
-    output_path.parent.mkdir(exist_ok=True) # Ensure folder exists
-    plt.savefig(output_path)
-    plt.close()
-    
-    return str(output_path)
\ No newline at end of file
+    return CrossSectionRenderer(profile, depth).render(depth, output or WORKSPACE / filename)
+
+def _render_batch(task):
+    """Worker: one renderer (one figure) for a contiguous run of frames."""
+    profile, max_depth, frames = task
+    renderer = CrossSectionRenderer(profile, max_depth)
+    return [renderer.render(depth, path) for depth, path in frames]
+
+def render_cross_sections(profile: dict, depths, output_dir, workers: int = 1, pattern: str = "frame_{:04d}.png"):
+    """
+    Render one cross-section frame per depth into `output_dir`.
+    Frames are split into contiguous batches, one per worker process, and each
+    batch reuses a single figure. Returns the frame paths in depth order.
+    """
+    depths = [float(d) for d in depths]
+    if not depths:
+        raise ValueError("No depths to render.")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    frames = [(depth, output_dir / pattern.format(i)) for i, depth in enumerate(depths)]
+    max_depth = max(depths)
+
+    workers = max(1, min(workers, len(frames)))
+    size = -(-len(frames) // workers)
+    tasks = [(profile, max_depth, frames[i:i + size]) for i in range(0, len(frames), size)]
+    if workers == 1:
+        batches = map(_render_batch, tasks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_render_batch, tasks))
+    return [path for batch in batches for path in batch]
+
+def assemble_animation(frames, output, fps: float = 10.0):
+    """
+    Stitch rendered frames into an animation with Pillow (ships with
+    matplotlib): .gif, animated .png (APNG) or .webp, looping forever.
+    """
+    from PIL import Image
+
+    path = _output_path(output)
+    images = [Image.open(frame) for frame in frames]
+    if path.suffix.lower() == ".gif":
+        # One shared palette (from the deepest frame) instead of quantizing every frame from scratch
+        palette = images[-1].convert("RGB").quantize(colors=255)
+        no_dither = getattr(Image, "Dither", Image).NONE  # Image.Dither is Pillow >= 9.1 (matplotlib only needs 6.2)
+        images = [image.convert("RGB").quantize(palette=palette, dither=no_dither) for image in images]
+    images[0].save(path, save_all=True, append_images=images[1:], duration=int(1000 / fps), loop=0)
+    return str(path)
+
+def plot_risk_histogram(counts, edges, mean: float, iterations: int, output):
+    """Monte Carlo risk histogram from pre-binned counts (object-oriented Agg API)."""
+    figure = new_figure()
+    ax = figure.add_subplot()
+    ax.hist(edges[:-1], bins=edges, weights=counts, color='#4682B4', edgecolor='black', alpha=0.7)
+
+    # Add mean line
+    ax.axvline(mean, color='red', linestyle='dashed', linewidth=2, label=f'Mean Flow: {mean:.1f}')
+
+    ax.set_title(f"Monte Carlo Risk Distribution ({iterations} Iterations)", fontsize=14)
+    ax.set_xlabel("Discharge (m³/s)")
+    ax.set_ylabel("Frequency")
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    path = _output_path(output)
+    with trace.span("savefig", path=str(path)):
+        figure.savefig(path)
+    return str(path)
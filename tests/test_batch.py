@@ -0,0 +1,71 @@
+import json
+import pytest
+from hydro.simulation.batch import find_profiles, plan_jobs, run_batch, results_table
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0,
+    "threshold_high": 4.0
+}
+
+MANIFEST = {
+    "depths": [1.0, 2.0, 3.0],
+    "afflux": {"depths": [2.0, 4.0], "contractions": [0.6, 0.8]},
+    "design": {"targets": [100, 200], "max_depth": 4.0},
+    "stress_test": {"depths": [3.5], "iterations": 5000, "seed": 1}
+}
+
+def _network(tmp_path):
+    folder = tmp_path / "profiles"
+    folder.mkdir()
+    for name, width in (("alpha", 8.0), ("beta", 12.0)):
+        (folder / f"{name}.json").write_text(json.dumps({**MOCK_PROFILE, "channel_width": width}))
+    (folder / "broken.json").write_text("{not json")
+    return find_profiles(str(folder))
+
+def test_batch_rows_per_basin_and_error_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    jobs, rows = plan_jobs(_network(tmp_path), MANIFEST, tmp_path / "graphs")
+    rows += run_batch(jobs, workers=1)
+    table = results_table(rows)
+
+    counts = table.groupby(["basin", "task"]).size().to_dict()
+    for basin in ("alpha", "beta"):
+        assert counts[(basin, "simulate")] == 3
+        assert counts[(basin, "bridge-check")] == 4
+        assert counts[(basin, "design")] == 2
+        assert counts[(basin, "stress-test")] == 1
+    assert table.loc[table['basin'] == "broken", 'status'].str.startswith("Error").all()
+
+    # A wider channel carries more water at the same depth
+    simulate = table[table['task'] == "simulate"].set_index(["basin", "depth"])['discharge']
+    assert simulate[("beta", 2.0)] > simulate[("alpha", 2.0)]
+
+def test_process_pool_matches_serial_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    jobs, _ = plan_jobs(_network(tmp_path), MANIFEST, tmp_path / "graphs")
+    done = []
+    serial = results_table(run_batch(jobs, workers=1))
+    pooled = results_table(run_batch(jobs, workers=2, on_done=done.append))
+
+    assert len(done) == len(jobs)
+    assert serial.drop(columns="graph").equals(pooled.drop(columns="graph"))
+
+def test_basins_in_different_folders_keep_their_own_rows(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    for folder, width in (("north", 8.0), ("south", 12.0)):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "ona.json").write_text(json.dumps({**MOCK_PROFILE, "channel_width": width}))
+
+    paths = find_profiles(str(tmp_path / "*" / "*.json"))
+    jobs, rows = plan_jobs(paths, {"depths": [2.0]}, tmp_path / "graphs")
+    table = results_table(rows + run_batch(jobs, workers=1)).set_index("basin")
+
+    assert sorted(table.index) == ["north/ona", "south/ona"]
+    assert table.loc["south/ona", 'discharge'] > table.loc["north/ona", 'discharge']
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        plan_jobs(paths + paths[:1], {"depths": [2.0]})
@@ -0,0 +1,22 @@
+import copy
+from hydro.utils.bench import run_suite, compare, save_results, load_results
+
+def test_suite_records_throughput_and_memory(tmp_path):
+    results = run_suite(tmp_path, "small", only=["discharge-batch", "design"], repeat=1)
+
+    assert list(results['results']) == ["discharge-batch", "design"]
+    for result in results['results'].values():
+        assert result['throughput'] > 0 and result['peak_mb'] >= 0
+        assert result['best_s'] <= result['median_s']
+    assert load_results(save_results(results, tmp_path / "baseline.json")) == results
+
+def test_compare_flags_regressions(tmp_path):
+    current = run_suite(tmp_path, "small", only=["discharge-batch", "design"], repeat=1)
+    baseline = copy.deepcopy(current)
+    baseline['results']['design']['throughput'] *= 2        # we got twice as slow
+    baseline['results']['discharge-batch']['peak_mb'] /= 10  # and ten times heavier
+
+    verdicts = compare(current, baseline, tolerance=0.25)
+    assert verdicts['design']['status'] == "slower"
+    assert verdicts['discharge-batch']['status'] == "heavier"
+    assert compare(current, current)['design']['status'] == "ok"
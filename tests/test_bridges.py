@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import pandas as pd
+from hydro.simulation.engine import HydraulicEngine
+from hydro.simulation.bridges import load_inventory, screen_bridges, worst_cases
+from hydro.utils.tables import TableStream
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0
+}
+
+def test_inventory_screen_matches_single_bridge_check(tmp_path):
+    profile_path = tmp_path / "profile.json"
+    profile_path.write_text(json.dumps(MOCK_PROFILE))
+    inventory_path = tmp_path / "bridges.csv"
+    pd.DataFrame({"bridge_id": ["A", "B", "C"], "channel_width": [10.0, 6.0, 20.0]}).to_csv(inventory_path, index=False)
+
+    inventory = load_inventory(str(inventory_path), MOCK_PROFILE)
+    depths, ratios = [1.0, 2.5, 4.0], [0.6, 0.8]
+
+    # Tiny chunks force several blocks through the streaming writer
+    out = tmp_path / "screen.csv"
+    worst = None
+    with TableStream(str(out)) as stream:
+        for chunk in screen_bridges(inventory, depths, ratios, chunk_rows=5):
+            stream.write(chunk)
+            worst = worst_cases(worst, chunk, top=4)
+    screen = pd.read_csv(out, dtype={"bridge_id": str})
+    assert len(screen) == 3 * 2 * 3
+
+    engine = HydraulicEngine(str(profile_path))
+    row = screen[(screen['bridge_id'] == "A") & (screen['depth'] == 2.5) & (screen['contraction'] == 0.6)].iloc[0]
+    expected = engine.calculate_bridge_afflux(2.5, 0.6)
+    assert np.isclose(row['afflux'], expected['afflux'], rtol=1e-12)
+
+    assert list(worst['afflux']) == sorted(screen['afflux'], reverse=True)[:4]
+
+def test_empty_inventory_screens_nothing(tmp_path, capsys):
+    from hydro.cli import app
+
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(MOCK_PROFILE))
+    inventory = tmp_path / "bridges.csv"
+    inventory.write_text("bridge_id,channel_width\n")
+
+    app(["bridge-check", "--profile", str(profile), "--inventory", str(inventory)], standalone_mode=False)
+
+    assert "No bridges to screen" in capsys.readouterr().out
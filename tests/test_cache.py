@@ -0,0 +1,70 @@
+import json
+import os
+import time
+from hydro.utils.cache import ResultCache
+from hydro.simulation.monte_carlo import run_flood_risk_simulation
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0,
+    "threshold_high": 4.0
+}
+
+def test_lru_eviction_keeps_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path))
+    blob = tmp_path / "blob.bin"
+    blob.write_bytes(b"x" * 1000)
+
+    cache = ResultCache(max_bytes=2500)
+    keys = [cache.key("test", MOCK_PROFILE, i=i) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, {"i": i}, artifacts={"blob": blob})
+        os.utime(cache.root / key / "result.json", (time.time() - 100 + i, time.time() - 100 + i))
+
+    # Touch the oldest entry, then overflow: the untouched one is evicted
+    assert cache.get(keys[0])[0] == {"i": 0}
+    cache.put(keys[2], {"i": 2}, artifacts={"blob": blob})
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+def test_repeated_stress_test_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(MOCK_PROFILE))
+
+    first = run_flood_risk_simulation(str(profile), 3.5, 20_000, seed=3, cache=True)
+    os.remove(first['graph'])
+    second = run_flood_risk_simulation(str(profile), 3.5, 20_000, seed=3, cache=True)
+
+    assert not first['cached'] and second['cached']
+    assert second['probability'] == first['probability']
+    assert os.path.exists(second['graph'])
+
+    # Any change to the profile contents is a different run
+    profile.write_text(json.dumps({**MOCK_PROFILE, "manning_n": 0.031}))
+    assert not run_flood_risk_simulation(str(profile), 3.5, 20_000, seed=3, cache=True)['cached']
+
+def test_unseeded_stress_tests_are_never_replayed(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(MOCK_PROFILE))
+
+    first = run_flood_risk_simulation(str(profile), 4.0, 20_000, cache=True)
+    second = run_flood_risk_simulation(str(profile), 4.0, 20_000, cache=True)
+
+    assert not first['cached'] and not second['cached']
+    assert second['mean_discharge'] != first['mean_discharge']
+    assert not ResultCache().entries()
+
+def test_result_cache_version_is_part_of_the_key(monkeypatch):
+    from hydro.utils import cache
+
+    key = ResultCache.key("stress-test", MOCK_PROFILE, seed=3)
+    monkeypatch.setattr(cache, "RESULT_CACHE_VERSION", cache.RESULT_CACHE_VERSION + 1)
+    assert ResultCache.key("stress-test", MOCK_PROFILE, seed=3) != key
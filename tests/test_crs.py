@@ -0,0 +1,107 @@
+import json
+import struct
+from hydro.crs.checker import validate_crs, read_geojson_crs, find_layers, scan_crs, group_by_crs
+
+def _write_geotiff(path, epsg: int, order: str = "<"):
+    """Minimal one-IFD GeoTIFF: size tags plus a GeoKey directory (no pixel data)."""
+    keys = [1, 1, 0, 2, 1024, 0, 1, 1, 3072, 0, 1, epsg]
+    entries = [(256, 3, 1, 1), (257, 3, 1, 1)]
+    ifd_size = 2 + 12 * 3 + 4
+    data_offset = 8 + ifd_size
+    body = struct.pack(order + "2sHI", b"II" if order == "<" else b"MM", 42, 8)
+    body += struct.pack(order + "H", 3)
+    for tag, kind, count, value in entries:
+        body += struct.pack(order + "HHIHH", tag, kind, count, value, 0)
+    body += struct.pack(order + "HHII", 34735, 3, len(keys), data_offset)
+    body += struct.pack(order + "I", 0)
+    body += struct.pack(order + "H" * len(keys), *keys)
+    path.write_bytes(body)
+
+def _write_geojson(path, crs=None, features: int = 3, crs_last: bool = False):
+    feature = {"type": "Feature", "properties": {"name": "crs [trap]: \"quoted\""},
+               "geometry": {"type": "LineString", "coordinates": [[3.9, 7.4], [3.91, 7.41]]}}
+    members = [("type", "FeatureCollection"), ("features", [feature] * features)]
+    if crs:
+        member = ("crs", {"type": "name", "properties": {"name": crs}})
+        members = members + [member] if crs_last else [members[0], member, members[1]]
+    path.write_text(json.dumps(dict(members)))
+
+def test_header_readers(tmp_path):
+    _write_geotiff(tmp_path / "dem.tif", 32631)
+    _write_geotiff(tmp_path / "dem_be.tif", 4326, order=">")
+    _write_geojson(tmp_path / "first.geojson", "urn:ogc:def:crs:EPSG::32631")
+    _write_geojson(tmp_path / "last.geojson", "urn:ogc:def:crs:OGC:1.3:CRS84", crs_last=True)
+    _write_geojson(tmp_path / "none.geojson")
+    (tmp_path / "roads.shp").write_bytes(b"")
+    (tmp_path / "roads.prj").write_text(
+        'PROJCS["WGS 84 / UTM zone 31N",GEOGCS["WGS 84",AUTHORITY["EPSG","4326"]],AUTHORITY["EPSG","32631"]]'
+    )
+
+    assert validate_crs(str(tmp_path / "dem.tif")) == "EPSG:32631"
+    assert validate_crs(str(tmp_path / "dem_be.tif")) == "EPSG:4326"
+    assert validate_crs(str(tmp_path / "first.geojson")) == "EPSG:32631"
+    assert validate_crs(str(tmp_path / "last.geojson")) == "EPSG:4326"
+    assert read_geojson_crs(str(tmp_path / "none.geojson")) == ("EPSG:4326", False)
+    assert validate_crs(str(tmp_path / "roads.shp")) == "EPSG:32631"
+    assert validate_crs(str(tmp_path / "missing.tif")) == "Error: File not found."
+
+def test_geojson_crs_found_without_reading_features(tmp_path):
+    # Everything after the header is unparseable: only a header-only reader can answer
+    path = tmp_path / "big.geojson"
+    header = b'{"type": "FeatureCollection", "crs": {"type": "name", "properties": {"name": "EPSG:2263"}}, "features": ['
+    path.write_bytes(header + b'{"type": "Feature", "geometry": [[1.0, 2' * 200_000)
+
+    assert read_geojson_crs(str(path)) == ("EPSG:2263", True)
+
+def test_bulk_scan_groups_mismatches_and_reuses_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    data = tmp_path / "basin"
+    (data / "rasters").mkdir(parents=True)
+    for i in range(4):
+        _write_geotiff(data / "rasters" / f"tile_{i}.tif", 32631)
+    _write_geojson(data / "rivers.geojson", "EPSG:32631")
+    _write_geojson(data / "legacy.geojson", "EPSG:26331")
+    (data / "broken.tif").write_bytes(b"not a tiff")
+
+    layers = find_layers([str(data)])
+    assert len(layers) == 7
+
+    first = scan_crs(layers, workers=4)
+    groups, reference, errors, unresolved = group_by_crs(first)
+    assert reference == "EPSG:32631" and len(groups["EPSG:32631"]) == 5
+    assert groups["EPSG:26331"] == [str(data / "legacy.geojson")]
+    assert [row['path'] for row in errors] == [str(data / "broken.tif")]
+    assert unresolved == []
+
+    # Only the file that changed is read again
+    _write_geojson(data / "legacy.geojson", "EPSG:32631")
+    second = {row['path']: row for row in scan_crs(layers, workers=4)}
+    assert not second[str(data / "legacy.geojson")]['cached']
+    assert all(row['cached'] for path, row in second.items() if not path.endswith("legacy.geojson"))
+    assert group_by_crs(second.values(), expected="urn:ogc:def:crs:EPSG::32631")[1] == "EPSG:32631"
+
+ESRI_UTM_31N = (
+    'PROJCS["WGS_1984_UTM_Zone_31N",GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984",SPHEROID["WGS_1984",6378137.0,298.257223563]],'
+    'PRIMEM["Greenwich",0.0],UNIT["Degree",0.0174532925199433]],PROJECTION["Transverse_Mercator"],'
+    'PARAMETER["Central_Meridian",3.0],PARAMETER["Scale_Factor",0.9996],UNIT["Meter",1.0]]'
+)
+
+def test_esri_prj_and_null_crs_resolve_to_epsg(tmp_path):
+    for name, wkt in (("esri", ESRI_UTM_31N), ("south", ESRI_UTM_31N.replace("Zone_31N", "Zone_31S")),
+                      ("geographic", 'GEOGCS["GCS_WGS_1984",DATUM["D_WGS_1984"]]'),
+                      ("local", 'PROJCS["Lagos_Local_Grid",GEOGCS["GCS_Minna"]]')):
+        (tmp_path / f"{name}.shp").write_bytes(b"")
+        (tmp_path / f"{name}.prj").write_text(wkt)
+    _write_geotiff(tmp_path / "dem.tif", 32631)
+    (tmp_path / "null.geojson").write_text('{"type": "FeatureCollection", "crs": null, "features": []}')
+
+    assert validate_crs(str(tmp_path / "esri.shp")) == "EPSG:32631"
+    assert validate_crs(str(tmp_path / "south.shp")) == "EPSG:32731"
+    assert validate_crs(str(tmp_path / "geographic.shp")) == "EPSG:4326"
+    assert read_geojson_crs(str(tmp_path / "null.geojson")) == ("EPSG:4326", False)
+
+    results = scan_crs(find_layers([str(tmp_path)]), use_cache=False)
+    groups, reference, errors, unresolved = group_by_crs(results, expected="EPSG:32631")
+    assert sorted(groups) == ["EPSG:32631", "EPSG:32731", "EPSG:4326"] and not errors
+    assert groups["EPSG:32631"] == [str(tmp_path / "dem.tif"), str(tmp_path / "esri.shp")]
+    assert [(row['path'], row['crs']) for row in unresolved] == [(str(tmp_path / "local.shp"), "Unresolved (Lagos_Local_Grid)")]
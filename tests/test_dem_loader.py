@@ -0,0 +1,44 @@
+import json
+import numpy as np
+from hydro.utils.dem_loader import DemSampler, get_elevation_from_dem
+
+# 1 km grid cells, north-up, origin at (x=500000, y=800000)
+TRANSFORM = [500000.0, 1000.0, 0, 800000.0, 0, -1000.0]
+
+def _plane_dem(tmp_path, rows=300, cols=400):
+    """A tilted plane: bilinear interpolation must reproduce it exactly."""
+    r, c = np.mgrid[0:rows, 0:cols]
+    path = tmp_path / "plane.npy"
+    np.save(path, (20.0 + 0.5 * c + 0.25 * r).astype(np.float32))
+    (tmp_path / "plane.json").write_text(json.dumps({"transform": TRANSFORM, "nodata": -9999}))
+    return str(path)
+
+def test_batch_bilinear_sampling_reads_each_tile_once(tmp_path):
+    dem = _plane_dem(tmp_path)
+    rng = np.random.default_rng(1)
+    c = rng.uniform(0, 399, 5000)
+    r = rng.uniform(0, 299, 5000)
+    x = TRANSFORM[0] + (c + 0.5) * 1000.0
+    y = TRANSFORM[3] - (r + 0.5) * 1000.0
+
+    sampler = DemSampler(tile_size=64)
+    elevation = sampler.sample(dem, y, x)
+
+    assert np.allclose(elevation, 20.0 + 0.5 * c + 0.25 * r, atol=1e-3)
+    assert sampler.tile_reads <= 5 * 7  # ceil(300/64) x ceil(400/64) tiles
+
+def test_points_outside_raster_are_nan(tmp_path):
+    dem = _plane_dem(tmp_path)
+    elevation = DemSampler().sample(dem, [900000.0, 799500.0], [500500.0, 100.0])
+    assert np.isnan(elevation).all()
+
+def test_single_point_lookup_returns_the_cell_value(tmp_path):
+    """One-point lookups keep the pixel value; bilinear is opt-in."""
+    dem = _plane_dem(tmp_path)
+    # Inside cell (row 10, col 20), a quarter cell off its centre
+    x = TRANSFORM[0] + 20.75 * 1000.0
+    y = TRANSFORM[3] - 10.75 * 1000.0
+
+    assert get_elevation_from_dem(y, x, dem) == 20.0 + 0.5 * 20 + 0.25 * 10
+    assert np.isclose(get_elevation_from_dem(y, x, dem, method="bilinear"), 20.0 + 0.5 * 20.25 + 0.25 * 10.25)
+    assert np.isclose(DemSampler().sample(dem, [y], [x], method="nearest")[0], 32.5)
@@ -0,0 +1,52 @@
+import json
+import numpy as np
+from hydro.simulation.design import solve_min_width, load_sweep_cases, run_design_sweep, design_envelope
+from hydro.simulation.engine import trapezoid_flow
+
+# Mock profile data
+MOCK_PROFILE = {
+    "basin_name": "Test River",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0
+}
+
+def test_min_width_sits_on_capacity_constraint():
+    """The solved width must carry exactly the target flow (or be flagged)."""
+    targets = np.array([50.0, 200.0, 1e7])
+    result = solve_min_width(targets, 3.0, 0.001, 0.035, 2.0)
+
+    capacity = trapezoid_flow(3.0, 0.035, 0.001, result['optimal_width'][:2], 2.0)['discharge']
+    assert np.allclose(capacity, targets[:2], rtol=1e-5)
+    assert list(result['status']) == ["Optimized", "Optimized", "Failed to Converge"]
+
+def test_json_grid_expands_to_every_combination(tmp_path):
+    """A grid spec solves the full cross product, filling gaps from the profile."""
+    spec = tmp_path / "grid.json"
+    spec.write_text(json.dumps({
+        "target_q": {"start": 50, "stop": 500, "num": 10},
+        "max_depth": [2.0, 4.0],
+        "manning_n": [0.03, 0.04, 0.05]
+    }))
+
+    results = run_design_sweep(load_sweep_cases(str(spec), MOCK_PROFILE))
+
+    assert len(results) == 60
+    assert (results['slope'] == 0.001).all()
+    assert results['optimal_width'].notna().any()
+
+def test_repeated_sweep_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path / "cache"))
+    spec = tmp_path / "grid.json"
+    spec.write_text(json.dumps({"target_q": [50, 150, 5000], "max_depth": 3.0}))
+    output = tmp_path / "out" / "envelope.csv"
+
+    first = design_envelope(str(spec), MOCK_PROFILE, output=str(output))
+    output.unlink()
+    second = design_envelope(str(spec), MOCK_PROFILE, output=str(output))
+
+    assert not first['cached'] and second['cached']
+    assert (second['cases'], second['feasible']) == (3, 2)
+    assert output.exists()
+    assert not design_envelope(str(spec), MOCK_PROFILE, output=str(output), cache=False)['cached']
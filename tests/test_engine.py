@@ -10,17 +10,33 @@ MOCK_PROFILE = {
     "side_slope": 2.0
 }
 
-def test_trapezoidal_discharge():
+def test_trapezoidal_discharge(tmp_path):
     """Test that physics math is accurate."""
     # Create a temporary JSON for the test
     import json
-    with open("tests/temp_profile.json", "w") as f:
-        json.dump(MOCK_PROFILE, f)
-        
-    engine = HydraulicEngine("tests/temp_profile.json")
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(MOCK_PROFILE))
+
+    engine = HydraulicEngine(str(path))
     result = engine.calculate_discharge(depth=2.0)
     
     # We expect positive flow
     assert result['discharge'] > 0
     assert result['area'] == 28.0 # (10 + 2*2)*2 = 28
-    assert result['velocity'] > 0
\ No newline at end of file
+    assert result['velocity'] > 0
+def test_batch_matches_scalar_and_broadcasts(tmp_path):
+    """One batch call must reproduce the scalar engine for every element."""
+    import json
+    import numpy as np
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(MOCK_PROFILE))
+    engine = HydraulicEngine(str(path))
+
+    depths = np.array([0.0, 0.5, 2.0, 4.0])
+    roughness = np.array([0.03, 0.035, 0.035, 0.04])
+    batch = engine.calculate_discharge_batch(depths, n=roughness)
+
+    assert batch['discharge'].shape == depths.shape
+    assert batch['discharge'][0] == 0 and batch['velocity'][0] == 0
+    assert batch['discharge'][2] == engine.calculate_discharge(2.0)['discharge']
+    assert np.isclose(batch['area'][2] / batch['perimeter'][2], batch['hydraulic_radius'][2])
@@ -0,0 +1,51 @@
+from hydro.hazard.follow import GaugeFollower
+
+def test_follow_parses_only_new_lines_and_alerts_on_change(tmp_path):
+    """Alerts fire on status changes only, and a restart resumes from the checkpoint."""
+    feed = tmp_path / "live.csv"
+    checkpoint = tmp_path / "follow.json"
+    feed.write_text(
+        "timestamp,station,level\n"
+        "2024-09-01T00:00:00,Ona_Bridge,4.8\n"
+        "2024-09-01T00:00:00,Eleyele_Dam,1.0\n"
+    )
+
+    follower = GaugeFollower(str(feed), 4.0, checkpoint)
+    first = follower.poll()
+    assert [(a['station'], a['status']) for a in first] == [("Ona_Bridge", "HIGH RISK")]
+
+    # A half-written line must wait for its newline
+    with open(feed, "a") as f:
+        f.write("2024-09-01T00:10:00,Ona_Bridge,4.9\n2024-09-01T00:20:00,Ona_")
+    assert follower.poll() == []
+
+    # New process, same checkpoint: only the completed line is parsed
+    with open(feed, "a") as f:
+        f.write("Bridge,2.0\n")
+    resumed = GaugeFollower(str(feed), 4.0, checkpoint)
+    alerts = resumed.poll()
+
+    assert [(a['previous'], a['status']) for a in alerts] == [("HIGH RISK", "SAFE")]
+    state = resumed.stations["Ona_Bridge"]
+    assert state['readings'] == 3
+    assert state['max_level'] == 4.9
+    assert state['time_above'] == 1200.0
+    assert resumed.offset == feed.stat().st_size
+
+def test_small_blocks_match_a_single_read(tmp_path):
+    """Catching up block by block gives the same state as one big read."""
+    feed = tmp_path / "live.csv"
+    lines = ["timestamp,station,level"] + [
+        f"2024-09-01T{i // 60:02d}:{i % 60:02d}:00,{name},{level}"
+        for i in range(300) for name, level in (("Ona_Bridge", 3.0 + (i % 40) / 20), ("Eleyele_Dam", 1.0 + i / 100))
+    ]
+    feed.write_text("\n".join(lines) + "\n")
+
+    whole = GaugeFollower(str(feed), 4.0, tmp_path / "whole.json")
+    blocks = GaugeFollower(str(feed), 4.0, tmp_path / "blocks.json")
+    whole_alerts = whole.poll()
+    block_alerts = blocks.poll(block_size=100)
+
+    assert [(a['station'], a['status']) for a in block_alerts] == [(a['station'], a['status']) for a in whole_alerts]
+    assert blocks.stations == whole.stations
+    assert blocks.offset == whole.offset == feed.stat().st_size
@@ -0,0 +1,24 @@
+from hydro.hazard.report import summarize_levels
+
+TELEMETRY = """station,level
+Ona_Bridge,4.8
+Eleyele_Dam,3.2
+Ona_Bridge,3.1
+Apete_Culvert,5.1
+Eleyele_Dam,2.0
+Ona_Bridge,4.2
+"""
+
+def test_chunked_summary_aggregates_per_station(tmp_path):
+    """Chunk boundaries must not change the per-station aggregates."""
+    path = tmp_path / "levels.csv"
+    path.write_text(TELEMETRY)
+
+    summary = summarize_levels(str(path), 4.0, chunksize=2).set_index("station")
+
+    assert summary.loc["Ona_Bridge", "readings"] == 3
+    assert summary.loc["Ona_Bridge", "max_level"] == 4.8
+    assert summary.loc["Ona_Bridge", "last_level"] == 4.2
+    assert summary.loc["Ona_Bridge", "exceedances"] == 2
+    assert summary.loc["Eleyele_Dam", "status"] == "WARNING"
+    assert list(summary.index)[0] == "Apete_Culvert"
@@ -0,0 +1,41 @@
+import json
+import numpy as np
+from scipy import ndimage
+from hydro.hazard.inundation import map_inundation
+
+TRANSFORM = [0.0, 10.0, 0, 1000.0, 0, -10.0]
+
+def _save_dem(tmp_path, elevation):
+    path = tmp_path / "dem.npy"
+    np.save(path, elevation.astype(np.float32))
+    (tmp_path / "dem.json").write_text(json.dumps({"transform": TRANSFORM, "nodata": None}))
+    return str(path)
+
+def test_ridge_keeps_the_other_valley_dry(tmp_path):
+    # Two 2 m deep valleys split by a 10 m ridge at column 50
+    elevation = np.full((80, 100), 8.0)
+    elevation[:, 50] = 10.0
+    dem = _save_dem(tmp_path, elevation)
+
+    # Seed in the west valley (row 40, col 10)
+    res = map_inundation(dem, 9.0, str(tmp_path / "mask.npy"), seeds=[(595.0, 105.0)], tile_size=16)
+    mask = np.load(res['mask'])
+
+    assert mask[:, :50].all() and not mask[:, 50:].any()
+    assert res['area_m2'] == 80 * 50 * 100.0
+    assert np.isclose(res['volume_m3'], 80 * 50 * 100.0 * 1.0)
+
+def test_tiled_fill_matches_whole_raster_labelling(tmp_path):
+    rng = np.random.default_rng(4)
+    elevation = ndimage.uniform_filter(rng.normal(size=(150, 130)), 5)
+    dem = _save_dem(tmp_path, elevation)
+    seed_rc = np.argwhere(elevation < 0)[[0, -1]]
+    seeds = [(TRANSFORM[3] - (r + 0.5) * 10.0, (c + 0.5) * 10.0) for r, c in seed_rc]
+
+    for connectivity in (4, 8):
+        res = map_inundation(dem, 0.0, str(tmp_path / "mask.npy"), seeds=seeds,
+                             tile_size=17, connectivity=connectivity)
+        structure = ndimage.generate_binary_structure(2, 2 if connectivity == 8 else 1)
+        labels, _ = ndimage.label(elevation.astype(np.float32) < 0, structure=structure)
+        expected = np.isin(labels, labels[seed_rc[:, 0], seed_rc[:, 1]])
+        assert (np.load(res['mask']) == expected).all()
@@ -0,0 +1,84 @@
+import json
+from hydro.simulation.monte_carlo import run_flood_risk_simulation
+
+# Mock profile data
+MOCK_PROFILE = {
+    "basin_name": "Test River",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0,
+    "threshold_high": 4.5
+}
+
+def _write_profile(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(MOCK_PROFILE))
+    return str(path)
+
+def test_seeded_simulation_is_reproducible(tmp_path, monkeypatch):
+    """Same seed must give identical statistics."""
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+
+    first = run_flood_risk_simulation(profile, 4.0, 5000, seed=42)
+    second = run_flood_risk_simulation(profile, 4.0, 5000, seed=42)
+
+    assert first['probability'] == second['probability']
+    assert first['p95_discharge'] == second['p95_discharge']
+    assert 0 < first['probability'] < 100
+
+def test_failure_probability_matches_depth_distribution(tmp_path, monkeypatch):
+    """Depth ~ U(3.2, 5.2) crosses 4.5m with probability 35%."""
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+
+    result = run_flood_risk_simulation(profile, 4.0, 200000, seed=7)
+
+    assert abs(result['probability'] - 35.0) < 0.5
+
+def test_sharded_run_matches_single_process(tmp_path, monkeypatch):
+    """Worker count must not change a seeded, chunked result."""
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+
+    serial = run_flood_risk_simulation(profile, 4.0, 40000, seed=3, chunk_size=10000)
+    sharded = run_flood_risk_simulation(profile, 4.0, 40000, seed=3, chunk_size=10000, workers=2)
+
+    assert serial['probability'] == sharded['probability']
+    assert serial['p99_discharge'] == sharded['p99_discharge']
+    assert abs(serial['mean_discharge'] - sharded['mean_discharge']) < 1e-9
+
+def test_importance_sampling_stops_early_on_rare_failures(tmp_path, monkeypatch):
+    """Threshold at 5.15m: P = 2.5%, reached with a fraction of the budget."""
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+    with open(profile, "w") as f:
+        json.dump({**MOCK_PROFILE, "threshold_high": 5.15}, f)
+
+    result = run_flood_risk_simulation(
+        profile, 4.0, 1_000_000, seed=5, chunk_size=10000,
+        sampler="importance", target_ci=0.1
+    )
+
+    assert result['evaluations'] < 1_000_000
+    assert result['ci_halfwidth'] <= 0.1
+    assert abs(result['probability'] - 2.5) < 0.3
+
+def test_target_ci_stops_early_with_default_chunk_size(tmp_path, monkeypatch):
+    """The default 1M-sample chunk would make a 200k run a single chunk."""
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+
+    result = run_flood_risk_simulation(profile, 4.0, 200_000, seed=1, sampler="lhs", target_ci=1.0)
+
+    assert result['evaluations'] < 200_000
+    assert result['evaluations'] % 3125 == 0
+    assert result['ci_halfwidth'] <= 1.0
+
+def test_cli_rejects_unknown_sampler(tmp_path, capsys):
+    from hydro.cli import app
+
+    # In non-standalone mode the exit code is returned instead of raised
+    assert app(["stress-test", "--profile", _write_profile(tmp_path), "--sampler", "foo"], standalone_mode=False) == 1
+    assert "Unknown sampler 'foo'" in capsys.readouterr().out
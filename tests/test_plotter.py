@@ -0,0 +1,42 @@
+from PIL import Image
+from hydro.visualization.plotter import render_cross_sections, assemble_animation, plot_cross_section
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0
+}
+
+def test_frame_batch_and_animation(tmp_path):
+    frames = render_cross_sections(MOCK_PROFILE, [1.0, 2.0, 3.0, 4.0], tmp_path / "frames", workers=2)
+
+    assert [p.rsplit("_", 1)[1] for p in frames] == ["0000.png", "0001.png", "0002.png", "0003.png"]
+    images = [Image.open(p) for p in frames]
+    assert len({image.size for image in images}) == 1
+    assert images[0].tobytes() != images[-1].tobytes()  # the water actually rises
+
+    gif = assemble_animation(frames, tmp_path / "rise.gif", fps=5)
+    assert Image.open(gif).n_frames == 4
+
+def test_single_image_goes_to_explicit_path(tmp_path):
+    output = plot_cross_section(MOCK_PROFILE, 2.5, output=tmp_path / "nested" / "section.png")
+    assert output == str(tmp_path / "nested" / "section.png")
+    assert Image.open(output).size == (1000, 600)
+
+def test_empty_depth_sequence_is_reported(tmp_path, capsys):
+    import json
+    import pytest
+    from hydro.cli import app
+
+    with pytest.raises(ValueError, match="No depths"):
+        render_cross_sections(MOCK_PROFILE, [], tmp_path / "frames")
+
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(MOCK_PROFILE))
+    depths = tmp_path / "depths.csv"
+    depths.write_text("depth\n")
+    argv = ["visualize", "--profile", str(profile), "--depths-file", str(depths), "--frames-dir", str(tmp_path / "frames")]
+    assert app(argv, standalone_mode=False) == 1
+    assert "No depths to render" in capsys.readouterr().out
@@ -0,0 +1,34 @@
+import numpy as np
+from hydro.simulation.rating import RatingCurve
+
+# Mock profile data
+MOCK_PROFILE = {
+    "basin_name": "Test River",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0,
+    "threshold_high": 4.5
+}
+
+def test_normal_depth_inverts_manning():
+    """Q -> depth -> Q must round-trip across the whole table."""
+    curve = RatingCurve.build(MOCK_PROFILE)
+    depths = np.array([0.01, 0.5, 2.0, 7.5, 17.0])
+
+    solved = curve.normal_depth(curve.discharge(depths))
+
+    assert np.allclose(solved, depths, atol=1e-6)
+    assert curve.normal_depth(0.0) == 0.0
+    assert np.isnan(curve.normal_depth(curve.max_discharge * 2))
+
+def test_table_is_cached_by_profile_hash(tmp_path, monkeypatch):
+    """A second load of the same profile must come from disk, an edit must not."""
+    monkeypatch.setenv("HYDRO_CACHE_DIR", str(tmp_path))
+
+    RatingCurve.load(MOCK_PROFILE)
+    RatingCurve.load(MOCK_PROFILE)
+    assert len(list((tmp_path / "rating").glob("*.npz"))) == 1
+
+    RatingCurve.load({**MOCK_PROFILE, "manning_n": 0.04})
+    assert len(list((tmp_path / "rating").glob("*.npz"))) == 2
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from hydro.simulation.reach import Reach, _bisect_increasing
+
+MOCK_PROFILE = {
+    "basin_name": "TestReach",
+    "channel_width": 12.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0,
+    "stations": [{"chainage": i * 50.0, "bed_elevation": 30.0 - 0.05 * i} for i in range(120)],
+}
+
+def test_normal_depth_boundary_gives_uniform_flow():
+    reach = Reach(MOCK_PROFILE)
+    flows = np.linspace(5.0, 300.0, 50)
+    res = reach.water_surface_profile(flows)
+
+    assert np.allclose(res['depth'], reach.normal_depth(flows)[:, None], atol=1e-6)
+    assert not res['critical'].any()
+
+def test_backwater_curve_batch_matches_single_flows():
+    reach = Reach(MOCK_PROFILE)
+    flows = np.array([10.0, 60.0, 150.0])
+    stage = reach.bed[-1] + 6.0
+    res = reach.water_surface_profile(flows, downstream_stage=stage)
+
+    # M1 curve: depth falls going upstream, towards (but above) normal depth
+    assert (np.diff(res['depth'], axis=1) > 0).all()
+    assert (res['depth'][:, 0] > reach.normal_depth(flows)).all()
+    for k, q in enumerate(flows):
+        single = reach.water_surface_profile(q, downstream_stage=stage)
+        assert np.allclose(single['depth'][0], res['depth'][k], atol=1e-6)
+
+def test_bisection_rejects_unreachable_targets():
+    """Non-finite or never-reached targets fail fast instead of looping forever."""
+    assert np.allclose(_bisect_increasing(lambda y: y**2, [4.0, 9.0], 0.0), [2.0, 3.0])
+    with pytest.raises(ValueError, match="non-finite"):
+        _bisect_increasing(lambda y: y, [1.0, np.nan], 0.0)
+    with pytest.raises(ValueError, match="not reached"):
+        _bisect_increasing(lambda y: np.minimum(y, 5.0), [1.0, 10.0], 0.0)
@@ -0,0 +1,51 @@
+import numpy as np
+from hydro.simulation.routing import (
+    hydrograph_chunks, route_hydrographs, routing_channel, routing_pieces, synthetic_hydrographs
+)
+
+# Mock profile data
+MOCK_PROFILE = {
+    "basin_name": "Test River",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0,
+    "threshold_high": 4.5
+}
+
+def test_coefficients_conserve_volume_without_oscillation():
+    channel = routing_channel(MOCK_PROFILE, length=30_000, stations=3)
+    for method, options in (("muskingum-cunge", {"q_ref": 80.0}), ("muskingum", {"k_hours": 4.0, "x": 0.3})):
+        ends, c0, c1, c2 = routing_pieces(channel, 900.0, method, **options)
+        assert np.isclose(ends[-1], 30_000)
+        assert np.allclose(c0 + c1 + c2, 1.0)
+        assert (c0 >= 0).all() and (c1 >= 0).all() and (c2 >= 0).all()
+
+def test_flood_wave_attenuates_and_lags_downstream():
+    inflow = synthetic_hydrographs([50.0, 150.0, 300.0], duration=72)
+    res = route_hydrographs(inflow, MOCK_PROFILE, length=60_000, stations=6)
+
+    assert res['peak_flow'].shape == (3, 7)
+    assert np.allclose(res['peak_flow'][:, 0], res['inflow_peak'])
+    assert (np.diff(res['peak_flow'], axis=1) <= 1e-9).all()
+    assert (np.diff(res['peak_time'], axis=1) >= 0).all()
+    assert (res['peak_time'][:, -1] > res['inflow_peak_time']).all()
+    # Bigger floods reach a higher stage (no bed levels: stage is the depth)
+    assert (np.diff(res['peak_stage'], axis=0) > 0).all()
+
+def test_streamed_chunks_match_a_single_pass(tmp_path):
+    inflow = synthetic_hydrographs(np.linspace(40, 400, 25), duration=120)
+    np.save(tmp_path / "inflow.npy", inflow)
+    whole = route_hydrographs(inflow, MOCK_PROFILE, length=40_000)
+    streamed = route_hydrographs(hydrograph_chunks(tmp_path / "inflow.npy", chunk_steps=37), MOCK_PROFILE, length=40_000)
+
+    assert streamed['steps'] == len(inflow) and streamed['q_ref'] == whole['q_ref']
+    assert np.allclose(streamed['peak_flow'], whole['peak_flow'])
+    assert np.array_equal(streamed['peak_time'], whole['peak_time'])
+
+def test_steady_csv_inflow_passes_unchanged(tmp_path):
+    path = tmp_path / "inflow.csv"
+    path.write_text("time,a,b\n" + "".join(f"{i},20,60\n" for i in range(50)))
+    res = route_hydrographs(hydrograph_chunks(str(path)), MOCK_PROFILE, method="muskingum", k_hours=2.0)
+
+    assert np.allclose(res['peak_flow'], [[20.0], [60.0]])
@@ -0,0 +1,46 @@
+import json
+import numpy as np
+from hydro.simulation.monte_carlo import run_flood_risk_simulation
+from hydro.simulation.samples import open_samples
+
+# Mock profile data
+MOCK_PROFILE = {
+    "basin_name": "Test River",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.035,
+    "side_slope": 2.0,
+    "threshold_high": 4.5
+}
+
+def _write_profile(tmp_path, **overrides):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({**MOCK_PROFILE, **overrides}))
+    return str(path)
+
+def test_samples_reopen_zero_copy_and_reproduce_statistics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path)
+
+    result = run_flood_risk_simulation(profile, 4.0, 25_000, seed=3, workers=2, chunk_size=4000,
+                                       samples_out=tmp_path / "samples")
+    samples = open_samples(result['samples'])
+
+    assert len(samples) == 25_000 and "weight" not in samples.columns
+    assert isinstance(samples['discharge'].base, np.memmap)
+    assert np.all(samples['failed'] == (samples['depth'] > MOCK_PROFILE['threshold_high']))
+    assert 100 * samples['failed'].mean() == result['probability']
+    assert samples.statistics(chunk_size=7000).quantile(0.95) == result['p95_discharge']
+    assert samples.meta['seed'] == 3
+
+def test_adaptive_run_keeps_only_merged_samples(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    profile = _write_profile(tmp_path, threshold_high=5.15)
+
+    result = run_flood_risk_simulation(profile, 4.0, 1_000_000, seed=5, chunk_size=10000,
+                                       sampler="importance", target_ci=0.1, samples_out=tmp_path / "samples")
+    samples = open_samples(tmp_path / "samples")
+
+    assert len(samples) == result['evaluations'] < 1_000_000
+    weighted = 100 * (samples['failed'] * samples['weight']).mean()
+    assert abs(weighted - result['probability']) < 1e-9
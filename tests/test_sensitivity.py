@@ -0,0 +1,40 @@
+import json
+import numpy as np
+from hydro.simulation.sensitivity import sobol_analysis
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0,
+    "threshold_high": 4.0
+}
+
+def _profile(tmp_path):
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps(MOCK_PROFILE))
+    return str(path)
+
+def test_fixed_parameters_get_zero_indices(tmp_path):
+    # Only roughness and depth are uncertain; the rest are pinned
+    ranges = {"slope": (0.001, 0.001), "channel_width": (10.0, 10.0), "side_slope": (2.0, 2.0)}
+    result = sobol_analysis(_profile(tmp_path), 3.5, samples=8192, ranges=ranges, seed=4, bootstrap=100)
+    discharge = result['outputs']['discharge']
+
+    assert result['evaluations'] == 8192 * 7
+    assert np.allclose(discharge['first'][1:4], 0) and np.allclose(discharge['total'][1:4], 0)
+    # Depth drives discharge far more than +/-10% roughness
+    assert discharge['first'][4] > discharge['first'][0] > 0
+    assert np.all(discharge['total'] >= discharge['first'] - 0.01)
+    assert 0.95 < discharge['first'].sum() <= 1.01
+    low, high = discharge['total_ci'][4]
+    assert low <= discharge['total'][4] <= high
+
+def test_chunking_does_not_change_estimates(tmp_path):
+    profile = _profile(tmp_path)
+    whole = sobol_analysis(profile, 3.5, samples=4096, seed=7, chunk_size=4096)
+    chunked = sobol_analysis(profile, 3.5, samples=4096, seed=7, chunk_size=1000)
+    for output in ("discharge", "exceedance"):
+        assert np.allclose(whole['outputs'][output]['first'], chunked['outputs'][output]['first'])
+        assert np.allclose(whole['outputs'][output]['total'], chunked['outputs'][output]['total'])
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import numpy as np
+from hydro.simulation.engine import HydraulicEngine
+from hydro.service.server import HydroServer
+from hydro.service.client import HydroClient, ServerError
+
+MOCK_PROFILE = {
+    "basin_name": "TestRiver",
+    "channel_width": 10.0,
+    "slope": 0.001,
+    "manning_n": 0.03,
+    "side_slope": 2.0
+}
+
+def test_concurrent_requests_are_batched_and_match_engine(tmp_path):
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps(MOCK_PROFILE))
+    engine = HydraulicEngine(str(profile))
+    depths = np.linspace(0.5, 4.0, 40)
+
+    def call_missing():
+        client = HydroClient(f"unix://{tmp_path / 'hydro.sock'}")
+        try:
+            client.call("discharge", profile=str(profile))
+        finally:
+            client.close()
+
+    async def scenario():
+        service = HydroServer(batch_window=0.05)
+        server = await service.start(unix_socket=str(tmp_path / "hydro.sock"))
+
+        def call(depth):
+            client = HydroClient(f"unix://{tmp_path / 'hydro.sock'}")
+            try:
+                return client.call("afflux", profile=str(profile), depth=float(depth), contraction=0.7)
+            finally:
+                client.close()
+
+        async with server:
+            results = await asyncio.gather(*(asyncio.to_thread(call, d) for d in depths))
+            error = None
+            try:
+                await asyncio.to_thread(call_missing)
+            except ServerError as e:
+                error = str(e)
+        return results, service.health(), error
+
+    results, health, error = asyncio.run(scenario())
+
+    for depth, result in zip(depths, results):
+        assert np.isclose(result['afflux'], engine.calculate_bridge_afflux(depth, 0.7)['afflux'], rtol=1e-12)
+    assert health['batches'] < len(depths)
+    assert "depth" in error
+
+def test_stress_test_graph_is_written_relative_to_the_client(tmp_path, monkeypatch):
+    profile = tmp_path / "profile.json"
+    profile.write_text(json.dumps({**MOCK_PROFILE, "threshold_high": 4.5}))
+    (tmp_path / "client").mkdir()
+    monkeypatch.chdir(tmp_path / "client")
+
+    async def scenario():
+        service = HydroServer(workers=1)
+        server = await service.start(unix_socket=str(tmp_path / "hydro.sock"))
+
+        def call():
+            client = HydroClient(f"unix://{tmp_path / 'hydro.sock'}")
+            try:
+                return client.call("stress-test", profile="../profile.json", depth=3.5, iterations=2000,
+                                   seed=1, cache=False, graph_path="graphs/risk.png")
+            finally:
+                client.close()
+
+        async with server:
+            try:
+                return await asyncio.to_thread(call)
+            finally:
+                if service.pool is not None:
+                    service.pool.shutdown()
+
+    result = asyncio.run(scenario())
+
+    assert result['graph'] == str(tmp_path / "client" / "graphs" / "risk.png")
+    assert (tmp_path / "client" / "graphs" / "risk.png").exists()
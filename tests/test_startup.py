@@ -0,0 +1,42 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("pandas", "scipy", "matplotlib")
+
+def _loaded_heavy_modules(code: str):
+    """Run `code` in a fresh interpreter and report which heavy packages it pulled in."""
+    probe = code + "\nimport sys\nprint('HEAVY:' + ','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+    proc = subprocess.run([sys.executable, "-c", probe], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    marker = [line for line in proc.stdout.splitlines() if line.startswith("HEAVY:")][-1]
+    return [m for m in marker[len("HEAVY:"):].split(",") if m]
+
+def test_cli_import_is_lightweight():
+    """Importing the CLI must not load the scientific stack."""
+    assert _loaded_heavy_modules("import hydro.cli") == []
+
+def test_light_commands_skip_heavy_imports():
+    """simulate / bridge-check only need NumPy."""
+    code = (
+        "from hydro.cli import app\n"
+        "for argv in (['simulate'], ['bridge-check']):\n"
+        "    app(argv, standalone_mode=False)"
+    )
+    assert _loaded_heavy_modules(code) == []
+
+def test_startup_benchmark_fails_when_a_command_crashes(capsys):
+    """A crashing child finishes instantly; it must fail the budget, not pass it."""
+    import importlib.util
+    import pytest
+
+    spec = importlib.util.spec_from_file_location("startup_bench", REPO_ROOT / "benchmarks" / "startup.py")
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+
+    with pytest.raises(SystemExit) as exit_info:
+        bench.best_wall_time(["-c", "raise RuntimeError('boom')"], runs=1)
+    assert exit_info.value.code == 1
+    assert "boom" in capsys.readouterr().err
@@ -0,0 +1,17 @@
+import numpy as np
+from hydro.simulation.stats import StreamingStats
+
+def test_merged_shards_match_exact_statistics():
+    """Moments are exact and the quantile sketch is within one bin."""
+    rng = np.random.default_rng(0)
+    values = rng.uniform(10.0, 50.0, 100000)
+
+    merged = StreamingStats(10.0, 50.0)
+    for shard in np.array_split(values, 7):
+        merged.merge(StreamingStats(10.0, 50.0).update(shard))
+
+    assert merged.count == values.size
+    assert abs(merged.mean - values.mean()) < 1e-9
+    assert abs(merged.variance - values.var(ddof=1)) < 1e-6
+    assert abs(merged.quantile(0.95) - np.percentile(values, 95)) < 40.0 / merged.bins
+    assert merged.coarse_histogram(30)[0].sum() == values.size
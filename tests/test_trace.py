@@ -0,0 +1,39 @@
+import json
+import time
+from hydro.cli import app
+from hydro.utils import trace
+
+def test_nested_spans_and_counters():
+    tracer = trace.enable()
+    try:
+        with trace.span("outer"):
+            for _ in range(3):
+                with trace.span("inner", size=10):
+                    time.sleep(0.002)
+                trace.count("rows", 10)
+    finally:
+        trace.disable()
+
+    rows = {row['path']: row for row in tracer.summary()}
+    outer, inner = rows[("outer",)], rows[("outer", "inner")]
+    assert inner['calls'] == 3 and outer['calls'] == 1
+    assert outer['total'] >= inner['total'] >= 0.006
+    assert abs(outer['self'] - (outer['total'] - inner['total'])) < 1e-9
+    assert tracer.counters['rows'] == 30
+
+    events = tracer.chrome_trace()['traceEvents']
+    assert [e['ph'] for e in events].count("X") == 4 and [e['ph'] for e in events].count("C") == 3
+
+def test_disabled_tracing_is_a_shared_no_op():
+    assert not trace.enabled()
+    assert trace.span("a") is trace.span("b", rows=1)
+    trace.count("rows")  # nothing to record into, must not fail
+
+def test_profile_out_writes_chrome_trace(tmp_path):
+    path = tmp_path / "trace.json"
+    app(["--profile-out", str(path), "simulate", "--depth", "2.0"], standalone_mode=False)
+
+    events = json.loads(path.read_text())['traceEvents']
+    names = {e['name'] for e in events}
+    assert {"hydro simulate", "profile load"} <= names
+    assert not trace.enabled()